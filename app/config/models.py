@@ -28,13 +28,35 @@ class AppConfig:
     enable_disk_check: bool = True
     enable_disk_quota: bool = True
     enable_retention: bool = True
+    quota_global_gb: float = 0.0
+    quota_camera_gb: float = 0.0
+    retention_interval_s: int = 3600
+    recovery_scan_days: int = 2
+    disk_monitor_interval_s: float = 5.0
     files_dir: str = "Files"
     cam_reconnect_min_s: float = 0.5
     cam_reconnect_max_s: float = 30.0
     cam_stale_s: float = 5.0
     record_backend: str = "opencv"
+    record_segment_minutes: int = 60
+    record_rotation_stagger_s: int = 300
+    record_x264_preset: str = "veryfast"
+    record_x264_crf: int = 23
+    record_x264_threads: int = 0
+    record_encode_queue: int = 30
+    record_drop_policy: str = "drop_oldest"
+    record_cfr_max_gap_s: float = 2.0
     motion_offline: bool = True
     motion_offline_workers: int = 1
+    motion_follow_interval_s: float = 5.0
+    finalize_workers: int = 1
+    finalize_queue_size: int = 32
+    frame_zero_copy: bool = True
+    frame_store_backend: str = "memory"
+    shm_frame_slots: int = 3
+    shm_slot_mb: int = 6
+    ingest_mode: str = "thread"
+    ingest_cameras_per_process: int = 4
     yolo: YoloConfig = field(default_factory=YoloConfig)
     tracking: TrackingConfig = field(default_factory=TrackingConfig)
 
@@ -52,6 +74,9 @@ class CameraConfig:
     rtsp_url: str = ""
     device_index: int = 0
     enabled: bool = True
+    sub_stream_path: str = ""
+    sub_rtsp_url: str = ""
+    quota_gb: float = 0.0
 
 
 @dataclass
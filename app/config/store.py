@@ -56,13 +56,39 @@ class ConfigStore:
             enable_disk_check=app_data.get("enable_disk_check", True),
             enable_disk_quota=app_data.get("enable_disk_quota", True),
             enable_retention=app_data.get("enable_retention", True),
+            quota_global_gb=float(app_data.get("quota_global_gb", 0.0) or 0.0),
+            quota_camera_gb=float(app_data.get("quota_camera_gb", 0.0) or 0.0),
+            retention_interval_s=int(app_data.get("retention_interval_s", 3600) or 3600),
+            recovery_scan_days=int(app_data.get("recovery_scan_days", 2) or 2),
+            disk_monitor_interval_s=float(app_data.get("disk_monitor_interval_s", 5.0) or 5.0),
             files_dir=app_data.get("files_dir", "Files"),
             cam_reconnect_min_s=app_data.get("cam_reconnect_min_s", 0.5),
             cam_reconnect_max_s=app_data.get("cam_reconnect_max_s", 30.0),
             cam_stale_s=app_data.get("cam_stale_s", 5.0),
             record_backend=app_data.get("record_backend", "opencv"),
+            record_segment_minutes=int(app_data.get("record_segment_minutes", 60) or 60),
+            record_rotation_stagger_s=int(app_data.get("record_rotation_stagger_s", 300) or 0),
+            record_x264_preset=app_data.get("record_x264_preset", "veryfast"),
+            record_x264_crf=int(app_data.get("record_x264_crf", 23)),
+            record_x264_threads=int(app_data.get("record_x264_threads", 0) or 0),
+            record_encode_queue=int(app_data.get("record_encode_queue", 30) or 0),
+            record_drop_policy=app_data.get("record_drop_policy", "drop_oldest"),
+            record_cfr_max_gap_s=float(app_data.get("record_cfr_max_gap_s", 2.0) or 0.0),
             motion_offline=bool(app_data.get("motion_offline", True)),
             motion_offline_workers=int(app_data.get("motion_offline_workers", 1) or 1),
+            motion_follow_interval_s=float(
+                app_data.get("motion_follow_interval_s", 5.0) or 0.0
+            ),
+            finalize_workers=int(app_data.get("finalize_workers", 1) or 1),
+            finalize_queue_size=int(app_data.get("finalize_queue_size", 32) or 32),
+            frame_zero_copy=bool(app_data.get("frame_zero_copy", True)),
+            frame_store_backend=app_data.get("frame_store_backend", "memory"),
+            shm_frame_slots=int(app_data.get("shm_frame_slots", 3) or 3),
+            shm_slot_mb=int(app_data.get("shm_slot_mb", 6) or 6),
+            ingest_mode=app_data.get("ingest_mode", "thread"),
+            ingest_cameras_per_process=int(
+                app_data.get("ingest_cameras_per_process", 4) or 4
+            ),
             yolo=YoloConfig(
                 model_path=yolo_data.get("model_path", "models/yolo.onnx"),
                 conf_thres=yolo_data.get("conf_thres", 0.5),
@@ -93,6 +119,9 @@ class ConfigStore:
             rtsp_url=cam.get("rtsp_url", ""),
             device_index=int(cam.get("device_index", 0)),
             enabled=bool(cam.get("enabled", True)),
+            sub_stream_path=cam.get("sub_stream_path", ""),
+            sub_rtsp_url=cam.get("sub_rtsp_url", ""),
+            quota_gb=float(cam.get("quota_gb", 0.0) or 0.0),
         )
 
     def _load_app_config(self) -> AppConfig:
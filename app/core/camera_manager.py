@@ -1,12 +1,20 @@
 import logging
 import time
 import threading
+from dataclasses import replace
 from typing import Dict, List, Tuple
 
 from app.config.models import CameraConfig, CameraRuntimeState
 from app.config.store import ConfigStore
 from app.core.camera_worker import CameraWorker
 from app.core.frame_store import FrameStore
+from app.core.ingest_pool import IngestPool
+from app.core.packet_hub import PacketHub, packets_available
+from app.core.packet_worker import PacketCameraWorker
+from app.core.shm_frame_store import SharedFrameStore
+from app.utils.rtsp import build_sub_rtsp_url
+
+SUBSTREAM_SUFFIX = "#sub"
 
 
 class CameraManager:
@@ -17,9 +25,17 @@ class CameraManager:
         self._lock = threading.Lock()
         self._cameras: Dict[str, CameraConfig] = {}
         self._runtime: Dict[str, CameraRuntimeState] = {}
+        # Sub-streams report their own liveness; the camera's runtime is
+        # the main stream's.
+        self._stream_runtime: Dict[str, CameraRuntimeState] = {}
         self._workers: Dict[str, CameraWorker] = {}
         self._stop_events: Dict[str, threading.Event] = {}
+        self._target_fps: Dict[str, float] = {}
+        self._decode: Dict[str, bool] = {}
+        self._packet_hubs: Dict[str, PacketHub] = {}
         self.logger = logging.getLogger("CameraManager")
+        self._ingest_pool = self._create_ingest_pool()
+        self._demux_once = self._use_packet_ingest()
 
     def load_from_config(self, cameras: List[CameraConfig], start_workers: bool = False) -> None:
         for cam in cameras:
@@ -31,13 +47,22 @@ class CameraManager:
 
     def get_runtime(self, name: str) -> CameraRuntimeState:
         with self._lock:
-            runtime = self._runtime[name]
-            if self._app_config.cam_stale_s > 0 and runtime.last_frame_ts:
-                age = time.time() - runtime.last_frame_ts
-                if age > self._app_config.cam_stale_s and runtime.status == "Online":
-                    runtime.status = "Offline"
-                    runtime.last_error = "Stale"
-            return runtime
+            return self._check_stale(self._runtime[name])
+
+    def get_stream_runtime(self, key: str) -> CameraRuntimeState:
+        """Runtime of the stream behind FrameStore ``key`` (see ``stream_key``)."""
+        camera_name, is_sub = self._split_stream_key(key)
+        with self._lock:
+            runtime = self._stream_runtime[key] if is_sub else self._runtime[camera_name]
+            return self._check_stale(runtime)
+
+    def _check_stale(self, runtime: CameraRuntimeState) -> CameraRuntimeState:
+        if self._app_config.cam_stale_s > 0 and runtime.last_frame_ts:
+            age = time.time() - runtime.last_frame_ts
+            if age > self._app_config.cam_stale_s and runtime.status == "Online":
+                runtime.status = "Offline"
+                runtime.last_error = "Stale"
+        return runtime
 
     def get_camera(self, name: str) -> CameraConfig:
         with self._lock:
@@ -61,7 +86,9 @@ class CameraManager:
             self._cameras[config.name] = config
             self._runtime[config.name] = runtime
             self._stop_events[config.name] = stop_event
-        if start_worker:
+        if start_worker and self._ingest_pool is not None:
+            self._ingest_pool.start(config, runtime)
+        elif start_worker:
             worker = self._create_worker(config, runtime, stop_event)
             self._register_worker(config.name, worker)
             self._start_worker(config.name, worker)
@@ -91,9 +118,12 @@ class CameraManager:
         self.persist()
 
     def remove_camera(self, name: str, persist: bool = True) -> None:
+        self.stop_stream(f"{name}{SUBSTREAM_SUFFIX}")
         stop_event, worker = self._pop_worker(name)
         if stop_event is None:
             return
+        if self._ingest_pool is not None:
+            self._ingest_pool.stop(name)
         stop_event.set()
         if worker:
             worker.join(timeout=5)
@@ -114,48 +144,160 @@ class CameraManager:
             self._stop_events.clear()
             self._workers.clear()
             self._runtime.clear()
+            self._stream_runtime.clear()
             self._cameras.clear()
         for event in stop_events:
             event.set()
         for worker in workers:
             worker.join(timeout=join_timeout)
+        if self._ingest_pool is not None:
+            self._ingest_pool.shutdown()
+
+    def stream_key(self, name: str, main: bool = True) -> str:
+        """FrameStore key for ``name``: the sub-stream when asked and configured."""
+        with self._lock:
+            config = self._cameras.get(name)
+        if main or config is None or not build_sub_rtsp_url(config):
+            return name
+        return f"{name}{SUBSTREAM_SUFFIX}"
 
     def start_stream(self, name: str) -> None:
+        camera_name, is_sub = self._split_stream_key(name)
         with self._lock:
-            if name not in self._cameras:
+            if camera_name not in self._cameras:
                 raise ValueError("Camera not found")
             worker = self._workers.get(name)
             if worker is not None and worker.is_alive():
                 return
-            config = self._cameras[name]
+            config = self._cameras[camera_name]
             if not config.enabled:
                 return
-            runtime = self._runtime[name]
-            stop_event = threading.Event()
-            self._stop_events[name] = stop_event
-            worker = self._create_worker(config, runtime, stop_event)
-            self._workers[name] = worker
+            if is_sub:
+                config = replace(
+                    config, name=name, source="rtsp", rtsp_url=build_sub_rtsp_url(config)
+                )
+                runtime = self._stream_runtime.setdefault(
+                    name, CameraRuntimeState(mode=config.mode, enabled=config.enabled)
+                )
+            else:
+                runtime = self._runtime[camera_name]
+            if self._ingest_pool is None:
+                stop_event = threading.Event()
+                self._stop_events[name] = stop_event
+                worker = self._create_worker(config, runtime, stop_event)
+                self._workers[name] = worker
+        if self._ingest_pool is not None:
+            self._ingest_pool.start(config, runtime)
+            return
         self._start_worker(name, worker)
 
     def stop_stream(self, name: str, join_timeout: float = 2.0) -> None:
+        camera_name, is_sub = self._split_stream_key(name)
         with self._lock:
             stop_event = self._stop_events.pop(name, None)
             worker = self._workers.pop(name, None)
-            runtime = self._runtime.get(name)
+            if is_sub:
+                runtime = self._stream_runtime.pop(name, None)
+            else:
+                runtime = self._runtime.get(camera_name)
         if stop_event is not None:
             stop_event.set()
         if worker is not None:
             worker.join(timeout=join_timeout)
+        if self._ingest_pool is not None:
+            self._ingest_pool.stop(name)
         if runtime is not None:
             runtime.status = "Offline"
         self.frame_store.remove_frame(name)
 
+    def set_stream_fps(self, name: str, fps: float) -> None:
+        """Limit decoding for ``name`` to the highest FPS its consumers need."""
+        fps = max(0.0, float(fps or 0.0))
+        with self._lock:
+            if self._target_fps.get(name) == fps:
+                return
+            self._target_fps[name] = fps
+            worker = self._workers.get(name)
+        if worker is not None:
+            worker.set_target_fps(fps)
+        if self._ingest_pool is not None:
+            self._ingest_pool.set_target_fps(name, fps)
+        self.logger.info("Stream %s decode fps -> %s", name, fps or "full")
+
+    def set_stream_decode(self, name: str, enabled: bool) -> None:
+        """Turn frame decoding of a packet-ingest stream on or off."""
+        with self._lock:
+            if self._decode.get(name, True) == enabled:
+                return
+            self._decode[name] = enabled
+            worker = self._workers.get(name)
+        if isinstance(worker, PacketCameraWorker):
+            worker.set_decode_enabled(enabled)
+            self.logger.info("Stream %s decode %s", name, "on" if enabled else "off")
+
+    def packet_hub(self, name: str) -> PacketHub | None:
+        """Packet fan-out for a camera's main stream, or None without demux-once ingest."""
+        with self._lock:
+            config = self._cameras.get(name)
+        return self._hub_for(config) if config is not None else None
+
+    def _hub_for(self, config: CameraConfig) -> PacketHub | None:
+        # Called with or without self._lock held; setdefault keeps it atomic.
+        if not self._demux_once or config.source != "rtsp":
+            return None
+        if config.name.endswith(SUBSTREAM_SUFFIX):
+            return None
+        return self._packet_hubs.setdefault(config.name, PacketHub(config.name))
+
+    def _split_stream_key(self, key: str) -> tuple[str, bool]:
+        if key.endswith(SUBSTREAM_SUFFIX):
+            return key[: -len(SUBSTREAM_SUFFIX)], True
+        return key, False
+
+    def _create_ingest_pool(self) -> IngestPool | None:
+        mode = str(getattr(self._app_config, "ingest_mode", "thread") or "thread")
+        if mode != "process":
+            return None
+        if not isinstance(self.frame_store, SharedFrameStore):
+            self.logger.warning(
+                "ingest_mode=process needs frame_store_backend=shm; using threads"
+            )
+            return None
+        return IngestPool(
+            self.frame_store,
+            cameras_per_process=self._app_config.ingest_cameras_per_process,
+            min_backoff_s=self._app_config.cam_reconnect_min_s,
+            max_backoff_s=self._app_config.cam_reconnect_max_s,
+        )
+
+    def _use_packet_ingest(self) -> bool:
+        mode = str(getattr(self._app_config, "ingest_mode", "thread") or "thread")
+        if mode != "demux":
+            return False
+        if not packets_available():
+            self.logger.warning("ingest_mode=demux needs PyAV (av); using threads")
+            return False
+        return True
+
     def _create_worker(
         self,
         config: CameraConfig,
         runtime: CameraRuntimeState,
         stop_event: threading.Event,
     ) -> CameraWorker:
+        hub = self._hub_for(config)
+        if hub is not None:
+            return PacketCameraWorker(
+                config=config,
+                runtime=runtime,
+                frame_store=self.frame_store,
+                stop_event=stop_event,
+                packet_hub=hub,
+                min_backoff_s=self._app_config.cam_reconnect_min_s,
+                max_backoff_s=self._app_config.cam_reconnect_max_s,
+                target_fps=self._target_fps.get(config.name, 0.0),
+                decode_enabled=self._decode.get(config.name, True),
+            )
         return CameraWorker(
             config=config,
             runtime=runtime,
@@ -163,6 +305,7 @@ class CameraManager:
             stop_event=stop_event,
             min_backoff_s=self._app_config.cam_reconnect_min_s,
             max_backoff_s=self._app_config.cam_reconnect_max_s,
+            target_fps=self._target_fps.get(config.name, 0.0),
         )
 
     def _register_worker(self, name: str, worker: CameraWorker) -> None:
@@ -183,4 +326,5 @@ class CameraManager:
             worker = self._workers.pop(name, None)
             self._runtime.pop(name, None)
             self._cameras.pop(name, None)
+            self._packet_hubs.pop(name, None)
         return stop_event, worker
@@ -20,6 +20,7 @@ class CameraWorker(threading.Thread):
         min_backoff_s: float = 0.5,
         max_backoff_s: float = 30.0,
         status_callback: Optional[Callable[[str, str], None]] = None,
+        target_fps: float = 0.0,
     ) -> None:
         super().__init__(daemon=True)
         self.config = config
@@ -30,6 +31,7 @@ class CameraWorker(threading.Thread):
         self._max_backoff_s = float(max_backoff_s)
         self._reconnect_attempts = 0
         self.status_callback = status_callback
+        self._target_fps = max(0.0, float(target_fps or 0.0))
         self.logger = logging.getLogger(f"CameraWorker[{config.name}]")
 
     def set_status(self, status: str, error: str = "") -> None:
@@ -38,6 +40,10 @@ class CameraWorker(threading.Thread):
         if self.status_callback:
             self.status_callback(self.config.name, status)
 
+    def set_target_fps(self, fps: float) -> None:
+        """Decode at most ``fps`` frames per second; 0 decodes every frame."""
+        self._target_fps = max(0.0, float(fps or 0.0))
+
     def _open_capture(self) -> cv2.VideoCapture:
         if self.config.source == "device":
             self.logger.info("Opening device index %s", self.config.device_index)
@@ -52,6 +58,29 @@ class CameraWorker(threading.Thread):
             return None
         return frame
 
+    def _frame_due(self, now: float, next_due: float) -> bool:
+        if self._target_fps <= 0 or next_due <= 0:
+            return True
+        return now >= next_due
+
+    def _next_due(self, now: float, next_due: float) -> float:
+        """Schedule the decode after one taken at ``now``.
+
+        Due times advance by whole periods rather than from the arrival time,
+        so a 25 fps camera with a 15 fps target averages 15 fps instead of
+        rounding every gap up to two source frames. When the stream stalls
+        for more than a period the schedule restarts from ``now``.
+        """
+        if self._target_fps <= 0:
+            return 0.0
+        period = 1.0 / self._target_fps
+        if next_due <= 0:
+            return now + period
+        next_due += period
+        if next_due <= now:
+            next_due = now + period
+        return next_due
+
     def _sleep_backoff(self, backoff: float) -> float:
         time.sleep(backoff)
         return min(backoff * 2, self._max_backoff_s)
@@ -73,7 +102,22 @@ class CameraWorker(threading.Thread):
             backoff = self._min_backoff_s
             self._reconnect_attempts = 0
 
+            next_due = 0.0
             while not self.stop_event.is_set():
+                now = time.time()
+                if not self._frame_due(now, next_due):
+                    # Surplus frame: demux/decode it to keep the stream in
+                    # sync but skip the BGR conversion and the publish.
+                    if not cap.grab():
+                        self.set_status("Offline", "Read failed")
+                        self._reconnect_attempts += 1
+                        self.logger.warning(
+                            "Grab failed; reconnect #%s", self._reconnect_attempts
+                        )
+                        break
+                    self.runtime.last_frame_ts = time.time()
+                    continue
+
                 frame = self._read_frame(cap)
                 if frame is None:
                     self.set_status("Offline", "Read failed")
@@ -83,6 +127,7 @@ class CameraWorker(threading.Thread):
                     )
                     break
 
+                next_due = self._next_due(now, next_due)
                 self.runtime.last_frame_ts = time.time()
                 self.frame_store.set_frame(
                     self.config.name, frame, self.runtime.last_frame_ts
@@ -0,0 +1,142 @@
+import collections
+import logging
+import threading
+import time
+from typing import Callable, Deque, Dict, Tuple
+
+DROP_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+# (writer, frame, enqueue time, write kwargs) for frames,
+# (None, callback, 0.0, {}) for control ops.
+_Item = Tuple[object, object, float, dict]
+
+
+class EncodeQueue(threading.Thread):
+    """Bounded hand-off between frame acquisition and ``writer.write``.
+
+    The recorder thread only enqueues; this thread does the encoding. When
+    the queue is full the policy decides: ``drop_oldest`` discards the
+    oldest queued frame, ``drop_newest`` refuses the new one, ``block``
+    waits for room (acquisition then follows the encoder again). Control
+    ops such as closing a writer are never dropped and run in order after
+    the frames queued before them.
+
+    Frames discarded by ``drop_oldest`` go with their write kwargs and are
+    counted per writer; callers that keep a timeline collect them with
+    ``take_dropped`` and re-fill the slots they leave missing.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 30,
+        policy: str = "drop_oldest",
+        perf=None,
+    ) -> None:
+        super().__init__(daemon=True, name=f"encode-{name}")
+        self._items: Deque[_Item] = collections.deque()
+        self._frames = 0
+        self._maxsize = max(1, int(maxsize))
+        self._policy = policy if policy in DROP_POLICIES else "drop_oldest"
+        self._cond = threading.Condition()
+        self._closed = False
+        self._perf = perf
+        self.dropped = 0
+        self._dropped_by_writer: Dict[object, int] = {}
+        self.logger = logging.getLogger(f"EncodeQueue[{name}]")
+
+    def qsize(self) -> int:
+        with self._cond:
+            return self._frames
+
+    def put_frame(self, writer, frame, **write_kwargs) -> bool:
+        dropped = False
+        with self._cond:
+            if self._closed:
+                return False
+            if self._frames >= self._maxsize:
+                if self._policy == "block":
+                    # Woken by the encoder as it dequeues, or by close().
+                    self._cond.wait_for(
+                        lambda: self._frames < self._maxsize or self._closed
+                    )
+                    if self._closed:
+                        return False
+                elif self._policy == "drop_newest":
+                    self.dropped += 1
+                    self._record(dropped=1, queue_size=self._frames)
+                    return False
+                else:
+                    self._drop_oldest_frame()
+                    dropped = True
+            self._items.append((writer, frame, time.monotonic(), write_kwargs))
+            self._frames += 1
+            self._cond.notify_all()
+            queue_size = self._frames
+        self._record(dropped=1 if dropped else 0, queue_size=queue_size)
+        return True
+
+    def take_dropped(self, writer) -> int:
+        """Number of ``writer``'s queued frames dropped since the last call."""
+        with self._cond:
+            return self._dropped_by_writer.pop(writer, 0)
+
+    def call(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` on the encoder thread after all frames queued so far."""
+        with self._cond:
+            if self._closed:
+                run_now = True
+            else:
+                self._items.append((None, callback, 0.0, {}))
+                self._cond.notify_all()
+                run_now = False
+        if run_now:
+            callback()
+
+    def close(self, join_timeout: float = 10.0) -> None:
+        """Drain remaining work, then stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.join(timeout=join_timeout)
+
+    def run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._items or self._closed)
+                if not self._items:
+                    return
+                writer, payload, queued_at, write_kwargs = self._items.popleft()
+                if writer is not None:
+                    self._frames -= 1
+                self._cond.notify_all()
+            if writer is None:
+                try:
+                    payload()
+                except Exception:
+                    self.logger.exception("Encoder control op failed")
+                continue
+            latency_ms = (time.monotonic() - queued_at) * 1000.0
+            try:
+                writer.write(payload, **write_kwargs)
+            except Exception:
+                self.logger.exception("Frame write failed")
+            if self._perf is not None:
+                self._perf.record_encode(latency_ms=latency_ms, queue_size=self.qsize())
+
+    def _drop_oldest_frame(self) -> None:
+        """Drop the oldest frame together with its write kwargs."""
+        for index, item in enumerate(self._items):
+            writer = item[0]
+            if writer is not None:
+                break
+        else:
+            return
+        del self._items[index]
+        self._frames -= 1
+        self.dropped += 1
+        self._dropped_by_writer[writer] = self._dropped_by_writer.get(writer, 0) + 1
+
+    def _record(self, dropped: int, queue_size: int) -> None:
+        if self._perf is not None:
+            self._perf.record_encode(dropped=dropped, queue_size=queue_size)
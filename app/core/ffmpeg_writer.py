@@ -0,0 +1,127 @@
+import logging
+import os
+import subprocess
+from pathlib import Path
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.utils.ffmpeg import find_ffmpeg
+
+
+class FFmpegPipeWriter:
+    """cv2.VideoWriter look-alike that pipes raw BGR frames into libx264.
+
+    Frames are encoded once, straight into fragmented MP4, so the file is
+    playable while it is written and needs no remux afterwards.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fps: float,
+        frame_size: Tuple[int, int],
+        preset: str = "veryfast",
+        crf: int = 23,
+        threads: int = 0,
+    ) -> None:
+        self.path = Path(path)
+        self.frame_size = (int(frame_size[0]), int(frame_size[1]))
+        self.logger = logging.getLogger("FFmpegPipeWriter")
+        self.gop = 0
+        self._proc: Optional[subprocess.Popen] = None
+        ffmpeg = find_ffmpeg()
+        if not ffmpeg:
+            self.logger.warning("ffmpeg not found; pipe writer unavailable")
+            return
+        width, height = self.frame_size
+        fps = max(0.1, float(fps))
+        # Fixed GOP (no scene-cut keyframes) so keyframe positions are known
+        # to the segment index without parsing the output.
+        self.gop = max(1, int(round(fps * 2)))
+        cmd = [
+            ffmpeg,
+            "-hide_banner",
+            "-loglevel",
+            "warning",
+            "-y",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "bgr24",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            f"{fps:g}",
+            "-i",
+            "pipe:0",
+            "-an",
+            "-c:v",
+            "libx264",
+            "-preset",
+            str(preset or "veryfast"),
+            "-crf",
+            str(int(crf)),
+            "-threads",
+            str(max(0, int(threads))),
+            "-g",
+            str(self.gop),
+            "-sc_threshold",
+            "0",
+            "-pix_fmt",
+            "yuv420p",
+            "-movflags",
+            "+frag_keyframe+empty_moov+default_base_moof",
+            "-f",
+            "mp4",
+            str(self.path),
+        ]
+        try:
+            self._proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
+            )
+        except Exception as exc:
+            self.logger.warning("Failed to start ffmpeg encoder: %s", exc)
+            self._proc = None
+
+    def isOpened(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def write(self, frame: np.ndarray) -> None:
+        if not self.isOpened() or self._proc.stdin is None:
+            return
+        h, w = frame.shape[:2]
+        if (w, h) != self.frame_size:
+            frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_AREA)
+        try:
+            self._proc.stdin.write(np.ascontiguousarray(frame).data)
+        except (BrokenPipeError, OSError, ValueError) as exc:
+            self.logger.warning("Encoder pipe closed for %s: %s", self.path.name, exc)
+            self._kill()
+
+    def release(self) -> None:
+        proc = self._proc
+        if proc is None:
+            return
+        try:
+            if proc.stdin is not None:
+                proc.stdin.close()
+            proc.wait(timeout=10)
+        except Exception:
+            self._kill()
+        self._proc = None
+
+    def _kill(self) -> None:
+        proc = self._proc
+        if proc is None:
+            return
+        try:
+            proc.kill()
+            proc.wait(timeout=2)
+        except Exception:
+            pass
@@ -0,0 +1,110 @@
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.storage.segment_index import retarget_sidecar
+from app.utils.ffmpeg import remux_ts_to_mp4
+
+
+@dataclass
+class FinalizeJob:
+    path: Path
+    transcode: bool = True
+    on_done: Optional[Callable[[Path, bool], None]] = None
+
+
+class FinalizeService:
+    """Background remux of finished recordings.
+
+    Recorders rename a segment and hand it over here, then open the next one
+    right away. The queue is bounded: when it is full the segment is kept as
+    the playable .ts it already is instead of stalling the recorder.
+    ``on_done(path, remuxed)`` runs on the worker thread with the final path.
+
+    ``shutdown`` never blocks on a full queue: jobs still waiting are handed
+    back as unremuxed .ts files, and a remux cut short by the join timeout
+    leaves its .ts untouched (ffmpeg output is only renamed into place on success).
+    """
+
+    def __init__(self, workers: int = 1, max_pending: int = 32) -> None:
+        self._queue: "queue.Queue[FinalizeJob | None]" = queue.Queue(
+            maxsize=max(1, int(max_pending))
+        )
+        self._threads: list[threading.Thread] = []
+        self._workers = max(1, int(workers))
+        self._stop = threading.Event()
+        self.logger = logging.getLogger("FinalizeService")
+        for _ in range(self._workers):
+            thread = threading.Thread(target=self._run, daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def submit(self, job: FinalizeJob) -> bool:
+        if self._stop.is_set():
+            self._notify(job, job.path, False)
+            return False
+        try:
+            self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            self.logger.warning("Finalize queue full; keeping %s unremuxed", job.path.name)
+            self._notify(job, job.path, False)
+            return False
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def shutdown(self, join_timeout: float = 5.0) -> None:
+        self._stop.set()
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                self._notify(job, job.path, False)
+        for _ in range(self._workers):
+            try:
+                self._queue.put(None, timeout=0.5)
+            except queue.Full:
+                break
+        deadline = time.monotonic() + max(0.0, join_timeout)
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                self.logger.warning("Finalize worker still remuxing at shutdown; keeping its .ts")
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if self._stop.is_set():
+                self._notify(job, job.path, False)
+                continue
+            final_path = job.path
+            remuxed = False
+            try:
+                if job.path.suffix == ".ts" and job.path.exists():
+                    mp4_path = remux_ts_to_mp4(
+                        job.path, delete_source=True, transcode=job.transcode
+                    )
+                    if mp4_path is not None:
+                        retarget_sidecar(mp4_path, keyframes=not job.transcode)
+                        final_path = mp4_path
+                        remuxed = True
+            except Exception:
+                self.logger.exception("Remux failed for %s", job.path.name)
+            self._notify(job, final_path, remuxed)
+
+    def _notify(self, job: FinalizeJob, path: Path, remuxed: bool) -> None:
+        if job.on_done is None:
+            return
+        try:
+            job.on_done(path, remuxed)
+        except Exception:
+            self.logger.exception("Finalize callback failed for %s", path.name)
@@ -1,50 +1,220 @@
+import itertools
 import threading
+from dataclasses import dataclass, field
 from typing import Dict, Optional, Tuple
 
+import cv2
 import numpy as np
 
 
+@dataclass(frozen=True)
+class FrameLevel:
+    """Target resolution of a cached pyramid level.
+
+    Exactly one of ``width``/``height``, ``max_dim`` or ``scale`` is used, in
+    that order of precedence.
+    """
+
+    width: int = 0
+    height: int = 0
+    max_dim: int = 0
+    scale: float = 0.0
+
+    def target_size(self, frame_w: int, frame_h: int) -> Tuple[int, int]:
+        if self.width > 0 and self.height > 0:
+            return int(self.width), int(self.height)
+        if self.max_dim > 0:
+            if max(frame_w, frame_h) <= self.max_dim:
+                return frame_w, frame_h
+            ratio = self.max_dim / float(max(frame_w, frame_h))
+        elif 0.0 < self.scale < 1.0:
+            ratio = self.scale
+        else:
+            return frame_w, frame_h
+        return max(1, int(frame_w * ratio)), max(1, int(frame_h * ratio))
+
+
+@dataclass(frozen=True)
+class FrameEntry:
+    frame: np.ndarray
+    timestamp: float
+    version: int
+    levels: Dict[Tuple[int, int], np.ndarray] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+
 class FrameStore:
-    def __init__(self) -> None:
+    """Latest-frame store shared by ingest workers and consumers.
+
+    With ``zero_copy`` enabled every published frame is write-protected and
+    handed out by reference; consumers that need to draw on a frame must copy
+    it themselves. Without it, readers get a private copy as before.
+
+    Consumers that process every frame should block in ``wait_for_new``
+    instead of polling; it wakes as soon as a newer version is published.
+
+    Downscaled copies are produced through ``get_scaled``/``get_level``: each
+    target size is resized at most once per frame version and cached on the
+    entry, so every consumer asking for the same size shares one resize.
+    """
+
+    def __init__(self, zero_copy: bool = False) -> None:
         self._lock = threading.Lock()
-        self._frames: Dict[str, np.ndarray] = {}
-        self._timestamps: Dict[str, float] = {}
+        self._entries: Dict[str, FrameEntry] = {}
+        self._conditions: Dict[str, threading.Condition] = {}
+        self._level_locks: Dict[str, threading.Lock] = {}
+        self._levels: Dict[str, FrameLevel] = {}
+        self._versions = itertools.count(1)
+        self._zero_copy = bool(zero_copy)
+
+    @property
+    def zero_copy(self) -> bool:
+        return self._zero_copy
 
     def set_frame(self, camera_name: str, frame: np.ndarray, timestamp: float) -> None:
+        if self._zero_copy:
+            frame.setflags(write=False)
         with self._lock:
-            self._frames[camera_name] = frame
-            self._timestamps[camera_name] = float(timestamp)
+            self._entries[camera_name] = FrameEntry(
+                frame, float(timestamp), next(self._versions)
+            )
+            condition = self._conditions.get(camera_name)
+            if condition is not None:
+                condition.notify_all()
 
-    def get_frame(self, camera_name: str) -> Optional[np.ndarray]:
+    def get_entry(self, camera_name: str) -> Optional[FrameEntry]:
+        entry = self._current(camera_name)
+        return self._private(entry) if entry is not None else None
+
+    def wait_for_new(
+        self, camera_name: str, last_version: int, timeout: float
+    ) -> Optional[FrameEntry]:
+        """Return the first entry newer than ``last_version`` or None on timeout."""
+        with self._lock:
+            condition = self._conditions.get(camera_name)
+            if condition is None:
+                condition = threading.Condition(self._lock)
+                self._conditions[camera_name] = condition
+
+            def _is_newer() -> bool:
+                current = self._entries.get(camera_name)
+                return current is not None and current.version > last_version
+
+            if not condition.wait_for(_is_newer, timeout=max(0.0, timeout)):
+                return None
+            entry = self._entries[camera_name]
+        return self._private(entry)
+
+    def register_level(self, level_name: str, level: FrameLevel) -> None:
         with self._lock:
-            frame = self._frames.get(camera_name)
-            return frame.copy() if frame is not None else None
+            self._levels[level_name] = level
+
+    def get_level(self, camera_name: str, level_name: str) -> Optional[FrameEntry]:
+        with self._lock:
+            level = self._levels.get(level_name)
+        if level is None:
+            raise KeyError(f"Frame level not registered: {level_name}")
+        return self.get_scaled(camera_name, level)
+
+    def get_scaled(
+        self, camera_name: str, level: FrameLevel, version: int = 0
+    ) -> Optional[FrameEntry]:
+        """Current frame at ``level``; with ``version``, only that frame.
+
+        Returns None when a newer frame has replaced ``version`` already, so
+        a caller working on an older frame never gets a newer image.
+        """
+        entry = self._current(camera_name)
+        with self._lock:
+            level_lock = self._level_locks.setdefault(camera_name, threading.Lock())
+        if entry is None or (version and entry.version != version):
+            return None
+        h, w = entry.frame.shape[:2]
+        size = level.target_size(w, h)
+        if size == (w, h):
+            return self._private(entry)
+        with level_lock:
+            scaled = entry.levels.get(size)
+            if scaled is None:
+                interpolation = (
+                    cv2.INTER_AREA if size[0] * size[1] < w * h else cv2.INTER_LINEAR
+                )
+                scaled = cv2.resize(entry.frame, size, interpolation=interpolation)
+                if self._zero_copy:
+                    scaled.setflags(write=False)
+                entry.levels[size] = scaled
+        if not self._zero_copy:
+            scaled = scaled.copy()
+        return FrameEntry(scaled, entry.timestamp, entry.version)
+
+    def get_version(self, camera_name: str) -> int:
+        entry = self._current(camera_name)
+        return entry.version if entry is not None else 0
+
+    def get_frame(self, camera_name: str) -> Optional[np.ndarray]:
+        entry = self.get_entry(camera_name)
+        return entry.frame if entry is not None else None
 
     def get_frame_with_ts(
         self, camera_name: str
     ) -> Optional[Tuple[np.ndarray, float]]:
-        with self._lock:
-            frame = self._frames.get(camera_name)
-            if frame is None:
-                return None
-            return frame.copy(), float(self._timestamps.get(camera_name, 0.0))
+        entry = self.get_entry(camera_name)
+        if entry is None:
+            return None
+        return entry.frame, entry.timestamp
 
     def get_latest_frames(self) -> Dict[str, np.ndarray]:
-        with self._lock:
-            return {name: frame.copy() for name, frame in self._frames.items()}
+        return {name: entry.frame for name, entry in self._snapshot_entries().items()}
 
     def get_latest_snapshot(self) -> Dict[str, Tuple[np.ndarray, float]]:
-        with self._lock:
-            return {
-                name: (frame.copy(), self._timestamps.get(name, 0.0))
-                for name, frame in self._frames.items()
-            }
+        return {
+            name: (entry.frame, entry.timestamp)
+            for name, entry in self._snapshot_entries().items()
+        }
 
     def list_cameras(self) -> list[str]:
         with self._lock:
-            return list(self._frames.keys())
+            return list(self._entries.keys())
 
     def remove_frame(self, camera_name: str) -> None:
         with self._lock:
-            self._frames.pop(camera_name, None)
-            self._timestamps.pop(camera_name, None)
+            self._entries.pop(camera_name, None)
+            self._level_locks.pop(camera_name, None)
+            condition = self._conditions.get(camera_name)
+            if condition is not None:
+                condition.notify_all()
+
+    def close(self) -> None:
+        """Release backend resources; the in-process store holds none."""
+
+    def _current(self, camera_name: str) -> Optional[FrameEntry]:
+        with self._lock:
+            return self._entries.get(camera_name)
+
+    def _snapshot_entries(self) -> Dict[str, FrameEntry]:
+        entries: Dict[str, FrameEntry] = {}
+        for name in self.list_cameras():
+            entry = self._current(name)
+            if entry is not None:
+                entries[name] = self._private(entry)
+        return entries
+
+    def _private(self, entry: FrameEntry) -> FrameEntry:
+        if self._zero_copy:
+            return entry
+        return FrameEntry(entry.frame.copy(), entry.timestamp, entry.version)
+
+
+def create_frame_store(app_config) -> FrameStore:
+    backend = str(getattr(app_config, "frame_store_backend", "memory") or "memory")
+    zero_copy = bool(getattr(app_config, "frame_zero_copy", True))
+    if backend == "shm":
+        from app.core.shm_frame_store import SharedFrameStore
+
+        return SharedFrameStore(
+            slots=int(getattr(app_config, "shm_frame_slots", 3) or 3),
+            slot_bytes=int(float(getattr(app_config, "shm_slot_mb", 6) or 6) * 1024 * 1024),
+            zero_copy=zero_copy,
+        )
+    return FrameStore(zero_copy=zero_copy)
@@ -0,0 +1,288 @@
+import logging
+import logging.handlers
+import multiprocessing as mp
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict
+
+from app.config.models import CameraConfig, CameraRuntimeState
+from app.core.camera_worker import CameraWorker
+from app.core.shm_frame_store import SharedFrameStore
+
+_HEARTBEAT_S = 1.0
+
+
+def _ingest_process_main(
+    commands: "mp.Queue",
+    events: "mp.Queue",
+    min_backoff_s: float,
+    max_backoff_s: float,
+    log_level: int = logging.INFO,
+) -> None:
+    """Child process entry: run a CameraWorker thread per assigned camera.
+
+    Log records go back over ``events`` and are handled by the parent's
+    logging setup, so worker logs land in the same app.log.
+    """
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(events)]
+    root.setLevel(log_level)
+    logger = logging.getLogger("IngestProcess")
+    frame_store = SharedFrameStore.attach({})
+    workers: Dict[str, CameraWorker] = {}
+    stop_events: Dict[str, threading.Event] = {}
+    runtimes: Dict[str, CameraRuntimeState] = {}
+    parent = mp.parent_process()
+    last_heartbeat = 0.0
+
+    def report(name: str, _status: str = "") -> None:
+        runtime = runtimes.get(name)
+        if runtime is None:
+            return
+        try:
+            events.put_nowait(
+                (name, runtime.status, runtime.last_error, runtime.last_frame_ts)
+            )
+        except Exception:
+            pass
+
+    def stop_camera(name: str) -> None:
+        event = stop_events.pop(name, None)
+        worker = workers.pop(name, None)
+        runtimes.pop(name, None)
+        if event is not None:
+            event.set()
+        if worker is not None:
+            worker.join(timeout=2)
+        frame_store.remove_frame(name)
+
+    while parent is None or parent.is_alive():
+        try:
+            command = commands.get(timeout=0.5)
+        except queue.Empty:
+            command = ()
+        if command is None:
+            break
+        if command:
+            action, name = command[0], command[1]
+            if action == "start" and name not in workers:
+                config, ring_name = command[2], command[3]
+                try:
+                    frame_store.attach_ring(name, ring_name)
+                except Exception:
+                    logger.exception("Cannot attach frame ring for %s", name)
+                    continue
+                runtime = CameraRuntimeState(mode=config.mode, enabled=config.enabled)
+                stop_event = threading.Event()
+                worker = CameraWorker(
+                    config=config,
+                    runtime=runtime,
+                    frame_store=frame_store,
+                    stop_event=stop_event,
+                    min_backoff_s=min_backoff_s,
+                    max_backoff_s=max_backoff_s,
+                    status_callback=report,
+                )
+                runtimes[name] = runtime
+                stop_events[name] = stop_event
+                workers[name] = worker
+                worker.start()
+            elif action == "fps" and name in workers:
+                workers[name].set_target_fps(command[2])
+            elif action == "ring" and name in workers:
+                try:
+                    frame_store.attach_ring(name, command[2])
+                except Exception:
+                    logger.exception("Cannot attach resized frame ring for %s", name)
+            elif action == "stop":
+                stop_camera(name)
+        now = time.time()
+        if now - last_heartbeat >= _HEARTBEAT_S:
+            last_heartbeat = now
+            for name in list(runtimes.keys()):
+                report(name)
+
+    for name in list(workers.keys()):
+        stop_camera(name)
+    frame_store.close()
+
+
+@dataclass
+class _IngestProcess:
+    process: mp.Process
+    commands: "mp.Queue"
+    cameras: Dict[str, CameraConfig] = field(default_factory=dict)
+
+
+class IngestPool:
+    """Runs camera decoding in worker processes, each owning up to K cameras.
+
+    Frames travel through the SharedFrameStore rings; status and
+    ``last_frame_ts`` come back over one event queue and are applied to the
+    parent's CameraRuntimeState objects, so the rest of the app sees the same
+    runtime view as with thread workers. The children's log records come
+    back over the same queue and are logged here.
+    """
+
+    def __init__(
+        self,
+        frame_store: SharedFrameStore,
+        cameras_per_process: int = 4,
+        min_backoff_s: float = 0.5,
+        max_backoff_s: float = 30.0,
+    ) -> None:
+        self._frame_store = frame_store
+        self._cameras_per_process = max(1, int(cameras_per_process))
+        self._min_backoff_s = float(min_backoff_s)
+        self._max_backoff_s = float(max_backoff_s)
+        self._ctx = mp.get_context("spawn")
+        self._events: "mp.Queue" = self._ctx.Queue()
+        self._lock = threading.Lock()
+        self._processes: list[_IngestProcess] = []
+        self._assigned: Dict[str, _IngestProcess] = {}
+        self._runtime: Dict[str, CameraRuntimeState] = {}
+        self._target_fps: Dict[str, float] = {}
+        self._stop_event = threading.Event()
+        self._logger = logging.getLogger("IngestPool")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def is_running(self, name: str) -> bool:
+        with self._lock:
+            return name in self._assigned
+
+    def start(self, config: CameraConfig, runtime: CameraRuntimeState) -> None:
+        ring_name = self._frame_store.ensure_ring(config.name)
+        with self._lock:
+            if config.name in self._assigned:
+                return
+            proc = self._pick_process()
+            proc.cameras[config.name] = config
+            self._assigned[config.name] = proc
+            self._runtime[config.name] = runtime
+            target_fps = self._target_fps.get(config.name, 0.0)
+        proc.commands.put(("start", config.name, config, ring_name))
+        if target_fps > 0:
+            proc.commands.put(("fps", config.name, target_fps))
+        self._logger.info("Camera %s assigned to ingest pid %s", config.name, proc.process.pid)
+
+    def set_target_fps(self, name: str, fps: float) -> None:
+        with self._lock:
+            proc = self._assigned.get(name)
+            self._target_fps[name] = fps
+        if proc is not None:
+            proc.commands.put(("fps", name, fps))
+
+    def stop(self, name: str) -> None:
+        with self._lock:
+            proc = self._assigned.pop(name, None)
+            self._runtime.pop(name, None)
+            if proc is not None:
+                proc.cameras.pop(name, None)
+        if proc is not None:
+            proc.commands.put(("stop", name))
+
+    def shutdown(self, join_timeout: float = 2.0) -> None:
+        self._stop_event.set()
+        with self._lock:
+            processes = list(self._processes)
+            self._processes.clear()
+            self._assigned.clear()
+            self._runtime.clear()
+        for proc in processes:
+            try:
+                proc.commands.put(None)
+            except Exception:
+                pass
+        for proc in processes:
+            proc.process.join(timeout=join_timeout)
+            if proc.process.is_alive():
+                proc.process.terminate()
+        self._thread.join(timeout=join_timeout)
+
+    def _pick_process(self) -> _IngestProcess:
+        candidates = [
+            proc
+            for proc in self._processes
+            if proc.process.is_alive() and len(proc.cameras) < self._cameras_per_process
+        ]
+        if candidates:
+            return min(candidates, key=lambda proc: len(proc.cameras))
+        commands = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_ingest_process_main,
+            args=(
+                commands,
+                self._events,
+                self._min_backoff_s,
+                self._max_backoff_s,
+                logging.getLogger().getEffectiveLevel(),
+            ),
+            daemon=True,
+        )
+        process.start()
+        proc = _IngestProcess(process=process, commands=commands)
+        self._processes.append(proc)
+        self._logger.info("Started ingest process pid %s", process.pid)
+        return proc
+
+    def _run(self) -> None:
+        last_check = time.time()
+        while not self._stop_event.is_set():
+            now = time.time()
+            if now - last_check >= _HEARTBEAT_S * 2:
+                last_check = now
+                self._restart_dead()
+                self._grow_rings()
+            try:
+                event = self._events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except Exception:
+                continue
+            if isinstance(event, logging.LogRecord):
+                logging.getLogger(event.name).handle(event)
+                continue
+            name, status, error, last_frame_ts = event
+            with self._lock:
+                runtime = self._runtime.get(name)
+            if runtime is None:
+                continue
+            runtime.status = status
+            runtime.last_error = error
+            if last_frame_ts:
+                runtime.last_frame_ts = last_frame_ts
+
+    def _grow_rings(self) -> None:
+        # Producers cannot reallocate shared memory they do not own; they
+        # flag the frame size they need and get a bigger ring from here.
+        with self._lock:
+            assigned = dict(self._assigned)
+        for name, proc in assigned.items():
+            ring_name = self._frame_store.grow_ring(name)
+            if ring_name is not None:
+                proc.commands.put(("ring", name, ring_name))
+
+    def _restart_dead(self) -> None:
+        with self._lock:
+            dead = [proc for proc in self._processes if not proc.process.is_alive()]
+            for proc in dead:
+                self._processes.remove(proc)
+        for proc in dead:
+            self._logger.warning(
+                "Ingest process pid %s exited (code %s); reassigning %s cameras",
+                proc.process.pid,
+                proc.process.exitcode,
+                len(proc.cameras),
+            )
+            for name, config in list(proc.cameras.items()):
+                with self._lock:
+                    runtime = self._runtime.get(name)
+                    self._assigned.pop(name, None)
+                if runtime is None or self._stop_event.is_set():
+                    continue
+                runtime.status = "Offline"
+                runtime.last_error = "Ingest process exited"
+                self.start(config, runtime)
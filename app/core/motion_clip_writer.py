@@ -1,71 +1,202 @@
+import collections
 import logging
-import queue
 import threading
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
-
-import cv2
+from typing import Deque, Optional, Tuple
 
+from app.core.packet_hub import PacketHub, PacketMuxer
+from app.storage.catalog import KIND_MOTION_CLIP, catalog_add
+from app.storage.segment_index import sidecar_path
 from app.utils.paths import get_tracking_dir
 
 
+class PacketRing:
+    """The last ``seconds`` of compressed packets, always starting at a keyframe.
+
+    Whole GOPs are dropped from the front, so the buffer holds between
+    ``seconds`` and ``seconds`` plus one GOP of video (and the audio
+    interleaved with it). Packets are the hub's own objects; nothing is
+    copied or decoded.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = max(0.0, float(seconds))
+        self._items: Deque[Tuple[float, object]] = collections.deque()
+        self._keyframes: Deque[float] = collections.deque()
+
+    def push(self, packet, ts: float) -> None:
+        is_key = packet.stream.type == "video" and packet.is_keyframe
+        if not self._items and not is_key:
+            return
+        if is_key:
+            self._keyframes.append(ts)
+        self._items.append((ts, packet))
+        # Drop the oldest GOP once the next keyframe alone covers the window.
+        while len(self._keyframes) > 1 and ts - self._keyframes[1] >= self.seconds:
+            self._keyframes.popleft()
+            cutoff = self._keyframes[0]
+            while self._items and self._items[0][0] < cutoff:
+                self._items.popleft()
+
+    @property
+    def oldest_ts(self) -> Optional[float]:
+        return self._items[0][0] if self._items else None
+
+    def drain(self) -> list:
+        packets = [packet for _ts, packet in self._items]
+        self.clear()
+        return packets
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._keyframes.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
 class MotionClipWriter(threading.Thread):
-    def __init__(self, camera_name: str, stop_event: threading.Event) -> None:
+    """Event clips stream-copied from a camera's PacketHub, with pre-roll.
+
+    While no clip is open the thread keeps the last ``pre_roll_s`` seconds
+    of packets in a PacketRing. ``start_clip`` flushes that ring into a new
+    clip, so it shows the approach to the event, and the clip then follows
+    the live packets until ``stop_clip``. Hub packets are handed over through
+    a bounded queue, so the demux thread never waits on disk; when it is
+    full, packets are dropped up to the next video keyframe so the clip
+    stays decodable. Start/stop commands share the queue for ordering but
+    never count against the bound and are never dropped.
+    """
+
+    def __init__(
+        self,
+        camera_name: str,
+        stop_event: threading.Event,
+        packet_hub: PacketHub,
+        pre_roll_s: float = 5.0,
+        max_packets: int = 1024,
+    ) -> None:
         super().__init__(daemon=True)
         self.camera_name = camera_name
         self.stop_event = stop_event
-        self.queue: "queue.Queue[tuple[str, object] | None]" = queue.Queue(maxsize=300)
-        self._writer: Optional[cv2.VideoWriter] = None
+        self.packet_hub = packet_hub
+        self._items: Deque[Optional[Tuple[str, object]]] = collections.deque()
+        self._packets = 0
+        self._max_packets = max_packets
+        self._skip_to_keyframe = False
+        self._cond = threading.Condition()
+        self.dropped = 0
+        self._ring = PacketRing(pre_roll_s)
+        self._ring_session = 0
+        self._muxer: Optional[PacketMuxer] = None
         self._current_path: Optional[Path] = None
         self._current_start: Optional[datetime] = None
+        self._sink_name = f"motion-clip:{camera_name}"
         self.logger = logging.getLogger(f"MotionClip[{camera_name}]")
 
     def run(self) -> None:
-        while not self.stop_event.is_set():
-            try:
-                item = self.queue.get(timeout=0.2)
-            except queue.Empty:
-                continue
-            if item is None:
-                break
-            cmd, payload = item
-            if cmd == "start":
-                stamp, frame_size, fps = payload
-                if self._writer is None:
-                    self._writer = self._open_writer(
-                        frame_size[0], frame_size[1], fps, stamp
-                    )
-                    if self._writer is not None and self._writer.isOpened():
-                        self.logger.info(
-                            "Motion clip start: %s",
-                            self._current_path.name if self._current_path else "unknown",
-                        )
-            elif cmd == "frame":
-                if self._writer is not None:
-                    self._writer.write(payload)
-            elif cmd == "stop":
-                end = payload
-                self._finalize_current(end)
-        self._finalize_current(datetime.now())
-
-    def start_clip(self, stamp: datetime, frame_size: tuple[int, int], fps: float) -> None:
-        self._put(("start", (stamp, frame_size, fps)))
-
-    def push_frame(self, frame) -> None:
-        self._put(("frame", frame))
+        self.packet_hub.add_sink(self._sink_name, self.push_packet)
+        try:
+            while not self.stop_event.is_set():
+                with self._cond:
+                    if not self._cond.wait_for(lambda: self._items, timeout=0.2):
+                        continue
+                    item = self._items.popleft()
+                    if item is not None and item[0] == "packet":
+                        self._packets -= 1
+                if item is None:
+                    break
+                cmd, payload = item
+                if cmd == "packet":
+                    self._on_packet(*payload)
+                elif cmd == "start":
+                    self._open_clip(payload)
+                elif cmd == "stop":
+                    self._finalize_current(payload)
+        finally:
+            self.packet_hub.remove_sink(self._sink_name)
+            self._finalize_current(datetime.now())
+
+    def start_clip(self, stamp: datetime) -> None:
+        self._put_control(("start", stamp))
+
+    def push_packet(self, packet) -> None:
+        is_key = packet.stream.type == "video" and packet.is_keyframe
+        with self._cond:
+            if self._skip_to_keyframe and not is_key:
+                self.dropped += 1
+                return
+            if self._packets >= self._max_packets:
+                # Everything up to the next keyframe would only decode as
+                # smears, so skip it as a whole.
+                if not self._skip_to_keyframe:
+                    self.logger.warning("Clip queue full; dropping to the next keyframe")
+                self._skip_to_keyframe = True
+                self.dropped += 1
+                return
+            self._skip_to_keyframe = False
+            self._items.append(("packet", (packet, time.monotonic())))
+            self._packets += 1
+            self._cond.notify()
 
     def stop_clip(self, stamp: datetime) -> None:
-        self._put(("stop", stamp))
+        self._put_control(("stop", stamp))
 
     def close(self) -> None:
-        self._put(None)
+        self._put_control(None)
+
+    def _put_control(self, item) -> None:
+        with self._cond:
+            self._items.append(item)
+            self._cond.notify()
+
+    def _on_packet(self, packet, ts: float) -> None:
+        muxer = self._muxer
+        if muxer is None:
+            if self._ring_session != self.packet_hub.session:
+                self._ring.clear()
+                self._ring_session = self.packet_hub.session
+            self._ring.push(packet, ts)
+            return
+        if muxer.session != self.packet_hub.session:
+            # Reconnected mid-clip; the old output cannot take the new streams.
+            self._finalize_current(datetime.now())
+            self._ring.clear()
+            self._ring_session = self.packet_hub.session
+            self._ring.push(packet, ts)
+            return
+        try:
+            muxer.write(packet)
+        except Exception as exc:
+            self.logger.warning("Clip write failed: %s", exc)
+            self._finalize_current(datetime.now())
 
-    def _put(self, item) -> None:
+    def _open_clip(self, stamp: datetime) -> None:
+        if self._muxer is not None:
+            return
+        start = stamp
+        oldest = self._ring.oldest_ts
+        if oldest is not None:
+            # The clip really starts at its first buffered keyframe.
+            start = stamp - timedelta(seconds=max(0.0, time.monotonic() - oldest))
+        pre_roll = self._ring.drain()
+        out_dir = self._build_output_dir(start)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        out_path = self._unique_path(out_dir / self._build_filename(start, suffix=".ts"))
         try:
-            self.queue.put_nowait(item)
-        except queue.Full:
-            pass
+            self._muxer = PacketMuxer(out_path, self.packet_hub)
+        except Exception as exc:
+            self.logger.warning("Cannot open motion clip: %s", exc)
+            return
+        self._current_path = out_path
+        self._current_start = start
+        for packet in pre_roll:
+            self._muxer.write(packet)
+        self.logger.info(
+            "Motion clip start: %s (%s pre-roll packets)", out_path.name, len(pre_roll)
+        )
 
     def _build_output_dir(self, now: datetime) -> Path:
         return (
@@ -97,46 +228,10 @@ class MotionClipWriter(threading.Thread):
                 return candidate
         return path
 
-    def _open_writer(
-        self, frame_width: int, frame_height: int, fps: float, now: datetime
-    ) -> cv2.VideoWriter:
-        out_dir = self._build_output_dir(now)
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = self._unique_path(out_dir / self._build_filename(now, suffix=".mp4"))
-        codec_options = ["mp4v"]
-        fps = max(0.1, fps)
-        for codec in codec_options:
-            fourcc = cv2.VideoWriter_fourcc(*codec)
-            writer = self._try_open_writer(out_path, fourcc, fps, frame_width, frame_height)
-            if writer is not None and writer.isOpened():
-                self._current_path = out_path
-                self._current_start = now
-                return writer
-        return cv2.VideoWriter()
-
-    def _try_open_writer(
-        self,
-        out_path: Path,
-        fourcc: int,
-        fps: float,
-        frame_width: int,
-        frame_height: int,
-    ) -> Optional[cv2.VideoWriter]:
-        try:
-            return cv2.VideoWriter(
-                str(out_path),
-                cv2.CAP_FFMPEG,
-                fourcc,
-                fps,
-                (frame_width, frame_height),
-            )
-        except TypeError:
-            return cv2.VideoWriter(str(out_path), fourcc, fps, (frame_width, frame_height))
-
     def _finalize_current(self, end: datetime) -> None:
-        if self._writer is not None:
-            self._writer.release()
-            self._writer = None
+        if self._muxer is not None:
+            self._muxer.close()
+            self._muxer = None
         if not self._current_path or not self._current_start:
             return
         try:
@@ -146,8 +241,11 @@ class MotionClipWriter(threading.Thread):
             target = self._unique_path(target)
             if self._current_path.exists():
                 self._current_path.rename(target)
+            index_path = sidecar_path(self._current_path)
+            if index_path.exists():
+                index_path.rename(sidecar_path(target))
+            catalog_add(target, KIND_MOTION_CLIP, self.camera_name, self._current_start, end=end)
             self.logger.info("Motion clip saved: %s", target.name)
-            # mp4v writer already outputs mp4
         finally:
             self._current_path = None
             self._current_start = None
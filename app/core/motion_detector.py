@@ -24,6 +24,7 @@ class MotionConfig:
     clip_fps: float = 15.0
     clip_hold_seconds: float = 2.0
     clip_min_seconds: float = 2.0
+    clip_pre_roll_seconds: float = 5.0
     history: int = 300
     var_threshold: int = 16
     detect_shadows: bool = True
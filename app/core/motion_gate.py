@@ -0,0 +1,86 @@
+from typing import Any, Callable, Dict, Optional
+
+import cv2
+
+from app.core.motion_detector import apply_motion, ensure_motion
+
+
+class MotionGate:
+    """Debounced live motion state for one camera.
+
+    Detection runs on a downscaled frame at most ``motion_fps`` times per
+    second. Motion turns on after ``start_frames`` consecutive detections
+    with boxes and turns off once nothing was seen for ``stop_seconds``.
+    ``should_write`` then decides which frames reach the recording: all of
+    them while active, one per ``1 / idle_record_fps`` seconds otherwise.
+    """
+
+    def __init__(self, default_motion_fps: float = 5.0) -> None:
+        self._state: Dict[str, Any] = {"bg": None}
+        self._default_motion_fps = max(0.1, float(default_motion_fps))
+        self._hits = 0
+        self._active = False
+        self._last_seen = 0.0
+        self._last_detect = 0.0
+        self._last_idle_write = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def update(
+        self,
+        frame,
+        ts: float,
+        config: Dict[str, Any],
+        scaled: Optional[Callable[[float], Any]] = None,
+    ) -> bool:
+        """Feed one frame; returns whether motion is active.
+
+        ``scaled(scale)`` may supply a downscaled copy of ``frame`` itself
+        (e.g. the shared FrameStore level of that frame's version) instead of
+        resizing here; when it returns None, ``frame`` is resized.
+        """
+        motion_fps = float(config.get("motion_fps", 0.0) or 0.0) or self._default_motion_fps
+        if ts - self._last_detect < 1.0 / max(0.1, motion_fps):
+            return self._active
+        self._last_detect = ts
+        scale = max(0.05, min(1.0, float(config.get("motion_scale", 0.1) or 0.1)))
+        small = scaled(scale) if scaled is not None else None
+        if small is None:
+            small = frame
+            if scale < 1.0:
+                h, w = frame.shape[:2]
+                small = cv2.resize(
+                    frame,
+                    (max(1, int(w * scale)), max(1, int(h * scale))),
+                    interpolation=cv2.INTER_AREA,
+                )
+        ensure_motion(self._state, config)
+        boxes, _ = apply_motion(small, self._state, config)
+        if boxes:
+            self._hits += 1
+            self._last_seen = ts
+            if self._hits >= max(1, int(config.get("start_frames", 10) or 1)):
+                self._active = True
+        else:
+            self._hits = 0
+            stop_seconds = float(config.get("stop_seconds", 10.0) or 0.0)
+            if self._active and ts - self._last_seen >= stop_seconds:
+                self._active = False
+        return self._active
+
+    def should_write(self, ts: float, config: Dict[str, Any]) -> bool:
+        if self._active:
+            return True
+        idle_fps = float(config.get("idle_record_fps", 1.0) or 0.0)
+        if idle_fps <= 0:
+            return False
+        if ts - self._last_idle_write >= 1.0 / idle_fps:
+            self._last_idle_write = ts
+            return True
+        return False
+
+    def idle_interval_s(self, config: Dict[str, Any]) -> float:
+        idle_fps = float(config.get("idle_record_fps", 1.0) or 0.0)
+        return 1.0 / idle_fps if idle_fps > 0 else 0.0
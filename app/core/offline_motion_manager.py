@@ -10,24 +10,127 @@ from typing import Optional
 import cv2
 
 from app.core.motion_detector import apply_motion, ensure_motion, get_motion_config
+from app.storage.catalog import (
+    KIND_CAPTURE,
+    KIND_MOTION_CLIP,
+    catalog_add,
+    catalog_rename,
+    catalog_set_motion_events,
+    get_catalog,
+)
 from app.storage.layout import motion_capture_dir_for
+from app.storage.motion_overlay import MotionOverlay
+from app.storage.segment_index import SegmentIndex, seek_capture
+from app.utils.ffmpeg import extract_clip, find_ffmpeg, probe_seek_keyframe
 from app.utils.paths import get_tracking_dir
 
 
+# A followed segment that stops growing this long without being finalized
+# (e.g. its recorder died) is dropped.
+_FOLLOW_STALE_S = 3600.0
+
+
+class _MotionEvent:
+    """One detected motion span of a segment, in seconds from its start."""
+
+    def __init__(self, start_ts: float) -> None:
+        self.start_ts = start_ts
+        self.end_ts = start_ts
+        self.boxes: list[tuple[float, tuple[int, int, int, int]]] = []
+
+
+class _SegmentScan:
+    """Motion analysis of one segment, kept between passes while it is recorded."""
+
+    def __init__(self, path: Path, base_stamp: datetime) -> None:
+        self.path = path
+        self.camera_name = path.parent.name
+        self.base_stamp = base_stamp
+        self.final_path: Optional[Path] = None
+        self.timeline: Optional[SegmentIndex] = None
+        self.queued = False
+        self.done = False
+        self.last_progress = time.monotonic()
+        self.fps = 0.0
+        self.next_frame = 0
+        self.frame_ts = 0.0
+        self.frame_size = (0, 0)
+        self.state: dict = {"bg": None}
+        self.motion_active = False
+        self.motion_count = 0
+        self.motion_last_seen = 0.0
+        self.last_capture = 0.0
+        self.clip_hold_until = 0.0
+        self.event: Optional[_MotionEvent] = None
+        self.events: list[_MotionEvent] = []
+        self.clip_count = 0
+
+
 class OfflineMotionManager:
-    def __init__(self, workers: int = 1) -> None:
-        self._queue: "queue.Queue[Path | None]" = queue.Queue()
+    """Motion events, captures and clips from recorded segments.
+
+    Finished segments are analysed in one pass. Segments announced with
+    ``follow`` while they are still being written are analysed every
+    ``follow_interval_s`` seconds up to what is on disk, so events and
+    clips show up within seconds instead of after the segment closes; the
+    ``enqueue`` of the finalized file then only covers the tail.
+    """
+
+    def __init__(self, workers: int = 1, follow_interval_s: float = 5.0) -> None:
+        self._queue: "queue.Queue[Path | _SegmentScan | None]" = queue.Queue()
         self._stop_event = threading.Event()
         self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._scans: dict[tuple[str, datetime], _SegmentScan] = {}
+        self._follow_interval_s = max(0.0, float(follow_interval_s or 0.0))
         self.logger = logging.getLogger("OfflineMotion")
         self._workers = max(1, int(workers))
         for _ in range(self._workers):
             thread = threading.Thread(target=self._run, daemon=True)
             self._threads.append(thread)
             thread.start()
+        if self._follow_interval_s > 0:
+            thread = threading.Thread(target=self._run_follow, daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def follow(self, video_path: Path) -> None:
+        """Start analysing a segment that is still being recorded.
+
+        Only MPEG-TS can be read while it grows; other files wait for
+        ``enqueue`` as before.
+        """
+        path = Path(video_path)
+        key = self._scan_key(path)
+        if self._follow_interval_s <= 0 or path.suffix != ".ts" or key is None:
+            return
+        with self._lock:
+            if key not in self._scans:
+                self._scans[key] = _SegmentScan(path, key[1])
+
+    def forget(self, video_path: Path) -> None:
+        """Stop following a segment that was finalized without offline motion."""
+        key = self._scan_key(Path(video_path))
+        with self._lock:
+            scan = self._scans.get(key) if key is not None else None
+            if scan is None:
+                return
+            scan.done = True
+            if not scan.queued:
+                del self._scans[key]
 
     def enqueue(self, video_path: Path) -> None:
-        self._queue.put(Path(video_path))
+        path = Path(video_path)
+        key = self._scan_key(path)
+        with self._lock:
+            scan = self._scans.get(key) if key is not None else None
+            if scan is not None:
+                scan.final_path = path
+                if scan.queued:
+                    # The running pass re-queues it once it sees the final path.
+                    return
+                scan.queued = True
+        self._queue.put(scan if scan is not None else path)
 
     def shutdown(self) -> None:
         self._stop_event.set()
@@ -41,6 +144,9 @@ class OfflineMotionManager:
             item = self._queue.get()
             if item is None or self._stop_event.is_set():
                 break
+            if isinstance(item, _SegmentScan):
+                self._process_scan(item)
+                continue
             if not item.exists():
                 continue
             try:
@@ -48,14 +154,92 @@ class OfflineMotionManager:
             except Exception:
                 self.logger.exception("Offline motion failed for %s", item.name)
 
+    def _run_follow(self) -> None:
+        # Passes over growing segments go through the same worker queue,
+        # so they spread over time instead of arriving as hourly bursts.
+        while not self._stop_event.wait(self._follow_interval_s):
+            now = time.monotonic()
+            with self._lock:
+                for key, scan in list(self._scans.items()):
+                    if scan.queued:
+                        continue
+                    if now - scan.last_progress > _FOLLOW_STALE_S:
+                        self.logger.info("No longer following %s", scan.path.name)
+                        del self._scans[key]
+                        continue
+                    scan.queued = True
+                    self._queue.put(scan)
+
     def _process_video(self, path: Path) -> None:
-        camera_name = path.parent.name
         base_stamp = self._parse_stamp(path) or datetime.fromtimestamp(path.stat().st_mtime)
-        cap = cv2.VideoCapture(str(path))
+        self._finish_scan(_SegmentScan(path, base_stamp), path)
+
+    def _process_scan(self, scan: _SegmentScan) -> None:
+        final_path = scan.final_path
+        try:
+            if final_path is not None:
+                if final_path.exists():
+                    self._finish_scan(scan, final_path)
+            elif not scan.done:
+                self._follow_scan(scan)
+        except Exception:
+            self.logger.exception("Offline motion failed for %s", scan.path.name)
+        finally:
+            with self._lock:
+                if final_path is not None or scan.done:
+                    self._scans.pop(self._scan_key(scan.path), None)
+                elif scan.final_path is not None:
+                    # Finalized while this pass ran.
+                    self._queue.put(scan)
+                else:
+                    scan.queued = False
+
+    def _follow_scan(self, scan: _SegmentScan) -> None:
+        index = SegmentIndex.load(scan.path)
+        if index is None:
+            return
+        # Stay a second behind the writer; the newest frames may still be
+        # in its buffers.
+        stop_frame = index.frame_count - int(max(1.0, index.fps))
+        if stop_frame <= scan.next_frame:
+            return
+        scan.timeline = index
+        self._scan_frames(scan, scan.path, index, stop_frame)
+        self._extract_events(scan, scan.path, index, codec="")
+
+    def _finish_scan(self, scan: _SegmentScan, source: Path) -> None:
+        index = SegmentIndex.load(source)
+        if index is not None:
+            scan.timeline = index
+        self._scan_frames(scan, source, index, None)
+        if scan.event is not None:
+            scan.event.end_ts = scan.frame_ts
+            scan.events.append(scan.event)
+            scan.event = None
+        catalog = get_catalog()
+        record = catalog.get(source) if catalog is not None else None
+        self._extract_events(scan, source, index, record.codec if record is not None else "")
+        if source != scan.path:
+            # Clips and captures made while following point at the open name.
+            catalog_rename(scan.path, source)
+        catalog_set_motion_events(source, scan.clip_count)
+
+    def _scan_frames(
+        self,
+        scan: _SegmentScan,
+        source: Path,
+        index: Optional[SegmentIndex],
+        stop_frame: Optional[int],
+    ) -> None:
+        """Run detection from ``scan.next_frame`` to ``stop_frame`` (or the end)."""
+        cap = cv2.VideoCapture(str(source))
         if not cap.isOpened():
-            self.logger.warning("Cannot open video %s", path.name)
+            self.logger.warning("Cannot open video %s", source.name)
             return
-        native_fps = cap.get(cv2.CAP_PROP_FPS) or 15.0
+        if scan.fps <= 0:
+            scan.fps = (index.fps if index is not None else 0.0) or cap.get(cv2.CAP_PROP_FPS)
+            scan.fps = scan.fps or 15.0
+        native_fps = scan.fps
         config = get_motion_config()
         active_fps = float(
             config.get("motion_offline_fps_active", config.get("motion_fps", 2.0) or 2.0)
@@ -68,112 +252,111 @@ class OfflineMotionManager:
             )
             or 5.0
         )
-        if native_fps > 0:
-            active_fps = min(active_fps, native_fps)
-        active_fps = max(0.1, active_fps)
+        active_fps = max(0.1, min(active_fps, native_fps))
         idle_fps = max(0.1, min(idle_fps, active_fps))
 
-        state = {"bg": None}
-        motion_active = False
-        motion_count = 0
-        motion_last_seen = 0.0
-        last_capture = 0.0
-        clip_hold_until = 0.0
-        clip_start_ts = 0.0
-        writer = None
-        clip_path: Optional[Path] = None
-        clip_start_stamp: Optional[datetime] = None
-        last_box = None
-
         start_frames = int(config.get("start_frames", 6) or 6)
         stop_seconds = float(config.get("stop_seconds", 5.0) or 5.0)
-        clip_fps = float(config.get("clip_fps", 6.0) or 6.0)
-        if native_fps > 0:
-            clip_fps = native_fps
-        clip_fps = max(0.1, clip_fps)
+        clip_hold = float(config.get("clip_hold_seconds", 6.0) or 6.0)
+        min_clip = float(config.get("clip_min_seconds", 2.0) or 2.0)
         capture_interval = float(config.get("motion_capture_seconds", 3.0) or 3.0)
         capture_interval = max(0.1, capture_interval)
 
-        frame_index = 0
+        frame_index = scan.next_frame
         try:
-            while True:
+            seek_capture(cap, frame_index, native_fps, index)
+            while stop_frame is None or frame_index < stop_frame:
                 ok, frame = cap.read()
                 if not ok or frame is None:
                     break
-                frame_ts = frame_index / native_fps if native_fps > 0 else 0.0
-                stamp = base_stamp + timedelta(seconds=frame_ts)
-                boost = motion_active or (
-                    motion_last_seen > 0 and (frame_ts - motion_last_seen) < boost_seconds
+                frame_ts = frame_index / native_fps
+                scan.frame_ts = frame_ts
+                stamp = self._stamp_at(scan, frame_ts)
+                scan.frame_size = (frame.shape[1], frame.shape[0])
+                boost = scan.motion_active or (
+                    scan.motion_last_seen > 0
+                    and (frame_ts - scan.motion_last_seen) < boost_seconds
                 )
                 target_fps = active_fps if boost else idle_fps
-                detect_stride = max(1, int(round(native_fps / target_fps))) if target_fps > 0 else 1
-                do_detect = (frame_index % detect_stride) == 0
-
-                merged_box = None
-                if do_detect:
-                    motion_frame, motion_scale = self._scale_motion_frame(frame, config)
-                    ensure_motion(state, config)
-                    boxes, _ = apply_motion(motion_frame, state, config)
-                    merged_box = self._merge_boxes(boxes)
-                    if merged_box and motion_scale < 1.0:
-                        merged_box = self._scale_box_to_frame(
-                            merged_box, motion_scale, frame
+                detect_stride = max(1, int(round(native_fps / target_fps)))
+
+                motion_frame, motion_scale = self._scale_motion_frame(frame, config)
+                ensure_motion(scan.state, config)
+                boxes, _ = apply_motion(motion_frame, scan.state, config)
+                merged_box = self._merge_boxes(boxes)
+                if merged_box and motion_scale < 1.0:
+                    merged_box = self._scale_box_to_frame(merged_box, motion_scale, frame)
+                if merged_box:
+                    scan.motion_count += 1
+                    scan.motion_last_seen = frame_ts
+                    if not scan.motion_active and scan.motion_count >= start_frames:
+                        scan.motion_active = True
+                else:
+                    scan.motion_count = 0
+                    if scan.motion_active and (frame_ts - scan.motion_last_seen) >= stop_seconds:
+                        scan.motion_active = False
+
+                if scan.motion_active:
+                    if frame_ts - scan.last_capture >= capture_interval:
+                        scan.last_capture = frame_ts
+                        self._save_capture(
+                            scan.camera_name, frame, merged_box, stamp, source=source
                         )
-                    last_box = merged_box
-                    if merged_box:
-                        motion_count += 1
-                        motion_last_seen = frame_ts
-                        if not motion_active and motion_count >= start_frames:
-                            motion_active = True
-                    else:
-                        motion_count = 0
-                        if motion_active and (frame_ts - motion_last_seen) >= stop_seconds:
-                            motion_active = False
-
-                if motion_active:
-                    self._draw_motion_labels(frame)
-                    if last_box:
-                        self._draw_motion_box(frame, last_box)
-                    if frame_ts - last_capture >= capture_interval:
-                        last_capture = frame_ts
-                        self._save_capture(camera_name, frame, stamp)
-
-                if writer is not None and motion_active:
-                    writer.write(frame)
-
-                if motion_active and writer is None:
-                    clip_start_stamp = stamp
-                    clip_start_ts = frame_ts
-                    clip_path, writer = self._open_clip_writer(
-                        camera_name, stamp, clip_fps, frame
-                    )
-
-                if not motion_active and writer is not None:
-                    clip_hold = float(config.get("clip_hold_seconds", 6.0) or 6.0)
-                    if clip_hold_until == 0.0:
-                        clip_hold_until = frame_ts + clip_hold
-                    if frame_ts >= clip_hold_until:
-                        min_clip = float(config.get("clip_min_seconds", 2.0) or 2.0)
-                        if clip_start_ts and (frame_ts - clip_start_ts) < min_clip:
-                            self._close_clip(writer, clip_path, clip_start_stamp, stamp, keep=False)
-                        else:
-                            self._close_clip(writer, clip_path, clip_start_stamp, stamp, keep=True)
-                        writer = None
-                        clip_path = None
-                        clip_start_stamp = None
-                        clip_hold_until = 0.0
-                        clip_start_ts = 0.0
-
-                if not boost and not motion_active:
-                    for _ in range(detect_stride - 1):
-                        if not cap.grab():
-                            break
-                        frame_index += 1
+                    if scan.event is None:
+                        scan.event = _MotionEvent(frame_ts)
+                    scan.clip_hold_until = 0.0
+                if scan.event is not None and merged_box:
+                    scan.event.boxes.append((frame_ts, merged_box))
+
+                if not scan.motion_active and scan.event is not None:
+                    if scan.clip_hold_until == 0.0:
+                        scan.clip_hold_until = frame_ts + clip_hold
+                    if frame_ts >= scan.clip_hold_until:
+                        scan.event.end_ts = frame_ts
+                        if frame_ts - scan.event.start_ts >= min_clip:
+                            scan.events.append(scan.event)
+                        scan.event = None
+                        scan.clip_hold_until = 0.0
+
+                # Clips are cut from the source afterwards, so only the
+                # frames motion detection looks at need decoding.
+                skip = detect_stride - 1
+                if stop_frame is not None:
+                    skip = min(skip, stop_frame - frame_index - 1)
+                for _ in range(skip):
+                    if not cap.grab():
+                        break
+                    frame_index += 1
                 frame_index += 1
         finally:
             cap.release()
-            if writer is not None:
-                self._close_clip(writer, clip_path, clip_start_stamp, datetime.now(), keep=True)
+        if frame_index > scan.next_frame:
+            scan.next_frame = frame_index
+            scan.last_progress = time.monotonic()
+
+    def _extract_events(
+        self, scan: _SegmentScan, source: Path, index: Optional[SegmentIndex], codec: str
+    ) -> None:
+        if not scan.events:
+            return
+        config = get_motion_config()
+        pre_roll = max(0.0, float(config.get("clip_pre_roll_seconds", 5.0) or 0.0))
+        for event in scan.events:
+            if self._extract_clip(scan, source, event, pre_roll, index, codec):
+                scan.clip_count += 1
+        scan.events.clear()
+
+    def _stamp_at(self, scan: _SegmentScan, seconds: float) -> datetime:
+        """Wall clock of media time ``seconds``; motion-mode segments skip idle time."""
+        wall = scan.timeline.wall_for_time(seconds) if scan.timeline is not None else None
+        if wall is None:
+            return scan.base_stamp + timedelta(seconds=seconds)
+        return datetime.fromtimestamp(wall)
+
+    def _scan_key(self, path: Path) -> Optional[tuple[str, datetime]]:
+        # Open and finalized names share the camera directory and start stamp.
+        stamp = self._parse_stamp(path)
+        return (path.parent.name, stamp) if stamp is not None else None
 
     def _scale_motion_frame(self, frame, config: dict):
         scale = float(config.get("motion_scale", 0.1) or 0.1)
@@ -251,58 +434,103 @@ class OfflineMotionManager:
                 return candidate
         return path
 
-    def _open_clip_writer(
-        self, camera_name: str, stamp: datetime, fps: float, frame
-    ) -> tuple[Optional[Path], Optional[cv2.VideoWriter]]:
-        out_dir = self._build_clip_dir(camera_name, stamp)
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = self._unique_path(out_dir / self._build_clip_name(camera_name, stamp, suffix=".mp4"))
-        h, w = frame.shape[:2]
-        codec_options = ["mp4v"]
-        for codec in codec_options:
-            fourcc = cv2.VideoWriter_fourcc(*codec)
-            try:
-                writer = cv2.VideoWriter(str(out_path), cv2.CAP_FFMPEG, fourcc, fps, (w, h))
-            except TypeError:
-                writer = cv2.VideoWriter(str(out_path), fourcc, fps, (w, h))
-            if writer is not None and writer.isOpened():
-                return out_path, writer
-        return None, None
-
-    def _close_clip(
+    def _extract_clip(
         self,
-        writer: cv2.VideoWriter,
-        clip_path: Optional[Path],
-        start: Optional[datetime],
-        end: datetime,
-        keep: bool = True,
-    ) -> None:
-        try:
-            writer.release()
-        except Exception:
-            pass
-        if clip_path is None or start is None:
-            return
-        if not keep:
-            try:
-                clip_path.unlink()
-            except Exception:
-                pass
-            return
-        target = clip_path.with_name(self._build_clip_name(clip_path.parent.name, start, end))
-        target = self._unique_path(target)
+        scan: _SegmentScan,
+        source: Path,
+        event: _MotionEvent,
+        pre_roll: float,
+        index: Optional[SegmentIndex],
+        codec: str,
+    ) -> bool:
+        """Cut one event out of ``source`` by stream copy, with its boxes as an overlay."""
+        start_s = max(0.0, event.start_ts - pre_roll)
+        entry = index.entry_before_time(start_s) if index is not None else None
+        if entry is not None:
+            start_s = entry.pts_ms / 1000.0
+        else:
+            # The copy starts at the keyframe ffmpeg seeks to; time the
+            # overlay and the name from there, not from the requested start.
+            keyframe_s = probe_seek_keyframe(source, start_s)
+            if keyframe_s is not None and keyframe_s <= start_s:
+                start_s = keyframe_s
+        end_s = max(event.end_ts, start_s + 0.1)
+        camera_name = scan.camera_name
+        start = self._stamp_at(scan, start_s)
+        end = self._stamp_at(scan, end_s)
+        out_dir = self._build_clip_dir(camera_name, start)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        out_path = self._unique_path(
+            out_dir / self._build_clip_name(camera_name, start, end, suffix=source.suffix)
+        )
+        if not extract_clip(source, out_path, start_s, end_s - start_s, codec=codec):
+            if find_ffmpeg():
+                return False
+            # No ffmpeg: fall back to re-encoding the range with OpenCV.
+            out_path = out_path.with_suffix(".mp4")
+            if not self._reencode_clip(source, out_path, start_s, end_s):
+                return False
+            codec = "mpeg4"
+        overlay = MotionOverlay(scan.frame_size, hold_s=max(1.0, 2.0 * self._detect_gap(event)))
+        for ts, box in event.boxes:
+            if start_s <= ts <= end_s:
+                overlay.add(ts - start_s, box)
+        overlay.save(out_path)
+        catalog_add(
+            out_path,
+            KIND_MOTION_CLIP,
+            camera_name,
+            start,
+            end=end,
+            codec=codec,
+            source_path=source,
+        )
+        self.logger.info("Motion clip saved: %s", out_path.name)
+        return True
+
+    def _detect_gap(self, event: "_MotionEvent") -> float:
+        times = [ts for ts, _box in event.boxes]
+        gaps = [b - a for a, b in zip(times, times[1:]) if b > a]
+        return min(gaps) if gaps else 0.5
+
+    def _reencode_clip(self, source: Path, out_path: Path, start_s: float, end_s: float) -> bool:
+        cap = cv2.VideoCapture(str(source))
+        if not cap.isOpened():
+            return False
+        writer = None
         try:
-            if clip_path.exists():
-                clip_path.rename(target)
-        except Exception:
-            target = clip_path
-        # mp4v writer already outputs mp4
+            fps = cap.get(cv2.CAP_PROP_FPS) or 15.0
+            cap.set(cv2.CAP_PROP_POS_MSEC, start_s * 1000.0)
+            for _ in range(int((end_s - start_s) * fps) + 1):
+                ok, frame = cap.read()
+                if not ok or frame is None:
+                    break
+                if writer is None:
+                    h, w = frame.shape[:2]
+                    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+                    writer = cv2.VideoWriter(str(out_path), fourcc, fps, (w, h))
+                    if not writer.isOpened():
+                        return False
+                writer.write(frame)
+        finally:
+            cap.release()
+            if writer is not None:
+                writer.release()
+        return out_path.exists()
 
-    def _save_capture(self, camera_name: str, frame, stamp: datetime) -> None:
+    def _save_capture(
+        self, camera_name: str, frame, box, stamp: datetime, source: Optional[Path] = None
+    ) -> None:
         capture_dir = motion_capture_dir_for(camera_name, stamp)
         capture_dir.mkdir(parents=True, exist_ok=True)
         filename = f"{camera_name} motion {stamp:%d-%m-%Y %Hh%Mm%Ss}.jpg"
-        cv2.imwrite(str(capture_dir / filename), frame)
+        capture_path = capture_dir / filename
+        # Stills keep their labels; clips carry boxes as an overlay sidecar.
+        frame = frame.copy()
+        self._draw_motion_labels(frame)
+        self._draw_motion_box(frame, box)
+        if cv2.imwrite(str(capture_path), frame):
+            catalog_add(capture_path, KIND_CAPTURE, camera_name, stamp, source_path=source)
 
     def _draw_motion_labels(self, frame) -> None:
         self._draw_label(frame, "Mode: motion on", 10, 30, bg=(0, 0, 0), fg=(255, 255, 255))
@@ -0,0 +1,183 @@
+import collections
+import logging
+import threading
+import time
+from fractions import Fraction
+from pathlib import Path
+from typing import Callable, Deque, Dict, Optional
+
+from app.storage.segment_index import SegmentIndexWriter, TsKeyframeTail
+
+try:
+    import av
+except Exception:
+    av = None
+
+PacketSink = Callable[[object], None]
+
+
+def packets_available() -> bool:
+    return av is not None
+
+
+class PacketHub:
+    """Fan-out point for the compressed packets of one camera session.
+
+    The demuxing worker publishes every packet here; sinks (the stream-copy
+    recorder, pre-event buffers) receive the same packet object and must
+    treat it as read-only. ``video_stream``/``audio_stream`` hold the input
+    streams of the current session so sinks can create matching outputs.
+    """
+
+    def __init__(self, camera_name: str) -> None:
+        self.camera_name = camera_name
+        self._lock = threading.Lock()
+        self._sinks: Dict[str, PacketSink] = {}
+        self._session = 0
+        self.video_stream = None
+        self.audio_stream = None
+        self.logger = logging.getLogger(f"PacketHub[{camera_name}]")
+
+    @property
+    def session(self) -> int:
+        """Incremented on every reconnect; sinks must reopen outputs when it changes."""
+        return self._session
+
+    def add_sink(self, name: str, sink: PacketSink) -> None:
+        with self._lock:
+            self._sinks[name] = sink
+
+    def remove_sink(self, name: str) -> None:
+        with self._lock:
+            self._sinks.pop(name, None)
+
+    def has_sinks(self) -> bool:
+        with self._lock:
+            return bool(self._sinks)
+
+    def open_session(self, video_stream, audio_stream=None) -> None:
+        with self._lock:
+            self.video_stream = video_stream
+            self.audio_stream = audio_stream
+            self._session += 1
+
+    def close_session(self) -> None:
+        with self._lock:
+            self.video_stream = None
+            self.audio_stream = None
+
+    def publish(self, packet) -> None:
+        with self._lock:
+            sinks = list(self._sinks.items())
+        for name, sink in sinks:
+            try:
+                sink(packet)
+            except Exception:
+                self.logger.exception("Packet sink %s failed", name)
+
+
+class PacketMuxer:
+    """Writes copied packets from a PacketHub session into one output file.
+
+    Output starts at the first video keyframe and every stream is rebased by
+    that keyframe's time, rescaled to its own time base, so audio keeps its
+    sync with video; every video keyframe is recorded in the segment index, with its
+    byte offset once the muxer has flushed it to the file. Audio is
+    only carried when the container accepts it without transcoding (AAC);
+    everything else is video-only.
+    """
+
+    def __init__(self, path: Path, hub: PacketHub, container_format: str = "mpegts") -> None:
+        if av is None:
+            raise RuntimeError("PyAV is not installed")
+        if hub.video_stream is None:
+            raise RuntimeError(f"No active packet session for {hub.camera_name}")
+        self.path = path
+        self.session = hub.session
+        self._container = av.open(str(path), mode="w", format=container_format)
+        self._streams: Dict[int, object] = {}
+        self._origin: Optional[Fraction] = None
+        self._offsets: Dict[int, int] = {}
+        self._started = False
+        self._video_packets = 0
+        self._index = SegmentIndexWriter(path, float(hub.video_stream.average_rate or 0))
+        self._keyframe_tail = TsKeyframeTail(path) if container_format == "mpegts" else None
+        self._pending_keyframes: Deque[int] = collections.deque()
+        self._add_stream(hub.video_stream)
+        audio = hub.audio_stream
+        if audio is not None and audio.codec_context.name == "aac":
+            self._add_stream(audio)
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def _add_stream(self, template) -> None:
+        if hasattr(self._container, "add_stream_from_template"):
+            stream = self._container.add_stream_from_template(template)
+        else:
+            stream = self._container.add_stream(template=template)
+        self._streams[template.index] = stream
+
+    def write(self, packet) -> bool:
+        """Mux ``packet``; returns False while still waiting for a keyframe."""
+        out_stream = self._streams.get(packet.stream.index)
+        if out_stream is None or packet.dts is None:
+            return False
+        if not self._started:
+            if packet.stream.type != "video" or not packet.is_keyframe:
+                return False
+            self._started = True
+            self._origin = Fraction(packet.dts) * packet.time_base
+        offset = self._offsets.get(packet.stream.index)
+        if offset is None:
+            offset = round(self._origin / packet.time_base)
+            self._offsets[packet.stream.index] = offset
+        if packet.dts < offset:
+            # Audio from before the first video keyframe.
+            return False
+        out = av.Packet(bytes(packet))
+        out.dts = packet.dts - offset
+        out.pts = packet.pts - offset if packet.pts is not None else out.dts
+        out.time_base = packet.time_base
+        if packet.is_keyframe:
+            try:
+                out.is_keyframe = True
+            except AttributeError:
+                pass
+        out.stream = out_stream
+        if packet.stream.type == "video":
+            if packet.is_keyframe:
+                self._fill_keyframe_offsets()
+                record = self._index.add(
+                    self._video_packets,
+                    float(out.pts * packet.time_base),
+                    time.time(),
+                    keyframe=True,
+                )
+                if self._keyframe_tail is not None:
+                    self._pending_keyframes.append(record)
+            self._video_packets += 1
+        self._container.mux(out)
+        return True
+
+    def close(self) -> None:
+        try:
+            self._container.close()
+        except Exception:
+            logging.getLogger("PacketMuxer").exception("Failed to close %s", self.path)
+        self._fill_keyframe_offsets()
+        if self._keyframe_tail is not None:
+            self._keyframe_tail.close()
+        self._index.close()
+
+    def _fill_keyframe_offsets(self) -> None:
+        # Keyframes reach the file in mux order, so the n-th one found is
+        # the n-th pending record.
+        if self._keyframe_tail is None:
+            return
+        for offset, _pts in self._keyframe_tail.poll():
+            if not self._pending_keyframes:
+                break
+            self._index.set_byte_offset(self._pending_keyframes.popleft(), offset)
+
@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from app.config.models import CameraConfig, CameraRuntimeState
+from app.core.camera_worker import CameraWorker
+from app.core.frame_store import FrameStore
+from app.core.packet_hub import PacketHub, av
+from app.utils.rtsp import build_rtsp_url
+
+
+class PacketCameraWorker(CameraWorker):
+    """Demux-once ingest: one RTSP session feeds both packets and frames.
+
+    Every packet goes to the camera's PacketHub (stream-copy recording);
+    video is only decoded while some FrameStore consumer needs frames.
+    """
+
+    def __init__(
+        self,
+        config: CameraConfig,
+        runtime: CameraRuntimeState,
+        frame_store: FrameStore,
+        stop_event: threading.Event,
+        packet_hub: PacketHub,
+        min_backoff_s: float = 0.5,
+        max_backoff_s: float = 30.0,
+        status_callback: Optional[Callable[[str, str], None]] = None,
+        target_fps: float = 0.0,
+        decode_enabled: bool = True,
+    ) -> None:
+        super().__init__(
+            config=config,
+            runtime=runtime,
+            frame_store=frame_store,
+            stop_event=stop_event,
+            min_backoff_s=min_backoff_s,
+            max_backoff_s=max_backoff_s,
+            status_callback=status_callback,
+            target_fps=target_fps,
+        )
+        self.packet_hub = packet_hub
+        self._decode_enabled = bool(decode_enabled)
+
+    def set_decode_enabled(self, enabled: bool) -> None:
+        self._decode_enabled = bool(enabled)
+
+    def _open_container(self):
+        url = build_rtsp_url(self.config)
+        self.logger.info("Connecting to %s (packet ingest)", url)
+        return av.open(
+            url,
+            options={"rtsp_transport": "tcp"},
+            timeout=(10.0, 5.0),
+        )
+
+    def run(self) -> None:
+        backoff = self._min_backoff_s
+        while not self.stop_event.is_set():
+            try:
+                container = self._open_container()
+                video = container.streams.video[0]
+            except Exception as exc:
+                self.set_status("Offline", "Open failed")
+                self._reconnect_attempts += 1
+                self.logger.warning(
+                    "Open failed (%s); retry #%s in %.1fs",
+                    exc,
+                    self._reconnect_attempts,
+                    backoff,
+                )
+                backoff = self._sleep_backoff(backoff)
+                continue
+
+            audio = container.streams.audio[0] if container.streams.audio else None
+            self.packet_hub.open_session(video, audio)
+            self.set_status("Online")
+            backoff = self._min_backoff_s
+            self._reconnect_attempts = 0
+            try:
+                self._demux(container, video, audio)
+            except Exception as exc:
+                if not self.stop_event.is_set():
+                    self.set_status("Offline", "Read failed")
+                    self._reconnect_attempts += 1
+                    self.logger.warning(
+                        "Demux failed (%s); reconnect #%s", exc, self._reconnect_attempts
+                    )
+            finally:
+                self.packet_hub.close_session()
+                try:
+                    container.close()
+                except Exception:
+                    pass
+            if not self.stop_event.is_set():
+                backoff = self._sleep_backoff(backoff)
+
+    def _demux(self, container, video, audio) -> None:
+        streams = [video] + ([audio] if audio is not None else [])
+        next_due = 0.0
+        # After decoding was off the decoder has no reference frames; wait
+        # for a keyframe instead of publishing smeared frames.
+        decoding = False
+        for packet in container.demux(*streams):
+            if self.stop_event.is_set():
+                return
+            if packet.dts is None:
+                continue
+            if packet.stream.type == "video":
+                self.runtime.last_frame_ts = time.time()
+                if not self._decode_enabled:
+                    decoding = False
+                elif decoding or packet.is_keyframe:
+                    decoding = True
+                    next_due = self._decode(packet, next_due)
+            self.packet_hub.publish(packet)
+
+    def _decode(self, packet, next_due: float) -> float:
+        for frame in packet.decode():
+            now = time.time()
+            if not self._frame_due(now, next_due):
+                continue
+            next_due = self._next_due(now, next_due)
+            self.frame_store.set_frame(
+                self.config.name, frame.to_ndarray(format="bgr24"), now
+            )
+        return next_due
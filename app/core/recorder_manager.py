@@ -1,16 +1,30 @@
+import functools
 import logging
 import queue
 import threading
 import time
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, List
 
 from app.config.models import AppConfig, CameraConfig
+from app.core.finalize_service import FinalizeJob, FinalizeService
 from app.core.offline_motion_manager import OfflineMotionManager
+from app.core.packet_hub import PacketHub
 from app.core.recorder_worker import RecorderWorker
 from app.core.stream_manager import StreamManager
 from app.core.frame_store import FrameStore
-from app.storage.maintenance import prune_old_videos
+from app.storage.disk_monitor import DiskMonitor
+from app.storage.catalog import KIND_RECORDING, catalog_add
+from app.storage.quota import StorageQuota
+from app.storage.recovery import (
+    RecoveredSegment,
+    iter_finished_segments,
+    recover_in_progress_segments,
+)
+from app.storage.retention import RetentionEngine
+from app.utils.ffmpeg import probe_video_codec
+from app.utils.paths import get_videos_dir
 
 
 @dataclass
@@ -42,35 +56,81 @@ class RecorderManager:
         self._workers: Dict[str, RecorderWorker] = {}
         self._stop_events: Dict[str, threading.Event] = {}
         self._jobs: Dict[str, RecorderJob] = {}
+        self._stream_reasons: Dict[str, str] = {}
         self._stop_queue: "queue.Queue[str | None]" = queue.Queue()
         self._stop_worker = threading.Thread(target=self._stop_loop, daemon=True)
         self._stop_worker.start()
-        self._maint_stop = threading.Event()
-        self._maint_thread = threading.Thread(target=self._maintenance_loop, daemon=True)
-        self._maint_thread.start()
+        self._camera_quota_gb: Dict[str, float] = {}
+        self._storage_quota = StorageQuota(
+            camera_budget_gb=lambda name: self._camera_quota_gb.get(name)
+            or self.app_config.quota_camera_gb,
+            global_budget_gb=lambda: self.app_config.quota_global_gb,
+        )
+        self._retention = RetentionEngine(
+            days_keep=lambda: self.app_config.days_keep,
+            enabled=lambda: self.app_config.enable_retention,
+            interval_s=getattr(app_config, "retention_interval_s", 3600),
+            on_deleted=self._storage_quota.forget_under,
+        )
+        self._retention.start()
         self._offline_motion = (
-            OfflineMotionManager(getattr(app_config, "motion_offline_workers", 1))
+            OfflineMotionManager(
+                getattr(app_config, "motion_offline_workers", 1),
+                follow_interval_s=getattr(app_config, "motion_follow_interval_s", 5.0),
+            )
             if getattr(app_config, "motion_offline", False)
             else None
         )
+        self._disk_monitor = DiskMonitor(
+            [get_videos_dir()],
+            interval_s=getattr(app_config, "disk_monitor_interval_s", 5.0),
+            min_free_gb=app_config.min_free_gb if app_config.enable_disk_check else 0,
+        )
+        self._disk_monitor.add_low_space_listener(
+            lambda _root, free_gb, min_gb: self._handle_disk_warning(free_gb, min_gb)
+        )
+        self._disk_monitor.add_low_space_listener(
+            lambda _root, _free_gb, _min_gb: self._retention.request_run()
+        )
+        self._disk_monitor.add_low_space_listener(self._evict_for_free_space)
+        self._disk_monitor.start()
+        self._finalize_service = FinalizeService(
+            workers=getattr(app_config, "finalize_workers", 1),
+            max_pending=getattr(app_config, "finalize_queue_size", 32),
+        )
+        self._recovery_thread = threading.Thread(
+            target=self._recover_segments, args=(time.time(),), daemon=True
+        )
+        self._recovery_thread.start()
+
+    @property
+    def disk_monitor(self) -> DiskMonitor:
+        return self._disk_monitor
+
+    @property
+    def storage_quota(self) -> StorageQuota:
+        return self._storage_quota
 
     def is_motion_available(self) -> bool:
         return self._offline_motion is not None
 
     def start(self, camera: CameraConfig) -> None:
+        reason, packet_hub = self._stream_reason(camera.name)
         with self._lock:
             if camera.name in self._workers:
                 raise ValueError("Recorder already running for this camera")
             stop_event = threading.Event()
-            worker = self._create_worker(camera, stop_event)
+            worker = self._create_worker(camera, stop_event, packet_hub)
             self._stop_events[camera.name] = stop_event
             self._workers[camera.name] = worker
             self._jobs[camera.name] = self._create_job(camera.name)
-        if (
-            self._stream_manager is not None
-            and getattr(self.app_config, "record_backend", "opencv") != "ffmpeg_copy"
-        ):
-            self._stream_manager.acquire(camera.name, "record")
+            self._camera_quota_gb[camera.name] = float(camera.quota_gb or 0.0)
+            if reason:
+                self._stream_reasons[camera.name] = reason
+        if reason:
+            self._stream_manager.acquire(
+                camera.name, reason, fps=float(self.app_config.fps_record or 0)
+            )
         self._start_worker(worker, camera.name)
 
     def stop(self, camera_name: str) -> None:
@@ -84,17 +144,15 @@ class RecorderManager:
             event = self._stop_events.pop(camera_name, None)
             worker = self._workers.pop(camera_name, None)
             job = self._jobs.pop(camera_name, None)
+            reason = self._stream_reasons.pop(camera_name, None)
         if event:
             event.set()
         if worker:
             worker.join(timeout=2)
         if job:
             job.status = "Stopped"
-        if (
-            self._stream_manager is not None
-            and getattr(self.app_config, "record_backend", "opencv") != "ffmpeg_copy"
-        ):
-            self._stream_manager.release(camera_name, "record")
+        if reason and self._stream_manager is not None:
+            self._stream_manager.release(camera_name, reason)
 
     def list_active(self) -> List[str]:
         with self._lock:
@@ -125,8 +183,9 @@ class RecorderManager:
             self.stop(name)
         self._stop_queue.put(None)
         self._stop_worker.join(timeout=2)
-        self._maint_stop.set()
-        self._maint_thread.join(timeout=2)
+        self._retention.stop()
+        self._finalize_service.shutdown()
+        self._disk_monitor.stop()
         if self._offline_motion is not None:
             self._offline_motion.shutdown()
 
@@ -140,19 +199,79 @@ class RecorderManager:
             finally:
                 self._stop_queue.task_done()
 
-    def _maintenance_loop(self) -> None:
-        while not self._maint_stop.is_set():
-            try:
-                if self.app_config.enable_retention:
-                    deleted = prune_old_videos(self.app_config.days_keep)
-                    if deleted:
-                        self.logger.info("Retention deleted %s files", deleted)
-            except Exception:
-                self.logger.exception("Retention cleanup failed")
-            self._maint_stop.wait(3600)
+    def _recover_segments(self, started_before: float) -> None:
+        """Close out segments a previous run left open (crash, power cut).
+
+        Finished segments the catalog never saw are counted for the storage
+        quota first.
+        """
+        try:
+            self._storage_quota.backfill(iter_finished_segments(started_before))
+        except Exception:
+            self.logger.exception("Recording backfill failed")
+        try:
+            segments = recover_in_progress_segments(
+                getattr(self.app_config, "recovery_scan_days", 2), started_before
+            )
+        except Exception:
+            self.logger.exception("Recovery scan failed")
+            return
+        for segment in segments:
+            if segment.path.suffix != ".ts":
+                self._on_segment_recovered(segment, "", segment.path, False)
+                continue
+            codec = probe_video_codec(segment.path) or ""
+            transcode = codec not in ("h264", "hevc")
+            self._finalize_service.submit(
+                FinalizeJob(
+                    segment.path,
+                    transcode=transcode,
+                    on_done=functools.partial(self._on_segment_recovered, segment, codec),
+                )
+            )
+        if segments:
+            self.logger.info("Recovered %s orphaned segments", len(segments))
+
+    def _on_segment_recovered(
+        self, segment: RecoveredSegment, codec: str, path: Path, remuxed: bool
+    ) -> None:
+        if remuxed and codec not in ("h264", "hevc"):
+            codec = "h264"
+        catalog_add(
+            path, KIND_RECORDING, segment.camera, segment.start, end=segment.end, codec=codec
+        )
+        self._storage_quota.add(segment.camera, path, segment.end)
+        if remuxed and self.tracking_manager is not None:
+            self.tracking_manager.enqueue(path)
+        if self._offline_motion is not None and self.app_config.motion_offline:
+            self._offline_motion.enqueue(path)
+
+    def _stream_reason(self, camera_name: str) -> tuple[str | None, PacketHub | None]:
+        """StreamManager reason for a recorder plus its packet source, if any.
+
+        The ffmpeg_copy backend normally opens its own RTSP session; with
+        demux-once ingest it records packets from the shared session instead.
+        """
+        if self._stream_manager is None:
+            return None, None
+        if getattr(self.app_config, "record_backend", "opencv") != "ffmpeg_copy":
+            return "record", None
+        packet_hub = self._stream_manager.packet_hub(camera_name)
+        if packet_hub is None:
+            return None, None
+        return "record_copy", packet_hub
+
+    def _clip_packet_hub(self, camera: CameraConfig) -> PacketHub | None:
+        """Packet source for motion clips with pre-roll (Motion mode, demux-once ingest)."""
+        if self._stream_manager is None or camera.mode.lower() != "motion":
+            return None
+        return self._stream_manager.packet_hub(camera.name)
 
     def _create_worker(
-        self, camera: CameraConfig, stop_event: threading.Event
+        self,
+        camera: CameraConfig,
+        stop_event: threading.Event,
+        packet_hub: PacketHub | None = None,
     ) -> RecorderWorker:
         return RecorderWorker(
             camera,
@@ -162,6 +281,11 @@ class RecorderManager:
             disk_warning_cb=self._handle_disk_warning,
             offline_motion_manager=self._offline_motion,
             frame_store=self._frame_store,
+            packet_hub=packet_hub,
+            finalize_service=self._finalize_service,
+            disk_monitor=self._disk_monitor,
+            storage_quota=self._storage_quota,
+            clip_packet_hub=self._clip_packet_hub(camera),
         )
 
     def _create_job(self, camera_name: str) -> RecorderJob:
@@ -175,6 +299,14 @@ class RecorderManager:
         worker.start()
         self.logger.info("Recorder started for %s", camera_name)
 
+    def _evict_for_free_space(self, root, free_gb: float, min_gb: float) -> None:
+        # Called from the DiskMonitor thread; deleting the oldest segments
+        # keeps recorders writing instead of pausing on the disk quota.
+        if not self.app_config.enable_disk_quota:
+            return
+        gb = 1024 * 1024 * 1024
+        self._storage_quota.free_space(int(free_gb * gb), int(min_gb * gb))
+
     def _handle_disk_warning(self, free_gb: float, min_gb: float) -> None:
         if self._disk_warning_cb is None:
             return
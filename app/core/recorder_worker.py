@@ -1,20 +1,37 @@
+import csv
 import logging
 import os
 import subprocess
 import queue
 import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Callable
 
 import cv2
 
 from app.config.models import AppConfig, CameraConfig
-from app.core.frame_store import FrameStore
-from app.storage.layout import videos_dir_for
-from app.storage.maintenance import get_free_gb, has_min_free_gb
-from app.utils.ffmpeg import remux_ts_to_mp4, find_ffmpeg
+from app.core.encode_queue import EncodeQueue
+from app.core.ffmpeg_writer import FFmpegPipeWriter
+from app.core.finalize_service import FinalizeJob, FinalizeService
+from app.core.frame_store import FrameLevel, FrameStore
+from app.core.motion_clip_writer import MotionClipWriter
+from app.core.motion_detector import get_motion_config
+from app.core.motion_gate import MotionGate
+from app.core.packet_hub import PacketHub, PacketMuxer, packets_available
+from app.storage.catalog import KIND_RECORDING, catalog_add
+from app.storage.disk_monitor import DiskMonitor
+from app.storage.quota import StorageQuota
+from app.storage.segment_index import IndexedVideoWriter, retarget_sidecar, sidecar_path
+from app.storage.layout import (
+    recording_staging_dir_for,
+    rotation_offset_s,
+    segment_key,
+    videos_dir_for,
+)
+from app.storage.maintenance import get_free_gb
+from app.utils.ffmpeg import probe_video_codec, remux_ts_to_mp4, find_ffmpeg
 from app.utils.paths import get_videos_dir
 from app.utils.rtsp import build_rtsp_url
 try:
@@ -22,6 +39,18 @@ try:
 except Exception:
     PerfProbe = None
 
+_SEGMENT_STAMP = "%Y%m%d-%H%M%S"
+_SEGMENT_PATTERN = f"{_SEGMENT_STAMP}.ts"
+# OpenCV fourcc / encoder name -> codec name as ffmpeg reports it.
+_CATALOG_CODECS = {
+    "mp2v": "mpeg2video",
+    "H264": "h264",
+    "libx264": "h264",
+    "mp4v": "mpeg4",
+    "XVID": "mpeg4",
+    "MJPG": "mjpeg",
+}
+
 
 class RecorderWorker(threading.Thread):
     def __init__(
@@ -33,6 +62,11 @@ class RecorderWorker(threading.Thread):
         disk_warning_cb: Optional[Callable[[float, float], None]] = None,
         offline_motion_manager=None,
         frame_store: FrameStore | None = None,
+        packet_hub: PacketHub | None = None,
+        finalize_service: FinalizeService | None = None,
+        disk_monitor: DiskMonitor | None = None,
+        storage_quota: StorageQuota | None = None,
+        clip_packet_hub: PacketHub | None = None,
     ) -> None:
         super().__init__(daemon=True)
         self.camera = camera
@@ -46,15 +80,38 @@ class RecorderWorker(threading.Thread):
         self._last_fps_ts = time.time()
         self._motion_enabled = False
         self._disk_low_last_log = 0.0
-        self._frame_queue: "queue.Queue[cv2.Mat | None]" = queue.Queue(maxsize=8)
+        self._frame_queue: "queue.Queue[tuple[cv2.Mat, float]]" = queue.Queue(maxsize=8)
         self._capture_thread: Optional[threading.Thread] = None
         self._capture_stop = threading.Event()
         self._record_backend = getattr(app_config, "record_backend", "opencv")
         self._ffmpeg_proc: Optional[subprocess.Popen] = None
+        self._ffmpeg_backoff = 1.0
+        self._ffmpeg_started_ts = 0.0
+        self._segment_reader: Optional[threading.Thread] = None
+        self._segment_events: "queue.Queue[tuple[str, float, float]]" = queue.Queue()
         self._current_path: Optional[Path] = None
         self._current_start: Optional[datetime] = None
         self._frame_store = frame_store
-        self._last_shared_ts = 0.0
+        self._packet_hub = packet_hub
+        self._finalize_service = finalize_service
+        self._disk_monitor = disk_monitor
+        self._storage_quota = storage_quota
+        self._clip_packet_hub = clip_packet_hub
+        self._encoder: Optional[EncodeQueue] = None
+        self._writer_codec = ""
+        self._cfr_writer = None
+        self._cfr_origin = 0.0
+        self._cfr_written = 0
+        self._cfr_owed = 0
+        self._frame_ts = 0.0
+        self._last_shared_version = 0
+        segment_minutes = int(getattr(app_config, "record_segment_minutes", 60) or 60)
+        self._segment_s = max(1, segment_minutes) * 60
+        self._segment_offset_s = rotation_offset_s(
+            camera.name,
+            self._segment_s,
+            int(getattr(app_config, "record_rotation_stagger_s", 0) or 0),
+        )
         self._perf = None
         if PerfProbe is not None and os.environ.get("PERF_PROBE"):
             self._perf = PerfProbe(f"recorder_{camera.name}")
@@ -120,8 +177,9 @@ class RecorderWorker(threading.Thread):
                 cap.release()
                 cap = None
                 continue
+            item = (frame, time.time())
             try:
-                self._frame_queue.put_nowait(frame)
+                self._frame_queue.put_nowait(item)
                 if self._perf is not None:
                     self._perf.record_capture(decoded=1, queued=1)
             except queue.Full:
@@ -130,7 +188,7 @@ class RecorderWorker(threading.Thread):
                 except queue.Empty:
                     pass
                 try:
-                    self._frame_queue.put_nowait(frame)
+                    self._frame_queue.put_nowait(item)
                     if self._perf is not None:
                         self._perf.record_capture(decoded=1, queued=1, dropped=1)
                 except queue.Full:
@@ -140,6 +198,9 @@ class RecorderWorker(threading.Thread):
         if cap is not None:
             cap.release()
 
+    def _segment_key(self, stamp: datetime) -> int:
+        return segment_key(stamp, self._segment_s, self._segment_offset_s)
+
     def _build_output_path(self, now: datetime, suffix: str) -> Path:
         base = self._build_output_dir(now)
         filename = self._build_filename(now, suffix=suffix)
@@ -176,10 +237,17 @@ class RecorderWorker(threading.Thread):
         self, frame_width: int, frame_height: int, fps: float, now: datetime
     ) -> cv2.VideoWriter:
         self._build_output_dir(now).mkdir(parents=True, exist_ok=True)
+        if self._record_backend == "ffmpeg_pipe":
+            writer = self._open_pipe_writer(frame_width, frame_height, fps, now)
+            if writer is not None:
+                return IndexedVideoWriter(
+                    writer, writer.path, fps, keyframe_interval=writer.gop
+                )
         codec_options = [
             ("mp2v", ".ts"),
             ("H264", ".ts"),
-            ("mp4v", ".mp4"),
+            # MPEG-TS rather than .mp4: no trailing index to lose on a crash.
+            ("mp4v", ".ts"),
             ("XVID", ".avi"),
             ("MJPG", ".avi"),
         ]
@@ -189,11 +257,35 @@ class RecorderWorker(threading.Thread):
             writer = self._try_open_writer(out_path, fourcc, fps, frame_width, frame_height)
             if writer is not None and writer.isOpened():
                 self.logger.info("VideoWriter codec: %s (%s)", codec, out_path.suffix)
+                self._writer_codec = codec
                 self._current_path = out_path
                 self._current_start = now
-                return writer
+                indexed = IndexedVideoWriter(writer, out_path, fps)
+                self._follow_offline_motion(out_path)
+                return indexed
         return cv2.VideoWriter()
 
+    def _open_pipe_writer(
+        self, frame_width: int, frame_height: int, fps: float, now: datetime
+    ) -> Optional[FFmpegPipeWriter]:
+        out_path = self._build_output_path(now, ".mp4")
+        writer = FFmpegPipeWriter(
+            out_path,
+            fps,
+            (frame_width, frame_height),
+            preset=getattr(self.app_config, "record_x264_preset", "veryfast"),
+            crf=int(getattr(self.app_config, "record_x264_crf", 23)),
+            threads=int(getattr(self.app_config, "record_x264_threads", 0)),
+        )
+        if not writer.isOpened():
+            self.logger.warning("ffmpeg pipe writer failed; falling back to OpenCV codecs")
+            return None
+        self.logger.info("VideoWriter: ffmpeg libx264 pipe (%s)", out_path.suffix)
+        self._writer_codec = "libx264"
+        self._current_path = out_path
+        self._current_start = now
+        return writer
+
     def _try_open_writer(
         self,
         out_path: Path,
@@ -215,16 +307,17 @@ class RecorderWorker(threading.Thread):
                 str(out_path), fourcc, fps, (frame_width, frame_height)
             )
 
-    def _start_ffmpeg_recording(self, out_path: Path) -> Optional[subprocess.Popen]:
+    def _start_ffmpeg_recording(self, staging_dir: Path) -> Optional[subprocess.Popen]:
         ffmpeg = find_ffmpeg()
         if not ffmpeg:
             self.logger.warning("ffmpeg not found; cannot use ffmpeg_copy backend")
             return None
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        target_kbps = int(getattr(self.app_config, "record_bitrate_kbps", 4000) or 4000)
-        maxrate_kbps = max(1, int(target_kbps * 1.1))
-        bufsize_kbps = max(1, int(target_kbps * 2))
-        fps = max(1, int(getattr(self.app_config, "fps_record", 15) or 15))
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        # The segment muxer expands strftime codes in the whole path.
+        pattern = str(staging_dir).replace("%", "%%") + os.sep + _SEGMENT_PATTERN
+        # Video packets are copied untouched; only the (small) audio track is
+        # converted because G.711 from cameras cannot be muxed into MPEG-TS.
+        # Completed segments are reported as CSV lines on stdout.
         cmd = [
             ffmpeg,
             "-hide_banner",
@@ -235,44 +328,66 @@ class RecorderWorker(threading.Thread):
             "-i",
             self._build_rtsp_url(),
             "-map",
-            "0",
+            "0:v:0",
+            "-map",
+            "0:a:0?",
             "-c:v",
-            "libx265",
-            "-preset",
-            "veryfast",
-            "-pix_fmt",
-            "yuv420p",
-            "-b:v",
-            f"{target_kbps}k",
-            "-maxrate",
-            f"{maxrate_kbps}k",
-            "-bufsize",
-            f"{bufsize_kbps}k",
-            "-fps_mode",
-            "cfr",
-            "-r",
-            str(fps),
+            "copy",
             "-c:a",
             "aac",
             "-b:a",
             "128k",
             "-f",
+            "segment",
+            "-segment_format",
             "mpegts",
-            str(out_path),
+            "-segment_time",
+            str(self._segment_s),
+            "-segment_atclocktime",
+            "1",
+            "-segment_clocktime_offset",
+            str(self._segment_offset_s),
+            "-strftime",
+            "1",
+            "-reset_timestamps",
+            "1",
+            "-segment_list",
+            "pipe:1",
+            "-segment_list_type",
+            "csv",
+            pattern,
         ]
         try:
-            return subprocess.Popen(
+            proc = subprocess.Popen(
                 cmd,
                 stdin=subprocess.PIPE,
-                stdout=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
                 creationflags=subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0,
             )
         except Exception as exc:
             self.logger.warning("Failed to start ffmpeg: %s", exc)
             return None
+        self._segment_reader = threading.Thread(
+            target=self._read_segment_list, args=(proc,), daemon=True
+        )
+        self._segment_reader.start()
+        return proc
+
+    def _read_segment_list(self, proc: subprocess.Popen) -> None:
+        if proc.stdout is None:
+            return
+        for raw in proc.stdout:
+            line = raw.decode("utf-8", "ignore").strip()
+            if not line:
+                continue
+            try:
+                name, seg_start, seg_end = next(csv.reader([line]))[:3]
+                self._segment_events.put((name, float(seg_start), float(seg_end)))
+            except (ValueError, StopIteration):
+                self.logger.warning("Unexpected segment list line: %s", line)
 
-    def _stop_ffmpeg_recording(self, stamp: datetime) -> None:
+    def _stop_ffmpeg_recording(self) -> None:
         proc = self._ffmpeg_proc
         if proc is None:
             return
@@ -294,92 +409,249 @@ class RecorderWorker(threading.Thread):
                     proc.kill()
                 except Exception:
                     pass
-        self._finalize_current(stamp, transcode=False)
+        if self._segment_reader is not None:
+            self._segment_reader.join(timeout=2)
+            self._segment_reader = None
+        self._finalize_segments()
+        # Whatever ffmpeg did not report (killed, camera dropped) is still
+        # a valid TS file; close it out with its last write time.
+        self._finalize_orphan_segments()
+
+    def _finalize_segments(self) -> None:
+        staging_dir = recording_staging_dir_for(self.camera.name)
+        while True:
+            try:
+                name, seg_start, seg_end = self._segment_events.get_nowait()
+            except queue.Empty:
+                return
+            path = staging_dir / name
+            start = self._segment_start(path)
+            if start is None:
+                continue
+            end = start + timedelta(seconds=max(0.0, seg_end - seg_start))
+            self._finalize_file(path, start, end, transcode=False)
+
+    def _finalize_orphan_segments(self) -> None:
+        staging_dir = recording_staging_dir_for(self.camera.name)
+        if not staging_dir.exists():
+            return
+        for path in sorted(staging_dir.glob("*.ts")):
+            start = self._segment_start(path)
+            if start is None:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if stat.st_size == 0:
+                path.unlink(missing_ok=True)
+                continue
+            end = datetime.fromtimestamp(stat.st_mtime)
+            self._finalize_file(path, start, max(start, end), transcode=False)
+
+    def _segment_start(self, path: Path) -> Optional[datetime]:
+        try:
+            return datetime.strptime(path.stem, _SEGMENT_STAMP)
+        except ValueError:
+            self.logger.warning("Unexpected segment name: %s", path.name)
+            return None
+
+    def _disk_quota_exceeded(self) -> bool:
+        """Warn on low disk space; True when recording must pause for the quota."""
+        if not self.app_config.enable_disk_check:
+            return False
+        if self._disk_monitor is not None:
+            free_gb = self._disk_monitor.free_gb(get_videos_dir())
+        else:
+            free_gb = get_free_gb(get_videos_dir())
+        if free_gb >= float(self.app_config.min_free_gb):
+            return False
+        now = time.time()
+        if now - self._disk_low_last_log > 10.0:
+            self.logger.warning(
+                "Disk free %.2f GB below %s GB for %s",
+                free_gb,
+                self.app_config.min_free_gb,
+                self.camera.name,
+            )
+            self._disk_low_last_log = now
+        # With a DiskMonitor the low-space warning comes from its thread.
+        if self.disk_warning_cb is not None and self._disk_monitor is None:
+            try:
+                self.disk_warning_cb(free_gb, float(self.app_config.min_free_gb))
+            except Exception:
+                self.logger.exception("Disk warning callback failed")
+        if self._storage_quota is not None and self._storage_quota.freeing_space():
+            # Old segments are being evicted for space; keep recording.
+            return False
+        return bool(self.app_config.enable_disk_quota)
+
+    def _ensure_ffmpeg_process(self) -> None:
+        if self._disk_quota_exceeded():
+            self._stop_ffmpeg_recording()
+            return
+        if self._ffmpeg_proc is not None and self._ffmpeg_proc.poll() is None:
+            self._finalize_segments()
+            return
+        if self._ffmpeg_proc is not None:
+            self.logger.warning(
+                "ffmpeg exited (code %s); restarting", self._ffmpeg_proc.returncode
+            )
+            self._stop_ffmpeg_recording()
+            if time.time() - self._ffmpeg_started_ts > 60.0:
+                self._ffmpeg_backoff = 1.0
+            self.stop_event.wait(self._ffmpeg_backoff)
+            self._ffmpeg_backoff = min(self._ffmpeg_backoff * 2, 30.0)
+        staging_dir = recording_staging_dir_for(self.camera.name)
+        self._ffmpeg_proc = self._start_ffmpeg_recording(staging_dir)
+        self._ffmpeg_started_ts = time.time()
+        if self._ffmpeg_proc is not None:
+            self.logger.info("FFmpeg segment recording into %s", staging_dir)
 
-    def _ensure_ffmpeg_process(
+    def _ensure_packet_muxer(
         self,
+        packet,
         stamp: datetime,
-        current_hour_key: Optional[str],
-    ) -> Optional[str]:
-        if self.app_config.enable_disk_check:
-            free_gb = get_free_gb(get_videos_dir())
-            if free_gb < float(self.app_config.min_free_gb):
-                now = time.time()
-                if now - self._disk_low_last_log > 10.0:
-                    self.logger.warning(
-                        "Disk free %.2f GB below %s GB for %s",
-                        free_gb,
-                        self.app_config.min_free_gb,
-                        self.camera.name,
-                    )
-                    self._disk_low_last_log = now
-                if self.disk_warning_cb is not None:
-                    try:
-                        self.disk_warning_cb(free_gb, float(self.app_config.min_free_gb))
-                    except Exception:
-                        self.logger.exception("Disk warning callback failed")
-                if self.app_config.enable_disk_quota:
-                    self._stop_ffmpeg_recording(stamp)
-                    return current_hour_key
-        next_hour_key = stamp.strftime("%Y%m%d%H")
-        if (
-            self._ffmpeg_proc is None
-            or self._ffmpeg_proc.poll() is not None
-            or current_hour_key != next_hour_key
-        ):
-            if self._ffmpeg_proc is not None:
-                self._stop_ffmpeg_recording(stamp)
-            out_path = self._build_output_path(stamp, suffix=".ts")
-            self._current_path = out_path
-            self._current_start = stamp
-            self._ffmpeg_proc = self._start_ffmpeg_recording(out_path)
-            if self._ffmpeg_proc is None:
-                return None
-            self.logger.info("FFmpeg recording to %s", out_path.name)
-            current_hour_key = next_hour_key
-        return current_hour_key
+        muxer: Optional[PacketMuxer],
+        current_key: Optional[int],
+    ) -> tuple[Optional[PacketMuxer], Optional[int]]:
+        if self._disk_quota_exceeded():
+            self._close_packet_muxer(muxer, stamp)
+            return None, current_key
+        next_segment_key = self._segment_key(stamp)
+        hub = self._packet_hub
+        if muxer is not None and muxer.session == hub.session:
+            # Rotate on the first keyframe of the new segment so both files
+            # stay decodable and no packet is lost between them.
+            if next_segment_key == current_key or not (
+                packet.stream.type == "video" and packet.is_keyframe
+            ):
+                return muxer, current_key
+        self._close_packet_muxer(muxer, stamp)
+        out_path = self._build_output_path(stamp, suffix=".ts")
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            muxer = PacketMuxer(out_path, hub)
+        except Exception as exc:
+            self.logger.warning("Cannot open packet recording: %s", exc)
+            return None, current_key
+        self._current_path = out_path
+        self._current_start = stamp
+        self._writer_codec = hub.video_stream.codec_context.name
+        self.logger.info("Packet recording to %s", out_path.name)
+        self._follow_offline_motion(out_path)
+        return muxer, next_segment_key
+
+    def _close_packet_muxer(self, muxer: Optional[PacketMuxer], stamp: datetime) -> None:
+        if muxer is None:
+            return
+        muxer.close()
+        if muxer.started:
+            self._finalize_current(stamp, transcode=False)
+            return
+        # Nothing was written before the keyframe arrived; drop the stub.
+        for stub in (muxer.path, sidecar_path(muxer.path)):
+            try:
+                stub.unlink()
+            except OSError:
+                pass
+        self._current_path = None
+        self._current_start = None
 
     def _finalize_current(self, end: datetime, transcode: bool = True) -> Optional[Path]:
         if not self._current_path or not self._current_start:
             return None
         try:
-            base_dir = self._build_output_dir(self._current_start)
-            base_dir.mkdir(parents=True, exist_ok=True)
-            target = base_dir / self._build_filename(
-                self._current_start, end, suffix=self._current_path.suffix
+            return self._finalize_file(
+                self._current_path, self._current_start, end, transcode=transcode
             )
+        finally:
+            self._current_path = None
+            self._current_start = None
+
+    def _finalize_file(
+        self, path: Path, start: datetime, end: datetime, transcode: bool = True
+    ) -> Optional[Path]:
+        try:
+            base_dir = self._build_output_dir(start)
+            base_dir.mkdir(parents=True, exist_ok=True)
+            target = base_dir / self._build_filename(start, end, suffix=path.suffix)
             target = self._unique_path(target)
-            if self._current_path.exists():
-                self._current_path.rename(target)
+            if path.exists():
+                path.rename(target)
+            index_path = sidecar_path(path)
+            if index_path.exists():
+                index_path.rename(sidecar_path(target))
+            codec = _CATALOG_CODECS.get(self._writer_codec, self._writer_codec)
+            if target.suffix == ".ts" and self._finalize_service is not None:
+                # Remux off the recording thread; the next segment is
+                # already being written while this one is converted.
+                def on_done(final_path: Path, remuxed: bool) -> None:
+                    final_codec = "h264" if remuxed and transcode else codec
+                    self._on_finalized(final_path, remuxed, start, end, final_codec)
+
+                self._finalize_service.submit(
+                    FinalizeJob(target, transcode=transcode, on_done=on_done)
+                )
+                return target
             if target.suffix == ".ts":
                 mp4_path = self._try_remux_to_mp4(target, transcode=transcode)
                 if mp4_path is not None:
                     target = mp4_path
+                    codec = "h264" if transcode else codec
+            self._register_recording(target, start, end, codec)
             self._enqueue_offline_motion(target)
             return target
         except Exception as exc:
             self.logger.warning("Failed to finalize filename: %s", exc)
             return None
-        finally:
-            self._current_path = None
-            self._current_start = None
+
+    def _on_finalized(
+        self, path: Path, remuxed: bool, start: datetime, end: datetime, codec: str
+    ) -> None:
+        # Runs on a finalize thread, so probing an unknown codec is cheap here.
+        self._register_recording(path, start, end, codec or probe_video_codec(path) or "")
+        if remuxed and self.tracking_manager is not None:
+            self.tracking_manager.enqueue(path)
+        self._enqueue_offline_motion(path)
+
+    def _register_recording(self, path: Path, start: datetime, end: datetime, codec: str) -> None:
+        catalog_add(path, KIND_RECORDING, self.camera.name, start, end=end, codec=codec)
+        if self._storage_quota is not None:
+            self._storage_quota.add(self.camera.name, path, end)
 
     def _try_remux_to_mp4(self, ts_path: Path, transcode: bool = True) -> Optional[Path]:
         mp4_path = remux_ts_to_mp4(ts_path, delete_source=True, transcode=transcode)
-        if mp4_path is not None and self.tracking_manager is not None:
-            self.tracking_manager.enqueue(mp4_path)
+        if mp4_path is not None:
+            retarget_sidecar(mp4_path, keyframes=not transcode)
+            if self.tracking_manager is not None:
+                self.tracking_manager.enqueue(mp4_path)
         return mp4_path
 
+    def _offline_motion_wanted(self) -> bool:
+        return (
+            self._offline_motion_manager is not None
+            and bool(getattr(self.app_config, "motion_offline", True))
+            and self._motion_enabled
+        )
+
+    def _follow_offline_motion(self, video_path: Path) -> None:
+        """Let offline motion analyse the new segment while it is written."""
+        if not self._offline_motion_wanted():
+            return
+        try:
+            self._offline_motion_manager.follow(video_path)
+        except Exception:
+            self.logger.exception("Failed to follow offline motion for %s", video_path)
+
     def _enqueue_offline_motion(self, video_path: Path | None) -> None:
-        if (
-            self._offline_motion_manager is None
-            or video_path is None
-            or not bool(getattr(self.app_config, "motion_offline", True))
-            or not self._motion_enabled
-        ):
+        if video_path is None or self._offline_motion_manager is None:
             return
         try:
-            self._offline_motion_manager.enqueue(video_path)
+            if self._offline_motion_wanted():
+                self._offline_motion_manager.enqueue(video_path)
+            else:
+                self._offline_motion_manager.forget(video_path)
         except Exception:
             self.logger.exception("Failed to enqueue offline motion for %s", video_path)
 
@@ -387,109 +659,165 @@ class RecorderWorker(threading.Thread):
         if self._frame_store is not None:
             return self._next_shared_frame()
         try:
-            frame = self._frame_queue.get(timeout=0.2)
+            item = self._frame_queue.get(timeout=0.2)
         except queue.Empty:
             return None
         while True:
             try:
-                frame = self._frame_queue.get_nowait()
+                item = self._frame_queue.get_nowait()
             except queue.Empty:
                 break
+        frame, self._frame_ts = item
         return frame
 
     def _next_shared_frame(self) -> Optional[cv2.Mat]:
         if self._frame_store is None:
             return None
-        deadline = time.time() + 0.2
-        while not self.stop_event.is_set():
-            data = self._frame_store.get_frame_with_ts(self.camera.name)
-            if data is None:
-                if time.time() > deadline:
-                    return None
-                time.sleep(0.02)
-                continue
-            frame, ts = data
-            if ts <= self._last_shared_ts:
-                if time.time() > deadline:
-                    return None
-                time.sleep(0.02)
-                continue
-            self._last_shared_ts = ts
-            return frame
-        return None
+        if self.stop_event.is_set():
+            return None
+        entry = self._frame_store.wait_for_new(
+            self.camera.name, self._last_shared_version, timeout=0.2
+        )
+        if entry is None:
+            return None
+        self._last_shared_version = entry.version
+        self._frame_ts = entry.timestamp
+        return entry.frame
+
+    def _motion_level(self, scale: float):
+        """Downscaled copy of the frame being recorded, shared through the FrameStore."""
+        if self._frame_store is None or not self._last_shared_version:
+            return None
+        entry = self._frame_store.get_scaled(
+            self.camera.name, FrameLevel(scale=scale), version=self._last_shared_version
+        )
+        return entry.frame if entry is not None else None
 
     def _ensure_writer(
         self,
         frame,
         stamp: datetime,
         writer: Optional[cv2.VideoWriter],
-        hour_key: Optional[str],
+        current_key: Optional[int],
         config: dict,
-    ) -> tuple[Optional[cv2.VideoWriter], Optional[str], float]:
-        if self.app_config.enable_disk_check:
-            free_gb = get_free_gb(get_videos_dir())
-            if free_gb < float(self.app_config.min_free_gb):
-                now = time.time()
-                if now - self._disk_low_last_log > 10.0:
-                    self.logger.warning(
-                        "Disk free %.2f GB below %s GB for %s",
-                        free_gb,
-                        self.app_config.min_free_gb,
-                        self.camera.name,
-                    )
-                    self._disk_low_last_log = now
-                if self.disk_warning_cb is not None:
-                    try:
-                        self.disk_warning_cb(free_gb, float(self.app_config.min_free_gb))
-                    except Exception:
-                        self.logger.exception("Disk warning callback failed")
-                if self.app_config.enable_disk_quota:
-                    if writer is not None:
-                        writer.release()
-                        self._finalize_current(stamp)
-                    return (
-                        None,
-                        hour_key,
-                        float(config.get("record_fps", self.app_config.fps_record or 15)),
-                    )
-        next_hour_key = stamp.strftime("%Y%m%d%H")
-        if writer is None or next_hour_key != hour_key:
+    ) -> tuple[Optional[cv2.VideoWriter], Optional[int], float]:
+        if self._disk_quota_exceeded():
+            if writer is not None:
+                self._close_writer(writer, stamp)
+            return (
+                None,
+                current_key,
+                float(config.get("record_fps", self.app_config.fps_record or 15)),
+            )
+        next_segment_key = self._segment_key(stamp)
+        if writer is None or next_segment_key != current_key:
             if writer is not None:
-                writer.release()
-                self._finalize_current(stamp)
+                self._close_writer(writer, stamp)
             h, w = frame.shape[:2]
             base_fps = float(config.get("record_fps", self.app_config.fps_record or 15))
             writer = self._open_writer(w, h, base_fps, stamp)
             if not writer.isOpened():
                 self.logger.error("Failed to open VideoWriter for %s", self.camera.name)
                 return None, None, base_fps
-            hour_key = next_hour_key
-            self.logger.info("Recording to %s (%s)", self.camera.name, hour_key)
-            return writer, hour_key, base_fps
+            current_key = next_segment_key
+            self.logger.info("Recording to %s (%s)", self.camera.name, current_key)
+            return writer, current_key, base_fps
         base_fps = float(config.get("record_fps", self.app_config.fps_record or 15))
-        return writer, hour_key, base_fps
+        return writer, current_key, base_fps
+
+    def _create_encoder(self) -> Optional[EncodeQueue]:
+        size = int(getattr(self.app_config, "record_encode_queue", 30) or 0)
+        if size <= 0:
+            return None
+        encoder = EncodeQueue(
+            self.camera.name,
+            maxsize=size,
+            policy=getattr(self.app_config, "record_drop_policy", "drop_oldest"),
+            perf=self._perf,
+        )
+        encoder.start()
+        return encoder
+
+    def _write_frame(self, writer: cv2.VideoWriter, frame, wall_ts: float) -> bool:
+        if self._encoder is not None:
+            return self._encoder.put_frame(writer, frame, wall_ts=wall_ts)
+        writer.write(frame, wall_ts=wall_ts)
+        return True
+
+    def _close_writer(self, writer: cv2.VideoWriter, stamp: datetime) -> None:
+        """Release ``writer`` and finalize its file after every queued frame is written."""
+        path, start = self._current_path, self._current_start
+        self._current_path = None
+        self._current_start = None
+        # Files are already constant-rate; only codecs that are poor fits
+        # for MP4 (mp2v) still need the libx264 pass, H.264 is remuxed.
+        transcode = self._writer_codec not in ("H264", "libx264")
+
+        def close() -> None:
+            writer.release()
+            if path is not None and start is not None:
+                self._finalize_file(path, start, stamp, transcode=transcode)
+
+        if self._encoder is not None:
+            self._encoder.call(close)
+        else:
+            close()
 
     def _write_record_frame(
         self,
         frame,
         writer: cv2.VideoWriter,
-        config: dict,
-        last_write: float,
-        now: float,
+        capture_ts: float,
         base_fps: float,
-    ) -> float:
+        min_gap_s: float = 0.0,
+    ) -> int:
+        """Place ``frame`` on the file's constant-rate timeline.
+
+        Slot ``n`` of a file covers ``origin + n / fps``. A frame fills every
+        slot up to its capture time, so slow cameras get duplicates and fast
+        ones get decimated; durations match wall time without a CFR
+        re-encode. Gaps longer than ``record_cfr_max_gap_s`` (stalls,
+        reconnects) are not padded out; the timeline is re-anchored instead.
+        ``min_gap_s`` raises that limit for deliberate gaps (idle sampling in
+        motion mode), which are held on the last frame.
+        """
         base_fps = max(0.1, base_fps)
-        interval = 1.0 / base_fps
-
-        if last_write == 0.0:
-            last_write = now
-            writer.write(frame)
-            return last_write
-        if now - last_write < interval:
-            return last_write
-        last_write = now
-        writer.write(frame)
-        return last_write
+        if self._cfr_writer is not writer:
+            if self._encoder is not None and self._cfr_writer is not None:
+                self._encoder.take_dropped(self._cfr_writer)
+            self._cfr_writer = writer
+            self._cfr_origin = capture_ts
+            self._cfr_written = 0
+            self._cfr_owed = 0
+        elif self._encoder is not None:
+            # Frames the encode queue dropped never reached the file. Their
+            # slots are owed: this frame is written that many extra times so
+            # PTS stays on wall time, while already-labelled slots keep the
+            # wall time of the image that was queued for them.
+            self._cfr_owed += self._encoder.take_dropped(writer)
+        due = int((capture_ts - self._cfr_origin) * base_fps + 1e-6) + 1
+        count = due - self._cfr_written
+        if count <= 0:
+            return 0
+        max_gap_s = float(getattr(self.app_config, "record_cfr_max_gap_s", 2.0) or 0.0)
+        max_gap_s = max(max_gap_s, min_gap_s)
+        max_count = max(1, int(max_gap_s * base_fps))
+        if count > max_count:
+            count = max_count
+            self._cfr_origin = capture_ts - (self._cfr_written + count - 1) / base_fps
+        first = self._cfr_written
+        slots = [first] * min(self._cfr_owed, max_count) + list(range(first, first + count))
+        written = 0
+        for slot in slots:
+            # A refused frame (drop_newest, closing queue) leaves the slot
+            # open for the next capture.
+            if not self._write_frame(writer, frame, self._cfr_origin + slot / base_fps):
+                break
+            written += 1
+        repaid = min(written, len(slots) - count)
+        self._cfr_owed -= repaid
+        self._cfr_written += written - repaid
+        return written
 
     def _update_fps(self, now: float) -> None:
         delta = now - self._last_fps_ts
@@ -500,18 +828,28 @@ class RecorderWorker(threading.Thread):
         self._last_fps_ts = now
 
     def run(self) -> None:
+        if self._record_backend == "ffmpeg_copy" and self._packet_hub is not None:
+            self._run_packet_copy()
+            return
         if self._record_backend == "ffmpeg_copy":
             self._run_ffmpeg_copy()
             return
         self._run_opencv()
 
     def _run_opencv(self) -> None:
-        last_write = 0.0
         writer: Optional[cv2.VideoWriter] = None
-        current_hour_key: Optional[str] = None
+        current_segment_key: Optional[int] = None
         self._current_path = None
         self._current_start = None
+        self._encoder = self._create_encoder()
         self._start_capture()
+        gate = (
+            MotionGate(float(self.app_config.fps_detect or 5))
+            if self.camera.mode.lower() == "motion"
+            else None
+        )
+        clip_writer = self._start_clip_writer() if gate is not None else None
+        was_active = False
 
         while not self.stop_event.is_set():
             frame = self._next_frame()
@@ -519,31 +857,107 @@ class RecorderWorker(threading.Thread):
                 continue
 
             config: dict = {}
+            capture_ts = self._frame_ts or time.time()
+            min_gap_s = 0.0
+            if gate is not None:
+                config = get_motion_config()
+                gate.update(frame, capture_ts, config, self._motion_level)
+                if clip_writer is not None and gate.active != was_active:
+                    if gate.active:
+                        clip_writer.start_clip(datetime.now())
+                    else:
+                        clip_writer.stop_clip(datetime.now())
+                was_active = gate.active
+                if not gate.should_write(capture_ts, config):
+                    continue
+                # Idle samples are held until the next one instead of
+                # re-anchoring the constant-rate timeline.
+                min_gap_s = 1.5 * gate.idle_interval_s(config)
             stamp = datetime.now()
-            writer, current_hour_key, base_fps = self._ensure_writer(
-                frame, stamp, writer, current_hour_key, config
+            writer, current_segment_key, base_fps = self._ensure_writer(
+                frame, stamp, writer, current_segment_key, config
             )
             if writer is None:
                 time.sleep(0.2)
                 continue
 
-            now = time.time()
-            last_write = self._write_record_frame(
-                frame, writer, config, last_write, now, base_fps
+            written = self._write_record_frame(
+                frame, writer, capture_ts, base_fps, min_gap_s=min_gap_s
             )
             self._update_fps(time.time())
             if self._perf is not None:
                 self._perf.record_write(
-                    written=1,
-                    motion=0,
+                    written=written,
+                    motion=int(gate is not None and gate.active),
                     fps=self._fps,
                     queue_size=self._frame_queue.qsize(),
                 )
 
         self._stop_capture()
+        if clip_writer is not None:
+            clip_writer.close()
+            clip_writer.join(timeout=2)
         if writer is not None:
-            writer.release()
-            self._finalize_current(datetime.now())
+            self._close_writer(writer, datetime.now())
+        if self._encoder is not None:
+            self._encoder.close()
+            self._encoder = None
+
+    def _start_clip_writer(self) -> Optional[MotionClipWriter]:
+        if self._clip_packet_hub is None or not packets_available():
+            return None
+        pre_roll_s = float(get_motion_config().get("clip_pre_roll_seconds", 5.0) or 0.0)
+        clip_writer = MotionClipWriter(
+            self.camera.name, self.stop_event, self._clip_packet_hub, pre_roll_s=pre_roll_s
+        )
+        clip_writer.start()
+        return clip_writer
+
+    def _run_packet_copy(self) -> None:
+        packets: "queue.Queue[object]" = queue.Queue(maxsize=1024)
+        sink_name = f"recorder:{self.camera.name}"
+
+        def sink(packet) -> None:
+            try:
+                packets.put_nowait(packet)
+            except queue.Full:
+                if self._perf is not None:
+                    self._perf.record_capture(dropped=1)
+
+        hub = self._packet_hub
+        hub.add_sink(sink_name, sink)
+        muxer: Optional[PacketMuxer] = None
+        current_segment_key: Optional[int] = None
+        self._current_path = None
+        self._current_start = None
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    packet = packets.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                stamp = datetime.now()
+                muxer, current_segment_key = self._ensure_packet_muxer(
+                    packet, stamp, muxer, current_segment_key
+                )
+                if muxer is None:
+                    continue
+                try:
+                    written = muxer.write(packet)
+                except Exception as exc:
+                    self.logger.warning("Packet write failed: %s", exc)
+                    self._close_packet_muxer(muxer, stamp)
+                    muxer = None
+                    continue
+                if written and packet.stream.type == "video":
+                    self._update_fps(time.time())
+                    if self._perf is not None:
+                        self._perf.record_write(
+                            written=1, fps=self._fps, queue_size=packets.qsize()
+                        )
+        finally:
+            hub.remove_sink(sink_name)
+            self._close_packet_muxer(muxer, datetime.now())
 
     def _run_ffmpeg_copy(self) -> None:
         if not find_ffmpeg():
@@ -552,12 +966,9 @@ class RecorderWorker(threading.Thread):
             self._run_opencv()
             return
 
-        current_hour_key: Optional[str] = None
-        self._current_path = None
-        self._current_start = None
+        # Segments left over from an unclean exit are finalized first.
+        self._finalize_orphan_segments()
         while not self.stop_event.is_set():
-            stamp = datetime.now()
-            current_hour_key = self._ensure_ffmpeg_process(stamp, current_hour_key)
-            time.sleep(0.5)
-        if self._ffmpeg_proc is not None:
-            self._stop_ffmpeg_recording(datetime.now())
+            self._ensure_ffmpeg_process()
+            self.stop_event.wait(0.5)
+        self._stop_ffmpeg_recording()
@@ -0,0 +1,381 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.core.frame_store import FrameEntry, FrameStore
+
+_CTRL_VALID = 0
+_CTRL_LATEST = 1
+_CTRL_VERSION = 2
+_CTRL_SLOTS = 3
+_CTRL_SLOT_BYTES = 4
+_CTRL_WANT_BYTES = 5
+_CTRL_FIELDS = 8
+
+_META_SEQ = 0
+_META_VERSION = 1
+_META_HEIGHT = 2
+_META_WIDTH = 3
+_META_CHANNELS = 4
+_META_FIELDS = 5
+
+_READ_RETRIES = 8
+_WAIT_POLL_S = 0.005
+
+
+def _align(value: int, alignment: int = 64) -> int:
+    return (value + alignment - 1) // alignment * alignment
+
+
+class _FrameRing:
+    """Single-producer frame ring in one shared memory block.
+
+    Every slot carries a seqlock counter: the writer makes it odd while the
+    slot is being filled and even once it is complete, so readers in any
+    process detect torn reads and retry instead of taking a lock. The
+    thread lock only keeps this process's views valid against ``close``.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self.shm = shm
+        self.owner = owner
+        self._lock = threading.Lock()
+        buf = shm.buf
+        self._ctrl = np.ndarray((_CTRL_FIELDS,), dtype=np.int64, buffer=buf)
+        if owner:
+            return
+        self._map_slots(int(self._ctrl[_CTRL_SLOTS]), int(self._ctrl[_CTRL_SLOT_BYTES]))
+
+    @classmethod
+    def create(
+        cls, name: str, slots: int, slot_bytes: int, first_version: int = 0
+    ) -> "_FrameRing":
+        slots = max(2, int(slots))
+        slot_bytes = _align(max(1, int(slot_bytes)))
+        size = cls._header_size(slots) + slots * slot_bytes
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        ring = cls(shm, owner=True)
+        ring._ctrl[:] = 0
+        ring._ctrl[_CTRL_LATEST] = slots - 1
+        ring._ctrl[_CTRL_SLOTS] = slots
+        ring._ctrl[_CTRL_SLOT_BYTES] = slot_bytes
+        # A replacement ring continues the old one's versions.
+        ring._ctrl[_CTRL_VERSION] = first_version
+        ring._map_slots(slots, slot_bytes)
+        ring._meta[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str) -> "_FrameRing":
+        shm = shared_memory.SharedMemory(name=name, create=False)
+        return cls(shm, owner=False)
+
+    @staticmethod
+    def _header_size(slots: int) -> int:
+        return _align(_CTRL_FIELDS * 8 + slots * _META_FIELDS * 8 + slots * 8)
+
+    def _map_slots(self, slots: int, slot_bytes: int) -> None:
+        buf = self.shm.buf
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        meta_offset = _CTRL_FIELDS * 8
+        ts_offset = meta_offset + slots * _META_FIELDS * 8
+        self._meta = np.ndarray(
+            (slots, _META_FIELDS), dtype=np.int64, buffer=buf, offset=meta_offset
+        )
+        self._ts = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=ts_offset)
+        self._data = np.ndarray(
+            (slots * slot_bytes,),
+            dtype=np.uint8,
+            buffer=buf,
+            offset=self._header_size(slots),
+        )
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def version(self) -> int:
+        with self._lock:
+            if self._ctrl is None or not self._ctrl[_CTRL_VALID]:
+                return 0
+            return int(self._ctrl[_CTRL_VERSION])
+
+    def last_version(self) -> int:
+        """Newest version written, valid or not; 0 after ``close``."""
+        with self._lock:
+            return int(self._ctrl[_CTRL_VERSION]) if self._ctrl is not None else 0
+
+    def request_bytes(self, nbytes: int) -> None:
+        """Ask the owning process for slots of at least ``nbytes``."""
+        with self._lock:
+            if self._ctrl is not None and nbytes > self._ctrl[_CTRL_WANT_BYTES]:
+                self._ctrl[_CTRL_WANT_BYTES] = nbytes
+
+    def wanted_bytes(self) -> int:
+        with self._lock:
+            return int(self._ctrl[_CTRL_WANT_BYTES]) if self._ctrl is not None else 0
+
+    def write(self, frame: np.ndarray, timestamp: float) -> None:
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        with self._lock:
+            if self._ctrl is None:
+                return
+            slot = (int(self._ctrl[_CTRL_LATEST]) + 1) % self.slots
+            version = int(self._ctrl[_CTRL_VERSION]) + 1
+            start = slot * self.slot_bytes
+            self._meta[slot, _META_SEQ] += 1
+            self._meta[slot, _META_VERSION] = version
+            self._meta[slot, _META_HEIGHT] = height
+            self._meta[slot, _META_WIDTH] = width
+            self._meta[slot, _META_CHANNELS] = channels
+            self._ts[slot] = float(timestamp)
+            self._data[start : start + frame.nbytes] = frame.reshape(-1)
+            self._meta[slot, _META_SEQ] += 1
+            self._ctrl[_CTRL_LATEST] = slot
+            self._ctrl[_CTRL_VERSION] = version
+            self._ctrl[_CTRL_VALID] = 1
+
+    def read(self) -> Optional[Tuple[np.ndarray, float, int]]:
+        with self._lock:
+            for _ in range(_READ_RETRIES):
+                if self._ctrl is None or not self._ctrl[_CTRL_VALID]:
+                    return None
+                slot = int(self._ctrl[_CTRL_LATEST])
+                seq = int(self._meta[slot, _META_SEQ])
+                if seq & 1:
+                    time.sleep(0)
+                    continue
+                version = int(self._meta[slot, _META_VERSION])
+                height = int(self._meta[slot, _META_HEIGHT])
+                width = int(self._meta[slot, _META_WIDTH])
+                channels = int(self._meta[slot, _META_CHANNELS])
+                timestamp = float(self._ts[slot])
+                nbytes = height * width * channels
+                if nbytes <= 0 or nbytes > self.slot_bytes:
+                    return None
+                start = slot * self.slot_bytes
+                frame = self._data[start : start + nbytes].copy()
+                if int(self._meta[slot, _META_SEQ]) != seq:
+                    continue
+                shape = (height, width, channels) if channels > 1 else (height, width)
+                return frame.reshape(shape), timestamp, version
+            return None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            if self._ctrl is not None:
+                self._ctrl[_CTRL_VALID] = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._ctrl = None
+            self._meta = None
+            self._ts = None
+            self._data = None
+            try:
+                self.shm.close()
+            except Exception:
+                pass
+            if self.owner:
+                try:
+                    self.shm.unlink()
+                except Exception:
+                    pass
+
+
+class SharedFrameStore(FrameStore):
+    """FrameStore backed by per-camera shared memory rings.
+
+    The parent process owns the rings (``ensure_ring``) and hands their names
+    to ingest processes, which ``attach`` and publish with ``set_frame``.
+    Readers copy the newest slot out once per version; the copy is then
+    shared the same way as in the in-process store.
+
+    A frame larger than its slots makes the owner replace the ring with one
+    sized for it. A producer in another process cannot do that itself: it
+    flags the size it needs and shrinks frames to fit until ``grow_ring``
+    on the owner side hands it a bigger ring.
+    """
+
+    def __init__(
+        self,
+        slots: int = 3,
+        slot_bytes: int = 6 * 1024 * 1024,
+        zero_copy: bool = True,
+        owner: bool = True,
+    ) -> None:
+        super().__init__(zero_copy=zero_copy)
+        self._slots = max(2, int(slots))
+        self._slot_bytes = max(1, int(slot_bytes))
+        self._rings: Dict[str, _FrameRing] = {}
+        self._owner = bool(owner)
+        self._ring_seq = itertools.count()
+        self._oversize_logged: set[str] = set()
+        self.logger = logging.getLogger("SharedFrameStore")
+
+    @classmethod
+    def attach(cls, ring_names: Dict[str, str]) -> "SharedFrameStore":
+        """Open existing rings by name; used on the producer side of a child process."""
+        store = cls(owner=False)
+        for camera_name, ring_name in ring_names.items():
+            store.attach_ring(camera_name, ring_name)
+        return store
+
+    def attach_ring(self, camera_name: str, ring_name: str) -> None:
+        """Attach ``ring_name`` for ``camera_name``, replacing a previous ring."""
+        with self._lock:
+            current = self._rings.get(camera_name)
+            if current is not None and current.name == ring_name:
+                return
+        ring = _FrameRing.attach(ring_name)
+        with self._lock:
+            old = self._rings.get(camera_name)
+            self._rings[camera_name] = ring
+        if old is not None:
+            old.close()
+
+    def ensure_ring(self, camera_name: str) -> str:
+        with self._lock:
+            ring = self._rings.get(camera_name)
+            if ring is None:
+                if not self._owner:
+                    raise KeyError(f"No shared frame ring for {camera_name}")
+                ring = _FrameRing.create(self._new_ring_name(), self._slots, self._slot_bytes)
+                self._rings[camera_name] = ring
+            return ring.name
+
+    def grow_ring(self, camera_name: str) -> Optional[str]:
+        """Owner side: replace a ring whose producer asked for bigger slots.
+
+        Returns the new ring name for the producer to attach, or None.
+        """
+        with self._lock:
+            ring = self._rings.get(camera_name)
+        if ring is None or not self._owner or ring.wanted_bytes() <= ring.slot_bytes:
+            return None
+        return self._grow_ring(camera_name, ring.wanted_bytes()).name
+
+    def ring_names(self) -> Dict[str, str]:
+        with self._lock:
+            return {name: ring.name for name, ring in self._rings.items()}
+
+    def set_frame(self, camera_name: str, frame: np.ndarray, timestamp: float) -> None:
+        if self._owner:
+            self.ensure_ring(camera_name)
+        with self._lock:
+            ring = self._rings.get(camera_name)
+        if ring is None:
+            return
+        if frame.nbytes > ring.slot_bytes:
+            if self._owner:
+                ring = self._grow_ring(camera_name, frame.nbytes)
+            else:
+                ring.request_bytes(frame.nbytes)
+                frame = self._fit_to_slot(camera_name, frame, ring.slot_bytes)
+        ring.write(frame, timestamp)
+
+    def wait_for_new(
+        self, camera_name: str, last_version: int, timeout: float
+    ) -> Optional[FrameEntry]:
+        # Producers may live in another process, so there is no condition
+        # to wait on; the ring version is cheap enough to poll.
+        deadline = time.monotonic() + max(0.0, timeout)
+        while True:
+            entry = self._current(camera_name)
+            if entry is not None and entry.version > last_version:
+                return self._private(entry)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            time.sleep(min(_WAIT_POLL_S, remaining))
+
+    def list_cameras(self) -> list[str]:
+        with self._lock:
+            rings = dict(self._rings)
+        return [name for name, ring in rings.items() if ring.version() > 0]
+
+    def remove_frame(self, camera_name: str) -> None:
+        """Drop the camera's ring: the owner unlinks it, producers detach."""
+        with self._lock:
+            ring = self._rings.pop(camera_name, None)
+            self._oversize_logged.discard(camera_name)
+        if ring is not None:
+            ring.close()
+        super().remove_frame(camera_name)
+
+    def close(self) -> None:
+        with self._lock:
+            rings = list(self._rings.values())
+            self._rings.clear()
+            self._entries.clear()
+        for ring in rings:
+            ring.close()
+
+    def _current(self, camera_name: str) -> Optional[FrameEntry]:
+        with self._lock:
+            ring = self._rings.get(camera_name)
+            cached = self._entries.get(camera_name)
+        if ring is None:
+            return None
+        version = ring.version()
+        if version == 0:
+            return None
+        if cached is not None and cached.version == version:
+            return cached
+        data = ring.read()
+        if data is None:
+            return cached
+        frame, timestamp, version = data
+        if self._zero_copy:
+            frame.setflags(write=False)
+        entry = FrameEntry(frame, timestamp, version)
+        with self._lock:
+            current = self._entries.get(camera_name)
+            if current is None or current.version < entry.version:
+                self._entries[camera_name] = entry
+            else:
+                entry = current
+        return entry
+
+    def _new_ring_name(self) -> str:
+        return f"sgp_{os.getpid()}_{next(self._ring_seq)}_{int(time.time())}"
+
+    def _grow_ring(self, camera_name: str, nbytes: int) -> _FrameRing:
+        with self._lock:
+            old = self._rings.get(camera_name)
+            first_version = old.last_version() if old is not None else 0
+            ring = _FrameRing.create(self._new_ring_name(), self._slots, nbytes, first_version)
+            self._rings[camera_name] = ring
+        if old is not None:
+            old.close()
+        self.logger.info(
+            "Shared ring for %s resized to %s bytes per slot", camera_name, ring.slot_bytes
+        )
+        return ring
+
+    def _fit_to_slot(
+        self, camera_name: str, frame: np.ndarray, slot_bytes: int
+    ) -> np.ndarray:
+        if camera_name not in self._oversize_logged:
+            self._oversize_logged.add(camera_name)
+            self.logger.warning(
+                "Frame %s (%s bytes) exceeds shared slot (%s bytes); "
+                "downscaling until the ring is resized",
+                camera_name,
+                frame.nbytes,
+                slot_bytes,
+            )
+        h, w = frame.shape[:2]
+        ratio = (slot_bytes / float(frame.nbytes)) ** 0.5
+        size = (max(1, int(w * ratio)), max(1, int(h * ratio)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
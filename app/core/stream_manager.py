@@ -6,15 +6,33 @@ from typing import Dict
 
 from app.core.camera_manager import CameraManager
 
+# Reasons that need the full-resolution main stream; every other consumer
+# (live tiles, popups, motion) is served from the sub-stream when a camera
+# has one configured.
+MAIN_STREAM_REASONS = {"record", "record_copy"}
+# Reasons that only consume compressed packets (demux-once ingest) and do
+# not need the stream decoded.
+PACKET_REASONS = {"record_copy"}
+
 
 @dataclass
 class StreamDemand:
     reasons: Dict[str, int] = field(default_factory=dict)
+    fps: Dict[str, float] = field(default_factory=dict)
     stop_at: float | None = None
 
     def total(self) -> int:
         return sum(self.reasons.values())
 
+    def max_fps(self) -> float:
+        """Highest frame rate any consumer asked for; 0 means full camera rate."""
+        if not self.fps or any(value <= 0 for value in self.fps.values()):
+            return 0.0
+        return max(self.fps.values())
+
+    def needs_decode(self) -> bool:
+        return any(reason not in PACKET_REASONS for reason in self.reasons)
+
 
 class StreamManager:
     def __init__(self, camera_manager: CameraManager, idle_timeout_s: float = 10.0) -> None:
@@ -22,6 +40,7 @@ class StreamManager:
         self._idle_timeout_s = float(idle_timeout_s)
         self._lock = threading.Lock()
         self._demands: Dict[str, StreamDemand] = {}
+        self._keys: Dict[tuple[str, str], str] = {}
         self._stop_event = threading.Event()
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._logger = logging.getLogger("StreamManager")
@@ -31,32 +50,61 @@ class StreamManager:
         self._stop_event.set()
         self._thread.join(timeout=2)
 
-    def acquire(self, camera_name: str, reason: str) -> None:
+    def acquire(self, camera_name: str, reason: str, fps: float = 0.0) -> str:
+        """Start (or share) the stream for ``reason``; returns its FrameStore key."""
+        stream_key = self._camera_manager.stream_key(
+            camera_name, main=reason in MAIN_STREAM_REASONS
+        )
         with self._lock:
-            demand = self._demands.setdefault(camera_name, StreamDemand())
-            demand.reasons[reason] = demand.reasons.get(reason, 0) + 1
+            self._keys[(camera_name, reason)] = stream_key
+            demand = self._demands.setdefault(stream_key, StreamDemand())
+            count = demand.reasons.get(reason, 0)
+            demand.reasons[reason] = count + 1
+            fps = max(0.0, float(fps or 0.0))
+            if reason not in PACKET_REASONS:
+                if count == 0 or fps <= 0:
+                    demand.fps[reason] = fps
+                elif demand.fps.get(reason, 0.0) > 0:
+                    demand.fps[reason] = max(demand.fps[reason], fps)
             demand.stop_at = None
             total = demand.total()
+            target_fps = demand.max_fps()
+            decode = demand.needs_decode()
+        self._camera_manager.set_stream_decode(stream_key, decode)
         if total == 1:
-            self._logger.info("Stream start %s (reason=%s)", camera_name, reason)
-            self._camera_manager.start_stream(camera_name)
+            self._logger.info("Stream start %s (reason=%s)", stream_key, reason)
+            self._camera_manager.start_stream(stream_key)
+        self._camera_manager.set_stream_fps(stream_key, target_fps)
+        return stream_key
+
+    def packet_hub(self, camera_name: str):
+        """Packet fan-out of ``camera_name``'s main stream (demux-once ingest only)."""
+        return self._camera_manager.packet_hub(camera_name)
 
     def release(self, camera_name: str, reason: str) -> None:
         with self._lock:
-            demand = self._demands.get(camera_name)
+            stream_key = self._keys.get((camera_name, reason), camera_name)
+            demand = self._demands.get(stream_key)
             if demand is None:
                 return
             if reason in demand.reasons:
                 demand.reasons[reason] = max(0, demand.reasons[reason] - 1)
                 if demand.reasons[reason] == 0:
                     demand.reasons.pop(reason, None)
+                    demand.fps.pop(reason, None)
+                    self._keys.pop((camera_name, reason), None)
+            target_fps = demand.max_fps()
+            decode = demand.needs_decode()
             if demand.total() == 0:
                 demand.stop_at = time.time() + self._idle_timeout_s
                 self._logger.info(
                     "Stream idle %s, stopping in %.1fs",
-                    camera_name,
+                    stream_key,
                     self._idle_timeout_s,
                 )
+                return
+        self._camera_manager.set_stream_decode(stream_key, decode)
+        self._camera_manager.set_stream_fps(stream_key, target_fps)
 
     def _run(self) -> None:
         while not self._stop_event.is_set():
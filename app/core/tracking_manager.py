@@ -2,10 +2,12 @@ import logging
 import queue
 import threading
 import time
+from datetime import datetime
 from pathlib import Path
 
 import cv2
 
+from app.storage.catalog import KIND_TRACKING, catalog_add, get_catalog
 from app.storage.layout import tracking_output_path
 
 
@@ -74,6 +76,19 @@ class TrackingManager:
             cap.release()
             writer.release()
         self.logger.info("Tracking saved: %s", out_path.name)
+        self._catalog_output(video_path, out_path)
+
+    def _catalog_output(self, video_path: Path, out_path: Path) -> None:
+        catalog = get_catalog()
+        source = catalog.get(video_path) if catalog is not None else None
+        if source is not None:
+            camera, start, end = source.camera, source.start, source.end
+        else:
+            camera = video_path.parent.name
+            start = end = datetime.fromtimestamp(video_path.stat().st_mtime)
+        catalog_add(
+            out_path, KIND_TRACKING, camera, start, end=end, codec="mpeg4", source_path=video_path
+        )
 
     def _open_capture(self, video_path: Path) -> cv2.VideoCapture | None:
         cap = cv2.VideoCapture(str(video_path))
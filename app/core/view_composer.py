@@ -3,6 +3,8 @@ from typing import Dict, Optional, Tuple
 import cv2
 import numpy as np
 
+from app.core.frame_store import FrameLevel, FrameStore
+
 
 SLOT_SPECS: Dict[int, Tuple[int, int, int, int]] = {
     0: (0, 0, 1280, 720),
@@ -52,6 +54,25 @@ class ViewComposer:
                 canvas[y : y + h, x : x + w] = self.placeholder(w, h, f"Slot {slot+1}")
         return canvas
 
+    def compose_from_store(
+        self,
+        assignments: Dict[int, Optional[str]],
+        frame_store: FrameStore,
+    ) -> np.ndarray:
+        canvas = np.zeros((self.canvas_h, self.canvas_w, 3), dtype=np.uint8)
+        for slot, (x, y, w, h) in SLOT_SPECS.items():
+            name = assignments.get(slot)
+            entry = (
+                frame_store.get_scaled(name, FrameLevel(width=w, height=h))
+                if name
+                else None
+            )
+            if entry is not None:
+                canvas[y : y + h, x : x + w] = entry.frame
+            else:
+                canvas[y : y + h, x : x + w] = self.placeholder(w, h, f"Slot {slot+1}")
+        return canvas
+
     @staticmethod
     def _resize_slot(frame: np.ndarray, width: int, height: int) -> np.ndarray:
         return cv2.resize(frame, (width, height))
@@ -16,6 +16,7 @@ class ViewWindow:
         frame_store: Optional[FrameStore] = None,
     ) -> None:
         self.composer = composer
+        self.frame_store = frame_store if frame_provider is None else None
         if frame_provider is not None:
             self.frame_provider = frame_provider
         elif frame_store is not None:
@@ -64,8 +65,13 @@ class ViewWindow:
         self._init_window()
 
         while not self._stop_event.is_set():
-            frames = self.frame_provider()
-            canvas = self.composer.compose(self.assignments, frames)
+            if self.frame_store is not None:
+                canvas = self.composer.compose_from_store(
+                    self.assignments, self.frame_store
+                )
+            else:
+                frames = self.frame_provider()
+                canvas = self.composer.compose(self.assignments, frames)
             cv2.imshow("view", canvas)
             key = cv2.waitKey(1) & 0xFF
             if key == 27:  # ESC
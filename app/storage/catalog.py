@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from app.utils.paths import get_files_dir
+
+logger = logging.getLogger("Catalog")
+
+KIND_RECORDING = "recording"
+KIND_MOTION_CLIP = "motion_clip"
+KIND_CAPTURE = "capture"
+KIND_TRACKING = "tracking"
+KIND_EXPORT = "export"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    camera TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    end_ts REAL NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    codec TEXT NOT NULL DEFAULT '',
+    motion_events INTEGER NOT NULL DEFAULT 0,
+    source_path TEXT
+);
+CREATE INDEX IF NOT EXISTS media_camera_time ON media (camera, start_ts);
+CREATE INDEX IF NOT EXISTS media_kind_time ON media (kind, start_ts);
+CREATE INDEX IF NOT EXISTS media_source ON media (source_path);
+"""
+
+_COLUMNS = (
+    "path, kind, camera, start_ts, end_ts, size_bytes, codec, motion_events, source_path"
+)
+
+
+@dataclass(frozen=True)
+class MediaRecord:
+    path: Path
+    kind: str
+    camera: str
+    start: datetime
+    end: datetime
+    size_bytes: int
+    codec: str
+    motion_events: int
+    source_path: Optional[Path]
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "MediaRecord":
+        path, kind, camera, start_ts, end_ts, size, codec, events, source = row
+        return cls(
+            Path(path),
+            kind,
+            camera,
+            datetime.fromtimestamp(start_ts),
+            datetime.fromtimestamp(end_ts),
+            int(size),
+            codec,
+            int(events),
+            Path(source) if source else None,
+        )
+
+
+class Catalog:
+    """SQLite index of everything written under ``Files``.
+
+    One row per file (recording segment, motion clip, capture, tracking
+    output or export) keyed by path, so re-adding a file after a rename or
+    remux just updates it. The database runs in WAL mode: writers from the
+    recorder, finalize and motion threads share one connection behind a
+    lock, and time-range queries are index lookups on ``(camera, start_ts)``.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.path = Path(db_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None, timeout=10.0
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(
+        self,
+        path: Path,
+        kind: str,
+        camera: str,
+        start: datetime,
+        end: Optional[datetime] = None,
+        codec: str = "",
+        motion_events: Optional[int] = None,
+        source_path: Optional[Path] = None,
+    ) -> None:
+        """Insert or update the row for ``path``; size is read from disk."""
+        path = Path(path)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = 0
+        end = end or start
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO media ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET kind=excluded.kind, "
+                "camera=excluded.camera, start_ts=excluded.start_ts, "
+                "end_ts=excluded.end_ts, size_bytes=excluded.size_bytes, "
+                "codec=CASE WHEN excluded.codec != '' THEN excluded.codec ELSE codec END, "
+                "motion_events=CASE WHEN ? THEN excluded.motion_events ELSE motion_events END, "
+                "source_path=COALESCE(excluded.source_path, source_path)",
+                (
+                    str(path),
+                    kind,
+                    camera,
+                    start.timestamp(),
+                    max(start, end).timestamp(),
+                    size,
+                    codec or "",
+                    int(motion_events or 0),
+                    str(source_path) if source_path else None,
+                    motion_events is not None,
+                ),
+            )
+
+    def rename(self, old_path: Path, new_path: Path) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE OR REPLACE media SET path = ? WHERE path = ?",
+                (str(new_path), str(old_path)),
+            )
+            self._conn.execute(
+                "UPDATE media SET source_path = ? WHERE source_path = ?",
+                (str(new_path), str(old_path)),
+            )
+
+    def remove(self, path: Path) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM media WHERE path = ?", (str(path),))
+
+    def remove_under(self, directory: Path) -> int:
+        """Drop rows for every file below ``directory``; returns rows removed."""
+        prefix = str(Path(directory)).rstrip("/\\") + os.sep
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM media WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+            )
+        return cursor.rowcount
+
+    def set_motion_events(self, path: Path, count: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE media SET motion_events = ? WHERE path = ?",
+                (int(count), str(path)),
+            )
+
+    def get(self, path: Path) -> Optional[MediaRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM media WHERE path = ?", (str(path),)
+            ).fetchone()
+        return MediaRecord.from_row(row) if row else None
+
+    def query(
+        self,
+        start: datetime,
+        end: datetime,
+        cameras: Optional[Iterable[str]] = None,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> List[MediaRecord]:
+        """Files overlapping ``[start, end]``, oldest first."""
+        sql = f"SELECT {_COLUMNS} FROM media WHERE start_ts <= ? AND end_ts >= ?"
+        params: list = [end.timestamp(), start.timestamp()]
+        for column, values in (("camera", cameras), ("kind", kinds)):
+            if values is None:
+                continue
+            values = list(values)
+            if not values:
+                return []
+            sql += f" AND {column} IN ({', '.join('?' * len(values))})"
+            params.extend(values)
+        sql += " ORDER BY start_ts"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [MediaRecord.from_row(row) for row in rows]
+
+    def all_of_kind(self, kind: str) -> List[MediaRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM media WHERE kind = ? ORDER BY start_ts", (kind,)
+            ).fetchall()
+        return [MediaRecord.from_row(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+
+
+_catalog: Optional[Catalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog_path() -> Path:
+    return get_files_dir() / "catalog.sqlite3"
+
+
+def get_catalog() -> Optional[Catalog]:
+    """Process-wide catalog, opened on first use; None if it cannot be opened."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            try:
+                _catalog = Catalog(get_catalog_path())
+            except (OSError, sqlite3.Error) as exc:
+                logger.warning("Catalog unavailable: %s", exc)
+                return None
+        return _catalog
+
+
+def close_catalog() -> None:
+    """Close the process-wide catalog at shutdown (checkpoints the WAL)."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is not None:
+            _catalog.close()
+            _catalog = None
+
+
+def catalog_add(path: Path, kind: str, camera: str, start: datetime, **fields) -> None:
+    """Best-effort ``Catalog.add``: a catalog failure never breaks recording."""
+    catalog = get_catalog()
+    if catalog is None:
+        return
+    try:
+        catalog.add(path, kind, camera, start, **fields)
+    except sqlite3.Error as exc:
+        logger.warning("Catalog write failed for %s: %s", Path(path).name, exc)
+
+
+def catalog_set_motion_events(path: Path, count: int) -> None:
+    catalog = get_catalog()
+    if catalog is None:
+        return
+    try:
+        catalog.set_motion_events(path, count)
+    except sqlite3.Error as exc:
+        logger.warning("Catalog update failed for %s: %s", Path(path).name, exc)
+
+
+def catalog_remove(path: Path) -> None:
+    catalog = get_catalog()
+    if catalog is None:
+        return
+    try:
+        catalog.remove(path)
+    except sqlite3.Error as exc:
+        logger.warning("Catalog delete failed for %s: %s", Path(path).name, exc)
+
+
+def catalog_rename(old_path: Path, new_path: Path) -> None:
+    catalog = get_catalog()
+    if catalog is None:
+        return
+    try:
+        catalog.rename(old_path, new_path)
+    except sqlite3.Error as exc:
+        logger.warning("Catalog rename failed for %s: %s", Path(old_path).name, exc)
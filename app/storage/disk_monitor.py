@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from app.storage.maintenance import get_free_gb
+
+LowSpaceListener = Callable[[Path, float, float], None]
+
+_GB = 1024 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class DiskSample:
+    free_bytes: int
+    total_bytes: int
+    write_bps: float
+    ts: float
+
+    @property
+    def free_gb(self) -> float:
+        return self.free_bytes / _GB
+
+
+class DiskMonitor(threading.Thread):
+    """Samples free space of the storage roots on one background thread.
+
+    Recorders read the cached ``DiskSample`` instead of calling statfs per
+    frame. Samples live in a dict that is replaced wholesale, so readers
+    never take a lock. ``write_bps`` is estimated from the drop in free
+    space between samples (deletions count as zero, not negative). Low-space
+    listeners are called from this thread on every sample below
+    ``min_free_gb``; they are expected to throttle themselves.
+    """
+
+    def __init__(
+        self,
+        roots: Iterable[Path],
+        interval_s: float = 5.0,
+        min_free_gb: float = 0.0,
+    ) -> None:
+        super().__init__(daemon=True, name="disk-monitor")
+        self._roots: List[Path] = []
+        self._samples: Dict[str, DiskSample] = {}
+        self._listeners: List[LowSpaceListener] = []
+        self._interval_s = max(0.5, float(interval_s))
+        self._min_free_gb = float(min_free_gb)
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("DiskMonitor")
+        for root in roots:
+            self.add_root(root)
+
+    def add_root(self, root: Path) -> None:
+        root = Path(root)
+        with self._lock:
+            if root not in self._roots:
+                self._roots.append(root)
+
+    def roots(self) -> List[Path]:
+        with self._lock:
+            return list(self._roots)
+
+    def set_min_free_gb(self, min_free_gb: float) -> None:
+        self._min_free_gb = float(min_free_gb)
+
+    def add_low_space_listener(self, listener: LowSpaceListener) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def sample(self, root: Path) -> Optional[DiskSample]:
+        return self._samples.get(str(Path(root)))
+
+    def free_gb(self, root: Path) -> float:
+        sample = self.sample(root)
+        if sample is None:
+            return get_free_gb(_probe_path(Path(root)))
+        return sample.free_gb
+
+    def stop(self, join_timeout: float = 2.0) -> None:
+        self._stop_event.set()
+        self.join(timeout=join_timeout)
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self.poll()
+            self._stop_event.wait(self._interval_s)
+
+    def poll(self) -> None:
+        now = time.time()
+        previous = self._samples
+        samples: Dict[str, DiskSample] = {}
+        for root in self.roots():
+            try:
+                usage = shutil.disk_usage(str(_probe_path(root)))
+            except OSError as exc:
+                self.logger.warning("Cannot sample %s: %s", root, exc)
+                continue
+            write_bps = 0.0
+            prev = previous.get(str(root))
+            if prev is not None and now > prev.ts:
+                rate = max(0.0, (prev.free_bytes - usage.free) / (now - prev.ts))
+                write_bps = 0.7 * prev.write_bps + 0.3 * rate
+            samples[str(root)] = DiskSample(usage.free, usage.total, write_bps, now)
+        self._samples = samples
+        self._notify_low_space(samples)
+
+    def _notify_low_space(self, samples: Dict[str, DiskSample]) -> None:
+        min_gb = self._min_free_gb
+        if min_gb <= 0:
+            return
+        with self._lock:
+            listeners = list(self._listeners)
+        for root, sample in samples.items():
+            if sample.free_gb >= min_gb:
+                continue
+            for listener in listeners:
+                try:
+                    listener(Path(root), sample.free_gb, min_gb)
+                except Exception:
+                    self.logger.exception("Low-space listener failed")
+
+
+def _probe_path(path: Path) -> Path:
+    probe = path
+    while not probe.exists() and probe.parent != probe:
+        probe = probe.parent
+    return probe
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import zlib
 from datetime import datetime
 from pathlib import Path
 
@@ -16,6 +17,28 @@ def videos_dir_for(camera_name: str, stamp: datetime) -> Path:
     )
 
 
+_LOCAL_EPOCH = datetime(1970, 1, 1)
+
+
+def rotation_offset_s(camera_name: str, segment_s: int, stagger_max_s: int) -> int:
+    """Deterministic per-camera rotation offset so cameras do not all rotate at once."""
+    window = min(max(0, int(stagger_max_s)), max(0, int(segment_s) - 1))
+    if window <= 0:
+        return 0
+    return zlib.crc32(camera_name.encode("utf-8")) % (window + 1)
+
+
+def segment_key(stamp: datetime, segment_s: int, offset_s: int = 0) -> int:
+    """Index of the recording segment ``stamp`` falls in (local wall clock)."""
+    local_s = (stamp.replace(tzinfo=None) - _LOCAL_EPOCH).total_seconds()
+    return int((local_s - offset_s) // max(1, int(segment_s)))
+
+
+def recording_staging_dir_for(camera_name: str) -> Path:
+    """Where long-lived recorders write segments before they are finalized."""
+    return get_videos_dir() / ".recording" / camera_name
+
+
 def motion_capture_dir_for(camera_name: str, stamp: datetime) -> Path:
     return videos_dir_for(camera_name, stamp) / "Capture"
 
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger("MotionOverlay")
+
+OVERLAY_SUFFIX = ".motion.json"
+
+Box = Tuple[int, int, int, int]
+
+
+def overlay_path(clip_path: Path) -> Path:
+    """Overlay sidecar for ``clip_path``, next to it like the ``.idx`` index."""
+    return Path(clip_path).with_suffix(OVERLAY_SUFFIX)
+
+
+@dataclass
+class MotionOverlay:
+    """Motion boxes of a clip as ``(clip seconds, x, y, w, h)``, oldest first.
+
+    Boxes are in source-frame pixels; viewers scale them with the frame.
+    A box stays visible for ``hold_s`` seconds, the gap between detections.
+    """
+
+    frame_size: Tuple[int, int]
+    hold_s: float = 1.0
+    boxes: List[Tuple[float, int, int, int, int]] = field(default_factory=list)
+
+    def add(self, t: float, box: Box) -> None:
+        self.boxes.append((round(float(t), 3), *(int(v) for v in box)))
+
+    def box_at(self, t: float) -> Optional[Box]:
+        pos = bisect.bisect_right(self.boxes, (t, float("inf"))) - 1
+        if pos < 0 or t - self.boxes[pos][0] > self.hold_s:
+            return None
+        return self.boxes[pos][1:]
+
+    def save(self, clip_path: Path) -> bool:
+        data = {
+            "frame_size": list(self.frame_size),
+            "hold_s": self.hold_s,
+            "boxes": [list(entry) for entry in self.boxes],
+        }
+        try:
+            overlay_path(clip_path).write_text(json.dumps(data), encoding="utf-8")
+        except OSError as exc:
+            logger.warning("Cannot write overlay for %s: %s", Path(clip_path).name, exc)
+            return False
+        return True
+
+    @classmethod
+    def load(cls, clip_path: Path) -> Optional["MotionOverlay"]:
+        try:
+            data = json.loads(overlay_path(clip_path).read_text(encoding="utf-8"))
+            width, height = data["frame_size"]
+            boxes = [
+                (float(t), int(x), int(y), int(w), int(h))
+                for t, x, y, w, h in data.get("boxes", [])
+            ]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return cls((int(width), int(height)), float(data.get("hold_s", 1.0)), sorted(boxes))
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.storage.catalog import KIND_RECORDING, catalog_add, catalog_remove, get_catalog
+from app.storage.recovery import RecoveredSegment
+from app.storage.segment_index import sidecar_path
+
+logger = logging.getLogger("StorageQuota")
+
+_GB = 1024 * 1024 * 1024
+_DAY_S = 24 * 60 * 60
+# Window used to estimate how many bytes a camera writes per day.
+_RATE_WINDOW_S = 7 * _DAY_S
+
+
+@dataclass(frozen=True)
+class CameraUsage:
+    camera: str
+    used_bytes: int
+    budget_bytes: int
+    bytes_per_day: float
+    forecast_days: Optional[float]
+
+    @property
+    def used_gb(self) -> float:
+        return self.used_bytes / _GB
+
+
+class StorageQuota:
+    """Byte budgets for recordings, per camera and overall.
+
+    Usage is kept in memory as a per-camera list of ``(end_ts, path, size)``
+    sorted oldest first, seeded from the catalog and then updated as
+    segments are finalized, so enforcing a budget never walks the disk.
+    ``backfill`` adds segments the catalog never saw (recorded before it
+    existed) once at startup.
+    Eviction deletes the oldest segments (camera budget: that camera's;
+    global budget or low disk space: the oldest across all cameras) and
+    drops them from the catalog.
+    """
+
+    def __init__(
+        self,
+        camera_budget_gb: Callable[[str], float],
+        global_budget_gb: Callable[[], float],
+    ) -> None:
+        self._camera_budget_gb = camera_budget_gb
+        self._global_budget_gb = global_budget_gb
+        self._lock = threading.Lock()
+        self._segments: Dict[str, List[Tuple[float, str, int]]] = {}
+        self._used: Dict[str, int] = {}
+        self._paths: Dict[str, str] = {}
+        self._free_space_ok = True
+        self._load_catalog()
+
+    def add(self, camera: str, path: Path, end: datetime) -> None:
+        """Count a finalized segment, then enforce the budgets it may exceed."""
+        path = Path(path)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return
+        with self._lock:
+            self._forget_locked(str(path))
+            self._insert_locked(camera, end.timestamp(), str(path), size)
+        self.enforce(camera)
+
+    def backfill(self, segments: Iterable[RecoveredSegment]) -> int:
+        """Count and catalogue segments not known yet; returns how many were added."""
+        added = 0
+        for segment in segments:
+            path = str(segment.path)
+            with self._lock:
+                if path in self._paths:
+                    continue
+            try:
+                size = segment.path.stat().st_size
+            except OSError:
+                continue
+            with self._lock:
+                if path in self._paths:
+                    continue
+                self._insert_locked(segment.camera, segment.end.timestamp(), path, size)
+            catalog_add(segment.path, KIND_RECORDING, segment.camera, segment.start, end=segment.end)
+            added += 1
+        if added:
+            logger.info("Backfilled %s recordings missing from the catalog", added)
+            self.enforce()
+        return added
+
+    def forget_under(self, directory: Path) -> None:
+        """Drop segments removed by someone else (e.g. retention) below ``directory``."""
+        prefix = str(Path(directory)) + os.sep
+        with self._lock:
+            for path in [path for path in self._paths if path.startswith(prefix)]:
+                self._forget_locked(path)
+
+    def enforce(self, camera: Optional[str] = None) -> int:
+        """Evict until ``camera`` and the total are within budget; returns files deleted."""
+        deleted = 0
+        if camera is not None:
+            budget = self._bytes(self._camera_budget_gb(camera))
+            while budget and self.used_bytes(camera) > budget:
+                if self._evict_oldest(camera) is None:
+                    break
+                deleted += 1
+        budget = self._bytes(self._global_budget_gb())
+        while budget and self.used_bytes() > budget:
+            if self._evict_oldest(None) is None:
+                break
+            deleted += 1
+        return deleted
+
+    def free_space(self, free_bytes: int, min_free_bytes: int) -> int:
+        """Evict the oldest segments until ``min_free_bytes`` would be free."""
+        freed = 0
+        while free_bytes + freed < min_free_bytes:
+            size = self._evict_oldest(None)
+            if size is None:
+                break
+            freed += size
+        if freed:
+            logger.info("Evicted %.2f GB of oldest recordings for free space", freed / _GB)
+        with self._lock:
+            self._free_space_ok = free_bytes + freed >= min_free_bytes
+        return freed
+
+    def freeing_space(self) -> bool:
+        """True while eviction keeps up with low disk space.
+
+        Segments must be left to evict and the last ``free_space`` pass must
+        have reached its target.
+        """
+        with self._lock:
+            return bool(self._paths) and self._free_space_ok
+
+    def used_bytes(self, camera: Optional[str] = None) -> int:
+        with self._lock:
+            if camera is None:
+                return sum(self._used.values())
+            return self._used.get(camera, 0)
+
+    def usage(self, free_bytes: int = 0) -> List[CameraUsage]:
+        """Per-camera usage and how many days of footage each budget holds.
+
+        Cameras without a budget share the global budget, or failing that
+        the free space plus what they already use.
+        """
+        now = time.time()
+        with self._lock:
+            cameras = {
+                camera: (self._used.get(camera, 0), self._rate_locked(camera, now))
+                for camera in self._segments
+            }
+        total_rate = sum(rate for _used, rate in cameras.values())
+        total_used = sum(used for used, _rate in cameras.values())
+        global_budget = self._bytes(self._global_budget_gb())
+        shared = global_budget or (total_used + max(0, int(free_bytes)))
+        result = []
+        for camera, (used, rate) in sorted(cameras.items()):
+            budget = self._bytes(self._camera_budget_gb(camera))
+            if budget:
+                forecast = budget / (rate * _DAY_S) if rate > 0 else None
+            else:
+                forecast = shared / (total_rate * _DAY_S) if total_rate > 0 else None
+            result.append(CameraUsage(camera, used, budget, rate * _DAY_S, forecast))
+        return result
+
+    def _evict_oldest(self, camera: Optional[str]) -> Optional[int]:
+        """Delete the oldest segment; bytes freed, or None when none is left."""
+        with self._lock:
+            if camera is None:
+                candidates = [name for name, items in self._segments.items() if items]
+                if not candidates:
+                    return None
+                camera = min(candidates, key=lambda name: self._segments[name][0][0])
+            items = self._segments.get(camera)
+            if not items:
+                return None
+            _end_ts, path, size = items[0]
+            self._forget_locked(path)
+        try:
+            Path(path).unlink(missing_ok=True)
+        except OSError as exc:
+            # Forgotten anyway so the next pass moves on to other segments.
+            logger.warning("Failed to evict %s: %s", path, exc)
+            return 0
+        try:
+            sidecar_path(Path(path)).unlink(missing_ok=True)
+        except OSError as exc:
+            logger.warning("Failed to evict %s: %s", sidecar_path(Path(path)), exc)
+        catalog_remove(Path(path))
+        logger.info("Evicted %s (%s)", Path(path).name, camera)
+        return size
+
+    def _rate_locked(self, camera: str, now: float) -> float:
+        """Bytes per second written by ``camera`` over the recent window."""
+        items = self._segments.get(camera) or []
+        start = bisect.bisect_left(items, (now - _RATE_WINDOW_S,))
+        recent = items[start:]
+        if not recent:
+            return 0.0
+        span = max(3600.0, now - recent[0][0])
+        return sum(size for _end, _path, size in recent) / span
+
+    def _insert_locked(self, camera: str, end_ts: float, path: str, size: int) -> None:
+        bisect.insort(self._segments.setdefault(camera, []), (end_ts, path, size))
+        self._used[camera] = self._used.get(camera, 0) + size
+        self._paths[path] = camera
+
+    def _forget_locked(self, path: str) -> None:
+        camera = self._paths.pop(path, None)
+        if camera is None:
+            return
+        items = self._segments.get(camera, [])
+        for index, item in enumerate(items):
+            if item[1] == path:
+                del items[index]
+                self._used[camera] = self._used.get(camera, 0) - item[2]
+                return
+
+    def _load_catalog(self) -> None:
+        catalog = get_catalog()
+        if catalog is None:
+            return
+        for record in catalog.all_of_kind(KIND_RECORDING):
+            self._insert_locked(
+                record.camera, record.end.timestamp(), str(record.path), record.size_bytes
+            )
+
+    @staticmethod
+    def _bytes(gb: float) -> int:
+        return int(max(0.0, float(gb or 0.0)) * _GB)
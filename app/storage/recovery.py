@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from app.storage.retention import iter_day_dirs
+from app.storage.segment_index import SegmentIndex, sidecar_path
+from app.utils.paths import get_videos_dir
+
+logger = logging.getLogger("Recovery")
+
+RECORDING_SUFFIXES = (".ts", ".mp4", ".avi")
+
+_STAMP_FORMAT = "%d-%m-%Y %Hh%Mm%Ss"
+# "<camera> <mode> dd-mm-YYYY HHhMMmSSs" with an optional " (n)" from
+# _unique_path: the name a recorder gives a segment while it is open.
+_IN_PROGRESS = re.compile(
+    r"^(?P<prefix>.+(?<! -) (?P<start>\d{2}-\d{2}-\d{4} \d{2}h\d{2}m\d{2}s))(?: \(\d+\))?$"
+)
+
+# "<camera> <mode> <start> - <end>": a finalized segment.
+_FINISHED = re.compile(
+    r"^.+ (?P<start>\d{2}-\d{2}-\d{4} \d{2}h\d{2}m\d{2}s)"
+    r" - (?P<end>\d{2}-\d{2}-\d{4} \d{2}h\d{2}m\d{2}s)(?: \(\d+\))?$"
+)
+
+
+@dataclass(frozen=True)
+class RecoveredSegment:
+    camera: str
+    path: Path
+    start: datetime
+    end: datetime
+
+
+def iter_in_progress_segments(
+    days: int, started_before: float, today: Optional[date] = None
+) -> Iterator[Path]:
+    """Start-only recordings of the last ``days`` days not written since ``started_before``.
+
+    Recorders of the current run touch their files after startup, so an
+    mtime before ``started_before`` means nobody is writing the file.
+    """
+    cutoff = (today or date.today()) - timedelta(days=max(1, int(days)))
+    for day, day_dir in iter_day_dirs(get_videos_dir()):
+        if day < cutoff:
+            continue
+        for camera_dir in _subdirs(day_dir):
+            for path in sorted(camera_dir.iterdir()):
+                if path.suffix not in RECORDING_SUFFIXES or not _IN_PROGRESS.match(path.stem):
+                    continue
+                try:
+                    if path.stat().st_mtime < started_before:
+                        yield path
+                except OSError:
+                    continue
+
+
+def iter_finished_segments(
+    started_before: float, root: Optional[Path] = None
+) -> Iterator[RecoveredSegment]:
+    """Finalized recordings under ``root`` (the videos dir) last written before ``started_before``.
+
+    Segments of the current run are counted as they are finalized; the
+    mtime check keeps a walk from racing their remux.
+    """
+    for _day, day_dir in iter_day_dirs(root or get_videos_dir()):
+        for camera_dir in _subdirs(day_dir):
+            try:
+                paths = sorted(camera_dir.iterdir())
+            except OSError:
+                continue
+            for path in paths:
+                match = _FINISHED.match(path.stem)
+                if path.suffix not in RECORDING_SUFFIXES or match is None:
+                    continue
+                try:
+                    start = datetime.strptime(match.group("start"), _STAMP_FORMAT)
+                    end = datetime.strptime(match.group("end"), _STAMP_FORMAT)
+                    if path.stat().st_mtime >= started_before:
+                        continue
+                except (ValueError, OSError):
+                    continue
+                yield RecoveredSegment(camera_dir.name, path, start, max(start, end))
+
+
+def recover_segment(path: Path) -> Optional[RecoveredSegment]:
+    """Give an orphaned segment its final ``start - end`` name.
+
+    The end time comes from the segment index when there is one, otherwise
+    from the file's last write. Empty files are deleted.
+    """
+    match = _IN_PROGRESS.match(path.stem)
+    if match is None:
+        return None
+    try:
+        start = datetime.strptime(match.group("start"), _STAMP_FORMAT)
+        stat = path.stat()
+    except (ValueError, OSError):
+        return None
+    index_path = sidecar_path(path)
+    if stat.st_size == 0:
+        for stub in (path, index_path):
+            stub.unlink(missing_ok=True)
+        return None
+    end = datetime.fromtimestamp(stat.st_mtime)
+    index = SegmentIndex.load(path)
+    if index is not None:
+        # Wall clock rather than media duration: motion-mode segments skip idle time.
+        end = datetime.fromtimestamp(index.end_wall_ts)
+    end = max(start, end)
+    target = _unique_path(
+        path.with_name(f"{match.group('prefix')} - {end:{_STAMP_FORMAT}}{path.suffix}")
+    )
+    try:
+        path.rename(target)
+        if index_path.exists():
+            index_path.rename(sidecar_path(target))
+    except OSError as exc:
+        logger.warning("Cannot rename orphaned segment %s: %s", path.name, exc)
+        return None
+    logger.info("Recovered %s", target.name)
+    return RecoveredSegment(path.parent.name, target, start, end)
+
+
+def recover_in_progress_segments(days: int, started_before: float) -> List[RecoveredSegment]:
+    recovered = []
+    for path in list(iter_in_progress_segments(days, started_before)):
+        segment = recover_segment(path)
+        if segment is not None:
+            recovered.append(segment)
+    return recovered
+
+
+def _subdirs(parent: Path) -> List[Path]:
+    try:
+        return [entry for entry in parent.iterdir() if entry.is_dir()]
+    except OSError:
+        return []
+
+
+def _unique_path(path: Path) -> Path:
+    if not path.exists():
+        return path
+    for idx in range(1, 1000):
+        candidate = path.with_name(f"{path.stem} ({idx}){path.suffix}")
+        if not candidate.exists():
+            return candidate
+    return path
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import logging
+import shutil
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from app.storage.catalog import get_catalog
+from app.utils.paths import get_exports_dir, get_pictures_dir, get_tracking_dir, get_videos_dir
+
+logger = logging.getLogger("Retention")
+
+
+def default_media_roots() -> List[Path]:
+    return [get_videos_dir(), get_pictures_dir(), get_tracking_dir(), get_exports_dir()]
+
+
+def iter_day_dirs(root: Path) -> Iterator[Tuple[date, Path]]:
+    """``(day, dir)`` for every ``YYYY/MM/DD`` directory under ``root``, oldest first.
+
+    Only directory entries are listed, never the files inside the days.
+    Names that are not a date (e.g. the ``.recording`` staging dir) are
+    skipped.
+    """
+    for year_dir in _sorted_numeric_dirs(root, 4):
+        for month_dir in _sorted_numeric_dirs(year_dir, 2):
+            for day_dir in _sorted_numeric_dirs(month_dir, 2):
+                try:
+                    day = date(int(year_dir.name), int(month_dir.name), int(day_dir.name))
+                except ValueError:
+                    continue
+                yield day, day_dir
+
+
+def delete_day_dir(day_dir: Path) -> bool:
+    """Remove one day directory, its catalog rows and emptied parents."""
+    try:
+        shutil.rmtree(day_dir)
+    except OSError as exc:
+        logger.warning("Failed to delete %s: %s", day_dir, exc)
+        return False
+    catalog = get_catalog()
+    if catalog is not None:
+        catalog.remove_under(day_dir)
+    for parent in (day_dir.parent, day_dir.parent.parent):
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+    return True
+
+
+def prune_expired_days(
+    days_keep: int,
+    roots: Iterable[Path],
+    today: Optional[date] = None,
+    on_deleted: Optional[Callable[[Path], None]] = None,
+) -> int:
+    """Delete whole day directories older than ``days_keep``; returns days removed.
+
+    Day directories are visited oldest first and the walk stops at the
+    first one still inside the window, so a pass costs a few directory
+    listings instead of a stat per file.
+    """
+    if days_keep <= 0:
+        return 0
+    cutoff = (today or date.today()) - timedelta(days=days_keep)
+    deleted = 0
+    for root in roots:
+        for day, day_dir in iter_day_dirs(root):
+            if day >= cutoff:
+                break
+            if delete_day_dir(day_dir):
+                deleted += 1
+                if on_deleted is not None:
+                    on_deleted(day_dir)
+    return deleted
+
+
+def prune_expired_exports(days_keep: int, root: Path, now: float) -> int:
+    """Exports are one directory per source video; expire them by directory mtime."""
+    if days_keep <= 0 or not root.is_dir():
+        return 0
+    cutoff = now - days_keep * 24 * 60 * 60
+    deleted = 0
+    for export_dir in root.iterdir():
+        try:
+            if not export_dir.is_dir() or export_dir.stat().st_mtime >= cutoff:
+                continue
+            shutil.rmtree(export_dir)
+        except OSError as exc:
+            logger.warning("Failed to delete %s: %s", export_dir, exc)
+            continue
+        catalog = get_catalog()
+        if catalog is not None:
+            catalog.remove_under(export_dir)
+        deleted += 1
+    return deleted
+
+
+class RetentionEngine(threading.Thread):
+    """Runs retention passes on a timer and on demand.
+
+    ``request_run()`` wakes the thread right away; the DiskMonitor's
+    low-space listener uses it so expired days are freed without waiting
+    for the next scheduled pass. Requests arriving while a pass runs are
+    coalesced into one follow-up pass.
+    """
+
+    def __init__(
+        self,
+        days_keep: Callable[[], int],
+        enabled: Callable[[], bool],
+        roots: Optional[Iterable[Path]] = None,
+        interval_s: float = 3600.0,
+        on_deleted: Optional[Callable[[Path], None]] = None,
+    ) -> None:
+        super().__init__(daemon=True, name="retention")
+        self._days_keep = days_keep
+        self._enabled = enabled
+        self._roots = list(roots) if roots is not None else default_media_roots()
+        self._interval_s = max(60.0, float(interval_s))
+        self._on_deleted = on_deleted
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    def request_run(self) -> None:
+        self._wake.set()
+
+    def stop(self, join_timeout: float = 2.0) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        self.join(timeout=join_timeout)
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self._wake.clear()
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Retention pass failed")
+            self._wake.wait(self._interval_s)
+
+    def run_once(self) -> int:
+        if not self._enabled():
+            return 0
+        days_keep = int(self._days_keep())
+        exports_dir = get_exports_dir()
+        day_roots = [root for root in self._roots if root != exports_dir]
+        deleted = prune_expired_days(days_keep, day_roots, on_deleted=self._on_deleted)
+        if exports_dir in self._roots:
+            deleted += prune_expired_exports(days_keep, exports_dir, time.time())
+        if deleted:
+            logger.info("Retention deleted %s directories", deleted)
+        return deleted
+
+
+def _sorted_numeric_dirs(parent: Path, width: int) -> List[Path]:
+    try:
+        entries = [
+            entry
+            for entry in parent.iterdir()
+            if len(entry.name) == width and entry.name.isdigit() and entry.is_dir()
+        ]
+    except OSError:
+        return []
+    return sorted(entries, key=lambda entry: entry.name)
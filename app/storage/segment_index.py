@@ -0,0 +1,471 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+import cv2
+
+logger = logging.getLogger("SegmentIndex")
+
+_MAGIC = b"SGPIDX\x00\x01"
+# magic, fps, container suffix (e.g. b".ts")
+_HEADER = struct.Struct("<8sd8s")
+# frame number, pts in ms, wall-clock seconds, flags, byte offset (-1 unknown)
+_RECORD = struct.Struct("<qqdIq")
+_OFFSET_FIELD = struct.Struct("<q")
+_OFFSET_POS = _RECORD.size - _OFFSET_FIELD.size
+
+FLAG_KEYFRAME = 1
+
+# Seek points tried, newest first, before ``seek_capture`` decodes from the start.
+_SEEK_ATTEMPTS = 3
+
+_TS_PACKET = 188
+_TS_SYNC = 0x47
+
+
+def sidecar_path(video_path: Path) -> Path:
+    """Index file for ``video_path``; keyed on the stem so it survives remux."""
+    return Path(video_path).with_suffix(".idx")
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    frame_no: int
+    pts_ms: int
+    wall_ts: float
+    flags: int
+    byte_offset: int
+
+    @property
+    def is_keyframe(self) -> bool:
+        return bool(self.flags & FLAG_KEYFRAME)
+
+
+class SegmentIndexWriter:
+    """Appends seek points for one recording segment to its ``.idx`` sidecar."""
+
+    def __init__(self, video_path: Path, fps: float = 0.0) -> None:
+        self.path = sidecar_path(video_path)
+        self._file: Optional[BinaryIO] = None
+        self._records = 0
+        self._last_flush = time.monotonic()
+        try:
+            self._file = self.path.open("w+b")
+            suffix = Path(video_path).suffix.encode("ascii", "ignore")[:8]
+            self._file.write(_HEADER.pack(_MAGIC, float(fps), suffix))
+        except OSError as exc:
+            logger.warning("Cannot create index %s: %s", self.path.name, exc)
+            self._file = None
+
+    def add(
+        self,
+        frame_no: int,
+        pts_s: float,
+        wall_ts: float,
+        keyframe: bool = False,
+        byte_offset: int = -1,
+    ) -> int:
+        """Append one record; returns its number (for ``set_byte_offset``), or -1."""
+        if self._file is None:
+            return -1
+        flags = FLAG_KEYFRAME if keyframe else 0
+        pts_ms = int(round(pts_s * 1000.0))
+        self._file.write(
+            _RECORD.pack(int(frame_no), pts_ms, float(wall_ts), flags, int(byte_offset))
+        )
+        record = self._records
+        self._records += 1
+        now = time.monotonic()
+        if now - self._last_flush >= 5.0:
+            self._last_flush = now
+            self._file.flush()
+        return record
+
+    def set_byte_offset(self, record: int, byte_offset: int) -> None:
+        """Fill in the file position of a record added before it was known."""
+        if self._file is None or not 0 <= record < self._records:
+            return
+        self._file.seek(_HEADER.size + record * _RECORD.size + _OFFSET_POS)
+        self._file.write(_OFFSET_FIELD.pack(int(byte_offset)))
+        self._file.seek(0, 2)
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self._file = None
+
+
+class SegmentIndex:
+    """Read side of a segment sidecar: time/frame lookups without scanning video."""
+
+    def __init__(self, fps: float, container: str, entries: List[IndexEntry]) -> None:
+        self.fps = fps
+        self.container = container
+        self.entries = entries
+        self._pts = [entry.pts_ms for entry in entries]
+        self._frames = [entry.frame_no for entry in entries]
+        self._walls = [entry.wall_ts for entry in entries]
+
+    @classmethod
+    def load(cls, video_path: Path) -> Optional["SegmentIndex"]:
+        """Index of ``video_path``, or None if there is none or it describes
+        another container (a remux or transcode that was not retargeted)."""
+        index = cls._read(video_path)
+        if index is not None and index.container != Path(video_path).suffix:
+            logger.debug("Ignoring %s index for %s", index.container, Path(video_path).name)
+            return None
+        return index
+
+    @classmethod
+    def _read(cls, video_path: Path) -> Optional["SegmentIndex"]:
+        path = sidecar_path(video_path)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, fps, suffix = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            logger.warning("Not a segment index: %s", path.name)
+            return None
+        entries: List[IndexEntry] = []
+        # A segment that was being written at a crash may end mid-record.
+        usable = (len(data) - _HEADER.size) // _RECORD.size * _RECORD.size
+        for values in _RECORD.iter_unpack(data[_HEADER.size : _HEADER.size + usable]):
+            entries.append(IndexEntry(*values))
+        if not entries:
+            return None
+        # Keyframes found in the written file are appended after later seek points.
+        entries.sort(key=lambda entry: entry.frame_no)
+        return cls(fps, suffix.rstrip(b"\x00").decode("ascii", "ignore"), entries)
+
+    @property
+    def duration_s(self) -> float:
+        last = self.entries[-1]
+        tail = 1.0 / self.fps if self.fps > 0 else 0.0
+        return last.pts_ms / 1000.0 + tail
+
+    @property
+    def frame_count(self) -> int:
+        return self.entries[-1].frame_no + 1
+
+    def entry_before_frame(self, frame_no: int, keyframe: bool = True) -> Optional[IndexEntry]:
+        pos = bisect.bisect_right(self._frames, frame_no) - 1
+        return self._walk_back(pos, keyframe)
+
+    def entry_before_time(self, seconds: float, keyframe: bool = True) -> Optional[IndexEntry]:
+        pos = bisect.bisect_right(self._pts, int(seconds * 1000.0)) - 1
+        return self._walk_back(pos, keyframe)
+
+    @property
+    def end_wall_ts(self) -> float:
+        """Wall clock just after the last indexed frame."""
+        tail = 1.0 / self.fps if self.fps > 0 else 0.0
+        return self.entries[-1].wall_ts + tail
+
+    def time_for_wall(self, wall_ts: float) -> Optional[float]:
+        """Media time (s) at wall-clock ``wall_ts``, or None outside the segment."""
+        if not self._walls or wall_ts < self._walls[0] or wall_ts > self._walls[-1] + 1.0:
+            return None
+        pos = max(0, bisect.bisect_right(self._walls, wall_ts) - 1)
+        seconds = self._pts[pos] / 1000.0 + max(0.0, wall_ts - self._walls[pos])
+        if pos + 1 < len(self._pts):
+            # Skipped wall time (idle gaps) maps onto the next indexed frame.
+            seconds = min(seconds, self._pts[pos + 1] / 1000.0)
+        return seconds
+
+    def wall_for_time(self, seconds: float) -> Optional[float]:
+        """Wall clock of media time ``seconds``; media time runs 1:1 between seek points."""
+        pos = bisect.bisect_right(self._pts, int(seconds * 1000.0)) - 1
+        if pos < 0:
+            return None
+        wall = self._walls[pos] + max(0.0, seconds - self._pts[pos] / 1000.0)
+        if pos + 1 < len(self._walls):
+            wall = min(wall, self._walls[pos + 1])
+        return wall
+
+    def _walk_back(self, pos: int, keyframe: bool) -> Optional[IndexEntry]:
+        while pos >= 0:
+            entry = self.entries[pos]
+            if not keyframe or entry.is_keyframe:
+                return entry
+            pos -= 1
+        return None
+
+
+def retarget_sidecar(video_path: Path, keyframes: bool) -> bool:
+    """Point the sidecar at ``video_path`` after its segment was remuxed.
+
+    The sidecar is keyed on the stem, so it is shared with the source
+    file. Frame numbers, pts and wall clock survive a remux or a CFR
+    transcode; byte offsets never do, and keyframe flags only survive a
+    stream copy (``keyframes``), where the GOPs are unchanged. A sidecar
+    that cannot be rewritten is removed.
+    """
+    video_path = Path(video_path)
+    path = sidecar_path(video_path)
+    index = SegmentIndex._read(video_path)
+    if index is None:
+        return False
+    suffix = video_path.suffix.encode("ascii", "ignore")[:8]
+    records = [_HEADER.pack(_MAGIC, float(index.fps), suffix)]
+    for entry in index.entries:
+        flags = entry.flags if keyframes else entry.flags & ~FLAG_KEYFRAME
+        records.append(_RECORD.pack(entry.frame_no, entry.pts_ms, entry.wall_ts, flags, -1))
+    tmp_path = path.with_name(path.name + ".part")
+    try:
+        tmp_path.write_bytes(b"".join(records))
+        os.replace(tmp_path, path)
+    except OSError as exc:
+        logger.warning("Cannot retarget index %s: %s", path.name, exc)
+        for stale in (tmp_path, path):
+            try:
+                stale.unlink(missing_ok=True)
+            except OSError:
+                pass
+        return False
+    return True
+
+
+def seek_capture(cap, target: int, fps: float, index: Optional[SegmentIndex]) -> None:
+    """Position a ``cv2.VideoCapture`` so the next read returns frame ``target``.
+
+    Seeks by time to an indexed keyframe's pts before ``target`` (without
+    indexed keyframes, to a point somewhat before it), reads back where the decoder
+    landed and grabs forward from there. OpenCV's seeks in MPEG-TS are
+    approximate, so a landing at or past the target retries from an
+    earlier point and finally decodes from the start.
+    """
+    if target <= 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        return
+    fps = max(0.1, float(fps))
+    seek_points: List[float] = []
+    if index is not None:
+        entry = index.entry_before_frame(target - 1)
+        while entry is not None and len(seek_points) < _SEEK_ATTEMPTS:
+            seek_points.append(float(entry.pts_ms))
+            entry = index.entry_before_frame(entry.frame_no - 1)
+    if not seek_points:
+        for back_s in (1, 4, 16)[:_SEEK_ATTEMPTS]:
+            frame_no = target - back_s * fps
+            if frame_no <= 0:
+                break
+            seek_points.append(frame_no * 1000.0 / fps)
+    for seek_ms in seek_points:
+        cap.set(cv2.CAP_PROP_POS_MSEC, seek_ms)
+        if not cap.grab():
+            continue
+        landed = int(round(cap.get(cv2.CAP_PROP_POS_MSEC) * fps / 1000.0))
+        if landed < target:
+            _grab_to(cap, landed + 1, target)
+            return
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    _grab_to(cap, 0, target)
+
+
+def _grab_to(cap, position: int, target: int) -> None:
+    while position < target:
+        if not cap.grab():
+            return
+        position += 1
+
+
+class TsKeyframeTail:
+    """Follows a growing MPEG-TS file and reports where its video keyframes start.
+
+    Each ``poll`` reads only the bytes appended since the last one and
+    returns ``(byte offset, pts seconds)`` for every video PES flagged as a
+    random access point, i.e. the TS packet a reader can start decoding at.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._file: Optional[BinaryIO] = None
+        self._pos = 0
+        self._pending = b""
+
+    def poll(self) -> List[Tuple[int, float]]:
+        if self._file is None:
+            try:
+                self._file = self.path.open("rb")
+            except OSError:
+                return []
+        try:
+            self._file.seek(self._pos + len(self._pending))
+            data = self._pending + self._file.read()
+        except OSError:
+            return []
+        found = []
+        start = 0
+        while len(data) - start >= _TS_PACKET:
+            if data[start] != _TS_SYNC:
+                # Lost sync (e.g. a torn write): skip to the next sync byte.
+                start = data.find(bytes([_TS_SYNC]), start + 1)
+                if start < 0:
+                    start = len(data)
+                continue
+            pts = _ts_keyframe_pts(data[start : start + _TS_PACKET])
+            if pts is not None:
+                found.append((self._pos + start, pts))
+            start += _TS_PACKET
+        self._pos += start
+        self._pending = data[start:]
+        return found
+
+    def close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+
+def _ts_keyframe_pts(packet: bytes) -> Optional[float]:
+    """PTS (s) if ``packet`` starts a video PES at a random access point."""
+    if not packet[1] & 0x40:  # payload_unit_start_indicator
+        return None
+    control = (packet[3] >> 4) & 0x3
+    if not control & 0x2 or not control & 0x1:
+        return None
+    af_len = packet[4]
+    if af_len == 0 or not packet[5] & 0x40:  # random_access_indicator
+        return None
+    pes = packet[5 + af_len :]
+    if len(pes) < 14 or pes[:3] != b"\x00\x00\x01" or not 0xE0 <= pes[3] <= 0xEF:
+        return None
+    if not pes[7] & 0x80:
+        return None
+    p = pes[9:14]
+    pts = (
+        ((p[0] >> 1) & 0x07) << 30
+        | p[1] << 22
+        | (p[2] >> 1) << 15
+        | p[3] << 7
+        | p[4] >> 1
+    )
+    return pts / 90000.0
+
+
+def mp4_fragment_offsets(path: Path) -> List[int]:
+    """File offsets of the ``moof`` boxes of a fragmented MP4, in order."""
+    offsets = []
+    try:
+        with Path(path).open("rb") as handle:
+            pos = 0
+            while True:
+                handle.seek(pos)
+                header = handle.read(16)
+                if len(header) < 8:
+                    break
+                size, kind = struct.unpack(">I4s", header[:8])
+                if size == 1 and len(header) == 16:
+                    size = struct.unpack(">Q", header[8:16])[0]
+                if size < 8:
+                    break
+                if kind == b"moof":
+                    offsets.append(pos)
+                pos += size
+    except OSError:
+        pass
+    return offsets
+
+
+class IndexedVideoWriter:
+    """Wraps a cv2.VideoWriter-like writer and indexes what it writes.
+
+    Output is constant-rate, so frame ``n`` sits at ``n / fps``. A seek point
+    is stored every ``interval`` frames. With ``keyframe_interval`` set (the
+    encoder's fixed GOP, fragmented MP4) those frames are flagged as
+    keyframes and get their ``moof`` offsets at release. MPEG-TS output is
+    followed with a TsKeyframeTail instead, so the keyframes the encoder
+    chose are indexed with their frame number and byte offset.
+    """
+
+    def __init__(
+        self,
+        writer,
+        video_path: Path,
+        fps: float,
+        keyframe_interval: int = 0,
+    ) -> None:
+        self._writer = writer
+        self._path = Path(video_path)
+        self._fps = max(0.1, float(fps))
+        self._keyframe_interval = max(0, int(keyframe_interval))
+        self._interval = self._keyframe_interval or max(1, int(round(self._fps)))
+        self._frames = 0
+        self._last_indexed = -1
+        self._walls: List[float] = []
+        self._keyframe_records: List[int] = []
+        self._first_pts: Optional[float] = None
+        self._ts_tail = (
+            TsKeyframeTail(self._path)
+            if not self._keyframe_interval and self._path.suffix == ".ts"
+            else None
+        )
+        self._index = SegmentIndexWriter(video_path, self._fps)
+
+    def isOpened(self) -> bool:
+        return self._writer.isOpened()
+
+    def write(self, frame, wall_ts: Optional[float] = None) -> None:
+        """Write one frame.
+
+        ``wall_ts`` is the capture time the frame stands for; recorders pass
+        it so the index maps media time back to wall clock.
+        """
+        on_interval = self._frames % self._interval == 0
+        wall = time.time() if wall_ts is None else wall_ts
+        self._walls.append(wall)
+        if on_interval:
+            gop_keyframe = self._keyframe_interval > 0
+            record = self._index.add(
+                self._frames, self._frames / self._fps, wall, keyframe=gop_keyframe
+            )
+            if gop_keyframe:
+                self._keyframe_records.append(record)
+            self._last_indexed = self._frames
+            if self._ts_tail is not None:
+                self._index_ts_keyframes()
+        self._writer.write(frame)
+        self._frames += 1
+
+    def release(self) -> None:
+        self._writer.release()
+        if self._ts_tail is not None:
+            self._index_ts_keyframes()
+            self._ts_tail.close()
+        elif self._keyframe_records and self._path.suffix == ".mp4":
+            offsets = mp4_fragment_offsets(self._path)
+            for record, offset in zip(self._keyframe_records, offsets):
+                self._index.set_byte_offset(record, offset)
+        last = self._frames - 1
+        if last > self._last_indexed:
+            # Close with the last frame so frame_count and the end time are exact.
+            self._index.add(last, last / self._fps, self._walls[-1])
+        self._index.close()
+
+    def _index_ts_keyframes(self) -> None:
+        for offset, pts in self._ts_tail.poll():
+            if self._first_pts is None:
+                self._first_pts = pts
+            # Constant-rate output: the PTS gives the frame number exactly.
+            frame_no = max(0, int(round((pts - self._first_pts) * self._fps)))
+            wall = self._walls[min(frame_no, len(self._walls) - 1)]
+            self._index.add(
+                frame_no, frame_no / self._fps, wall, keyframe=True, byte_offset=offset
+            )
@@ -156,7 +156,11 @@ class AppUI:
         )
         self.edit_view = EditView(self.content)
         self.settings_view = SettingsView(
-            self.content, self.app_config, self.config_store, self.camera_manager
+            self.content,
+            self.app_config,
+            self.config_store,
+            self.camera_manager,
+            recorder_manager=self.recorder_manager,
         )
 
         self.manage_view.pack(fill=tk.BOTH, expand=True)
@@ -178,6 +182,7 @@ class AppUI:
             self.edit_view.pack(fill=tk.BOTH, expand=True)
         elif tab_name == "Settings":
             self.live_view.set_active(False)
+            self.settings_view.refresh_usage()
             self.settings_view.pack(fill=tk.BOTH, expand=True)
         else:
             self.live_view.set_active(True)
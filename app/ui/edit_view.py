@@ -10,11 +10,16 @@ import cv2
 import numpy as np
 from PIL import Image, ImageTk
 import time
+from datetime import datetime, timedelta
 
+from app.storage.catalog import KIND_EXPORT, catalog_add, get_catalog
+from app.storage.motion_overlay import MotionOverlay
+from app.storage.segment_index import SegmentIndex, seek_capture
 from app.ui.edit_components import EditToolbar, PlaybackControls
+from app.ui.recordings_dialog import RecordingsDialog
 from app.ui.widgets.trackbar_view import TrackbarView
 from app.ui.widgets.empty_state import EmptyState
-from app.utils.paths import get_base_dir, get_files_dir
+from app.utils.paths import get_base_dir, get_exports_dir, get_files_dir
 
 try:
     import mpv
@@ -35,6 +40,8 @@ class EditView(ttk.Frame):
         self._video_path: Path | None = None
         self._last_open_dir: Path | None = None
         self._video_cap = None
+        self._segment_index: SegmentIndex | None = None
+        self._motion_overlay: MotionOverlay | None = None
         self._video_playing = False
         self._video_fps = 25.0
         self._play_speed = 1.0
@@ -183,23 +190,17 @@ class EditView(ttk.Frame):
         self._loop_btn = controls.loop_button
 
     def _open_file(self) -> None:
-        base_dir = Path(get_files_dir())
-        if self._last_open_dir is not None:
-            initial_dir = self._last_open_dir
-        elif self._video_path is not None:
-            initial_dir = self._video_path.parent
+        # Catalogued videos by day first; "Other file..." falls back to the
+        # regular file dialog.
+        RecordingsDialog(self, self._open_path).open()
+
+    def _open_path(self, chosen: Path | None) -> None:
+        if chosen is None:
+            path = self._ask_open_path()
+            if not path:
+                return
         else:
-            initial_dir = base_dir
-        path = filedialog.askopenfilename(
-            title="Open File",
-            initialdir=str(initial_dir),
-            filetypes=[
-                ("Video files", "*.mp4 *.avi *.mkv *.ts *.mov"),
-                ("All files", "*.*"),
-            ],
-        )
-        if not path:
-            return
+            path = str(chosen)
         self._last_open_dir = Path(path).parent
         if self._toolbar is not None:
             self._toolbar.set_trim_state(enabled=True, on=False)
@@ -218,6 +219,23 @@ class EditView(ttk.Frame):
                 return
         self._load_video(Path(path))
 
+    def _ask_open_path(self) -> str:
+        base_dir = Path(get_files_dir())
+        if self._last_open_dir is not None:
+            initial_dir = self._last_open_dir
+        elif self._video_path is not None:
+            initial_dir = self._video_path.parent
+        else:
+            initial_dir = base_dir
+        return filedialog.askopenfilename(
+            title="Open File",
+            initialdir=str(initial_dir),
+            filetypes=[
+                ("Video files", "*.mp4 *.avi *.mkv *.ts *.mov"),
+                ("All files", "*.*"),
+            ],
+        )
+
     def _load_video(self, path: Path) -> None:
         if self._mpv_player is not None:
             try:
@@ -240,7 +258,13 @@ class EditView(ttk.Frame):
         self._set_empty_state_visible(False)
         self._total_frames = int(self._video_cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
         fps = self._video_cap.get(cv2.CAP_PROP_FPS) or 0.0
-        if fps < 20.0 or fps > 120.0:
+        # Recorder sidecar: exact frame count and rate, and seek points.
+        self._segment_index = SegmentIndex.load(path)
+        self._motion_overlay = MotionOverlay.load(path)
+        if self._segment_index is not None:
+            self._total_frames = self._segment_index.frame_count
+            fps = self._segment_index.fps
+        elif fps < 20.0 or fps > 120.0:
             fps = 30.0
         self._video_fps = fps
         self._duration = self._total_frames / fps if self._total_frames > 0 else 0.0
@@ -283,7 +307,7 @@ class EditView(ttk.Frame):
         )
         if target_frame < 0:
             target_frame = 0
-        self._video_cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
+        self._seek_capture(target_frame)
         ok, frame = self._video_cap.read()
         if not ok or frame is None:
             if self._loop_enabled:
@@ -430,15 +454,11 @@ class EditView(ttk.Frame):
         error = None
         try:
             if self._video_path is not None:
-                output_dir = (
-                    get_base_dir()
-                    / "Files"
-                    / "Exports"
-                    / self._video_path.stem
-                )
+                output_dir = get_exports_dir() / self._video_path.stem
                 output_dir.mkdir(parents=True, exist_ok=True)
                 out_file = output_dir / f"{self._video_path.stem}_edited.mp4"
                 self._run_ffmpeg_edit(self._video_path, out_file, params)
+                self._catalog_export(self._video_path, out_file, params)
         except Exception as exc:
             error = str(exc)
         finally:
@@ -485,6 +505,24 @@ class EditView(ttk.Frame):
         except FileNotFoundError:
             raise RuntimeError("FFmpeg not found. Please install FFmpeg and add to PATH.")
 
+    def _catalog_export(self, src: Path, dst: Path, params: dict) -> None:
+        source = None
+        catalog = get_catalog()
+        if catalog is not None:
+            source = catalog.get(src)
+        trim = params.get("trim") or {}
+        if source is not None:
+            camera, base, end, codec = source.camera, source.start, source.end, source.codec
+        else:
+            camera, base, codec = src.parent.name, datetime.fromtimestamp(src.stat().st_mtime), ""
+            end = base + timedelta(seconds=self._duration or 0.0)
+        start = base + timedelta(seconds=float(trim.get("start_sec", 0.0)))
+        if "end_sec" in trim:
+            end = base + timedelta(seconds=float(trim["end_sec"]))
+        if params.get("crop"):
+            codec = "h264"
+        catalog_add(dst, KIND_EXPORT, camera, start, end=end, codec=codec, source_path=src)
+
     def _show_waiting_dialog(self) -> None:
         if self._waiting_dialog is not None:
             return
@@ -652,6 +690,7 @@ class EditView(ttk.Frame):
         if target_label is None or w <= 0 or h <= 0:
             return
         self._set_empty_state_visible(False)
+        frame = self._apply_motion_overlay(frame)
         fh, fw = frame.shape[:2]
         scale = min(w / float(fw), h / float(fh))
         new_w = max(1, int(fw * scale))
@@ -680,6 +719,28 @@ class EditView(ttk.Frame):
         target_label.configure(image=photo)
         target_label.image = photo
 
+    def _apply_motion_overlay(self, frame: np.ndarray) -> np.ndarray:
+        """Draw the clip's stored motion box for the frame on screen, if any."""
+        if self._motion_overlay is None or self._video_cap is None:
+            return frame
+        pos = int(self._video_cap.get(cv2.CAP_PROP_POS_FRAMES) or 0) - 1
+        box = self._motion_overlay.box_at(max(0, pos) / max(1.0, self._video_fps))
+        if box is None:
+            return frame
+        fw, fh = self._motion_overlay.frame_size
+        sx = frame.shape[1] / float(fw or frame.shape[1])
+        sy = frame.shape[0] / float(fh or frame.shape[0])
+        x, y, w, h = box
+        frame = frame.copy()
+        cv2.rectangle(
+            frame,
+            (int(x * sx), int(y * sy)),
+            (int((x + w) * sx), int((y + h) * sy)),
+            (0, 200, 255),
+            2,
+        )
+        return frame
+
     def _apply_crop_overlay(self, frame: np.ndarray) -> None:
         if not self._crop_enabled or self._crop_rect is None or self._display_box is None:
             return
@@ -1016,7 +1077,7 @@ class EditView(ttk.Frame):
         if self._video_cap is None or self._total_frames <= 0:
             return
         target = int(max(0.0, min(1.0, ratio)) * self._total_frames)
-        self._video_cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        self._seek_capture(target)
         self._play_start_ts = time.time()
         self._play_start_frame = target
         if resume:
@@ -1030,11 +1091,31 @@ class EditView(ttk.Frame):
                 self._set_play_icon()
             self._preview_at_ratio(ratio)
 
+    def _seek_capture(self, target: int) -> None:
+        """Position the capture at ``target`` with as little decoding as possible.
+
+        Short forward moves (normal playback) just grab the frames in
+        between. Other jumps seek to the pts of the indexed keyframe before
+        ``target``, check where the decoder landed and grab forward from
+        there (see ``seek_capture``).
+        """
+        cap = self._video_cap
+        if cap is None:
+            return
+        current = int(cap.get(cv2.CAP_PROP_POS_FRAMES) or 0)
+        max_skip = max(1, int(self._video_fps * 2))
+        if 0 <= target - current <= max_skip:
+            for _ in range(target - current):
+                if not cap.grab():
+                    break
+            return
+        seek_capture(cap, target, self._video_fps, self._segment_index)
+
     def _preview_at_ratio(self, ratio: float) -> None:
         if self._video_cap is None or self._total_frames <= 0:
             return
         target = int(max(0.0, min(1.0, ratio)) * self._total_frames)
-        self._video_cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        self._seek_capture(target)
         ok, frame = self._video_cap.read()
         if not ok or frame is None:
             return
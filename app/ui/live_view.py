@@ -12,7 +12,7 @@ import unicodedata
 from app.config.models import AppConfig
 from app.core.camera_manager import CameraManager
 from app.core.stream_manager import StreamManager
-from app.core.frame_store import FrameStore
+from app.core.frame_store import FrameLevel, FrameStore
 from app.core.recorder_manager import RecorderManager
 from app.ui.widgets.empty_state import EmptyState
 
@@ -41,6 +41,9 @@ class LiveView(ttk.Frame):
         self._canvas_image_id: int | None = None
         self._canvas_photo: ImageTk.PhotoImage | None = None
         self._latest_frames: dict[str, np.ndarray] = {}
+        self._latest_versions: dict[str, int] = {}
+        self._stream_keys: dict[str, str] = {}
+        self._rendered_signature: tuple | None = None
         self._active_streams: set[str] = set()
         self._render_tick_ms = 60
         self.refresh_ms = 350
@@ -541,17 +544,23 @@ class LiveView(ttk.Frame):
         selected = set(self._get_selected_names())
         existing = set(self._active_streams)
         for name in selected - existing:
-            self.stream_manager.acquire(name, "live")
+            self._stream_keys[name] = self.stream_manager.acquire(
+                name, "live", fps=min(self._preview_fps_base, 15.0)
+            )
             self._active_streams.add(name)
         for name in existing - selected:
             self.stream_manager.release(name, "live")
             self._latest_frames.pop(name, None)
+            self._latest_versions.pop(name, None)
+            self._stream_keys.pop(name, None)
             self._active_streams.discard(name)
 
     def _shutdown_captures(self) -> None:
         for name in list(self._active_streams):
             self.stream_manager.release(name, "live")
         self._latest_frames.clear()
+        self._latest_versions.clear()
+        self._stream_keys.clear()
         self._active_streams.clear()
 
     def _grid_for_count(self, count: int) -> tuple[int, int]:
@@ -739,16 +748,9 @@ class LiveView(ttk.Frame):
         else:
             self._preview_fps = min(self._preview_fps_base, 10.0)
         self._render_interval = 1.0 / max(1.0, min(self._preview_fps, 15.0))
-
-    def _downscale_frame(self, frame: np.ndarray) -> np.ndarray:
-        max_dim = self._preview_max_dim
-        h, w = frame.shape[:2]
-        if max(h, w) <= max_dim:
-            return frame
-        scale = max_dim / float(max(h, w))
-        new_w = max(1, int(w * scale))
-        new_h = max(1, int(h * scale))
-        return cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+        self.frame_store.register_level(
+            "preview", FrameLevel(max_dim=self._preview_max_dim)
+        )
 
     def _prev_page(self) -> None:
         if self.page_index > 0:
@@ -766,7 +768,7 @@ class LiveView(ttk.Frame):
         if name in self.recorder_manager.list_active():
             return "recording"
         try:
-            runtime = self.camera_manager.get_runtime(name)
+            runtime = self.camera_manager.get_stream_runtime(self._stream_keys.get(name, name))
             return runtime.status
         except Exception:
             return "offline"
@@ -793,10 +795,26 @@ class LiveView(ttk.Frame):
         now = time.time()
         if now - self._last_render_ts >= self._render_interval:
             self._last_render_ts = now
-            self._render_view()
+            if self._render_signature() != self._rendered_signature:
+                self._render_view()
         self.after(self._render_tick_ms, self._tick_render)
 
+    def _render_signature(self) -> tuple:
+        names = self._get_selected_names()
+        start = self.page_index * self.page_size
+        page_names = names[start : start + self.page_size]
+        return (
+            self.view_size,
+            self.page_index,
+            tuple(names),
+            tuple(
+                self.frame_store.get_version(self._stream_keys.get(name, name))
+                for name in page_names
+            ),
+        )
+
     def _render_view(self) -> None:
+        self._rendered_signature = self._render_signature()
         names = self._get_selected_names()
         if not names:
             if self._canvas_image_id is not None:
@@ -880,12 +898,16 @@ class LiveView(ttk.Frame):
         return canvas
 
     def _get_live_frame(self, name: str) -> np.ndarray | None:
-        frame = self.frame_store.get_frame(name)
-        if frame is None:
+        stream_key = self._stream_keys.get(name, name)
+        version = self.frame_store.get_version(stream_key)
+        if version == 0 or version == self._latest_versions.get(name):
             return self._latest_frames.get(name)
-        frame = self._downscale_frame(frame)
-        self._latest_frames[name] = frame
-        return frame
+        entry = self.frame_store.get_level(stream_key, "preview")
+        if entry is None:
+            return self._latest_frames.get(name)
+        self._latest_frames[name] = entry.frame
+        self._latest_versions[name] = entry.version
+        return entry.frame
 
     def _ascii_label(self, text: str) -> str:
         if not text:
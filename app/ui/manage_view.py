@@ -242,6 +242,7 @@ class ManageView(ttk.Frame):
 
         source_var = tk.StringVar(value="rtsp")
         url_var = tk.StringVar()
+        sub_url_var = tk.StringVar()
         user_var = tk.StringVar()
         pass_var = tk.StringVar()
         name_var = tk.StringVar()
@@ -302,6 +303,12 @@ class ManageView(ttk.Frame):
         pass_entry = ttk.Entry(rtsp_group, textvariable=pass_var, width=28, show="*")
         pass_entry.grid(row=2, column=1, sticky="w", pady=6)
 
+        ttk.Label(rtsp_group, text="Sub-stream URL:", style="Modal.TLabel").grid(
+            row=3, column=0, sticky="w", pady=6, padx=(0, 8)
+        )
+        sub_url_entry = ttk.Entry(rtsp_group, textvariable=sub_url_var, width=40)
+        sub_url_entry.grid(row=3, column=1, sticky="w", pady=6)
+
         device_group = ttk.Labelframe(
             form, text="Select Device", padding=12, style="Modal.TLabelframe"
         )
@@ -341,11 +348,13 @@ class ManageView(ttk.Frame):
             rtsp_url_entry.configure(state="normal")
             user_entry.configure(state="normal")
             pass_entry.configure(state="normal")
+            sub_url_entry.configure(state="normal")
             device_box.configure(state="normal")
             if is_device:
                 rtsp_url_entry.configure(state="disabled")
                 user_entry.configure(state="disabled")
                 pass_entry.configure(state="disabled")
+                sub_url_entry.configure(state="disabled")
             else:
                 device_box.configure(state="disabled")
 
@@ -389,6 +398,7 @@ class ManageView(ttk.Frame):
                     stream_path="",
                     source="rtsp",
                     rtsp_url=rtsp_url,
+                    sub_rtsp_url=sub_url_var.get().strip(),
                 )
 
             if messagebox.askyesno("Confirm", "Add this camera to the list?"):
@@ -460,10 +470,12 @@ class ManageView(ttk.Frame):
 
         source_var = tk.StringVar(value=cam.source)
         url_var = tk.StringVar(value=cam.rtsp_url)
+        sub_url_var = tk.StringVar(value=cam.sub_rtsp_url)
         user_var = tk.StringVar(value=cam.user)
         pass_var = tk.StringVar(value=cam.password)
         name_var = tk.StringVar(value=cam.name)
         device_var = tk.StringVar(value=f"Device {cam.device_index}")
+        mode_var = tk.StringVar(value=cam.mode)
 
         source_row = ttk.Frame(body, style="Modal.TFrame")
         source_row.pack(fill=tk.X, pady=(0, 8))
@@ -491,6 +503,17 @@ class ManageView(ttk.Frame):
         )
         ttk.Entry(body, textvariable=name_var, width=40).pack(anchor="w", pady=(0, 12))
 
+        ttk.Label(body, text="Recording mode:", style="Modal.TLabel").pack(
+            anchor="w", pady=(0, 6)
+        )
+        ttk.Combobox(
+            body,
+            textvariable=mode_var,
+            values=["Continuous", "Motion"],
+            state="readonly",
+            width=20,
+        ).pack(anchor="w", pady=(0, 12))
+
         rtsp_group = ttk.Labelframe(
             body, text="RTSP URL", padding=12, style="Modal.TLabelframe"
         )
@@ -514,6 +537,12 @@ class ManageView(ttk.Frame):
         pass_entry = ttk.Entry(rtsp_group, textvariable=pass_var, width=28, show="*")
         pass_entry.grid(row=2, column=1, sticky="w", pady=6)
 
+        ttk.Label(rtsp_group, text="Sub-stream URL:", style="Modal.TLabel").grid(
+            row=3, column=0, sticky="w", pady=6, padx=(0, 8)
+        )
+        sub_url_entry = ttk.Entry(rtsp_group, textvariable=sub_url_var, width=40)
+        sub_url_entry.grid(row=3, column=1, sticky="w", pady=6)
+
         device_group = ttk.Labelframe(
             form, text="Select Device", padding=12, style="Modal.TLabelframe"
         )
@@ -554,11 +583,13 @@ class ManageView(ttk.Frame):
             rtsp_url_entry.configure(state="normal")
             user_entry.configure(state="normal")
             pass_entry.configure(state="normal")
+            sub_url_entry.configure(state="normal")
             device_box.configure(state="normal")
             if is_device:
                 rtsp_url_entry.configure(state="disabled")
                 user_entry.configure(state="disabled")
                 pass_entry.configure(state="disabled")
+                sub_url_entry.configure(state="disabled")
             else:
                 device_box.configure(state="disabled")
 
@@ -582,10 +613,13 @@ class ManageView(ttk.Frame):
                     port=0,
                     user="",
                     password="",
-                    stream_path="",
+                    stream_path=cam.stream_path,
+                    mode=mode_var.get(),
                     source="device",
                     device_index=index,
                     enabled=cam.enabled,
+                    sub_stream_path=cam.sub_stream_path,
+                    quota_gb=cam.quota_gb,
                 )
             else:
                 rtsp_url = url_var.get().strip()
@@ -598,10 +632,14 @@ class ManageView(ttk.Frame):
                     port=0,
                     user=user_var.get().strip(),
                     password=pass_var.get().strip(),
-                    stream_path="",
+                    stream_path=cam.stream_path,
+                    mode=mode_var.get(),
                     source="rtsp",
                     rtsp_url=rtsp_url,
+                    sub_stream_path=cam.sub_stream_path,
+                    sub_rtsp_url=sub_url_var.get().strip(),
                     enabled=cam.enabled,
+                    quota_gb=cam.quota_gb,
                 )
             self.camera_manager.update_camera(name, new_config, start_worker=False)
             self._trigger_single_check(new_name)
@@ -0,0 +1,131 @@
+import tkinter as tk
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from tkinter import ttk
+from typing import Callable, Optional
+
+from app.storage.catalog import (
+    KIND_EXPORT,
+    KIND_MOTION_CLIP,
+    KIND_RECORDING,
+    KIND_TRACKING,
+    get_catalog,
+)
+from app.ui.theme import apply_theme
+
+_KIND_LABELS = {
+    KIND_RECORDING: "Recording",
+    KIND_MOTION_CLIP: "Motion clip",
+    KIND_TRACKING: "Tracking",
+    KIND_EXPORT: "Export",
+}
+
+
+class RecordingsDialog:
+    """Day-by-day list of catalogued videos to open in the editor.
+
+    Each day is one ``Catalog.query`` over ``[00:00, 24:00)``; nothing on
+    disk is walked. ``on_open`` gets the chosen path, or None when the user
+    asks for the regular file dialog instead.
+    """
+
+    def __init__(self, parent: tk.Misc, on_open: Callable[[Optional[Path]], None]) -> None:
+        self.parent = parent
+        self.on_open = on_open
+
+    def open(self, day: Optional[date] = None) -> None:
+        dialog = tk.Toplevel(self.parent)
+        dialog.title("Open Recording")
+        dialog.configure(bg="white")
+        dialog.grab_set()
+        dialog.transient(self.parent)
+
+        width = 760
+        height = 480
+        x = self.parent.winfo_rootx() + (self.parent.winfo_width() - width) // 2
+        y = self.parent.winfo_rooty() + (self.parent.winfo_height() - height) // 2
+        dialog.geometry(f"{width}x{height}+{max(0, x)}+{max(0, y)}")
+        apply_theme(dialog)
+
+        body = ttk.Frame(dialog, padding=16, style="Modal.TFrame")
+        body.pack(fill=tk.BOTH, expand=True)
+
+        current = {"day": day or date.today()}
+        day_var = tk.StringVar()
+        nav = ttk.Frame(body, style="Modal.TFrame")
+        nav.pack(fill=tk.X, pady=(0, 8))
+        ttk.Button(nav, text="<", width=3, style="Modal.TButton", command=lambda: shift(-1)).pack(
+            side=tk.LEFT
+        )
+        ttk.Label(nav, textvariable=day_var, style="Modal.TLabel", width=14, anchor="center").pack(
+            side=tk.LEFT, padx=8
+        )
+        ttk.Button(nav, text=">", width=3, style="Modal.TButton", command=lambda: shift(1)).pack(
+            side=tk.LEFT
+        )
+
+        columns = ("start", "end", "camera", "kind", "events", "file")
+        tree = ttk.Treeview(body, columns=columns, show="headings", selectmode="browse")
+        for column, title, col_width in (
+            ("start", "Start", 80),
+            ("end", "End", 80),
+            ("camera", "Camera", 120),
+            ("kind", "Type", 100),
+            ("events", "Motion", 60),
+            ("file", "File", 280),
+        ):
+            tree.heading(column, text=title)
+            tree.column(column, width=col_width, stretch=column == "file")
+        tree.pack(fill=tk.BOTH, expand=True)
+        paths: dict[str, Path] = {}
+
+        def load() -> None:
+            day_var.set(f"{current['day']:%d-%m-%Y}")
+            tree.delete(*tree.get_children())
+            paths.clear()
+            catalog = get_catalog()
+            if catalog is None:
+                return
+            start = datetime.combine(current["day"], time.min)
+            records = catalog.query(start, start + timedelta(days=1), kinds=list(_KIND_LABELS))
+            for record in records:
+                item = tree.insert(
+                    "",
+                    tk.END,
+                    values=(
+                        f"{record.start:%H:%M:%S}",
+                        f"{record.end:%H:%M:%S}",
+                        record.camera,
+                        _KIND_LABELS[record.kind],
+                        record.motion_events or "",
+                        record.path.name,
+                    ),
+                )
+                paths[item] = record.path
+
+        def shift(days: int) -> None:
+            current["day"] += timedelta(days=days)
+            load()
+
+        def choose(path: Optional[Path]) -> None:
+            dialog.destroy()
+            self.on_open(path)
+
+        def open_selected(_event=None) -> None:
+            selection = tree.selection()
+            if selection:
+                choose(paths[selection[0]])
+
+        tree.bind("<Double-1>", open_selected)
+        actions = ttk.Frame(body, style="Modal.TFrame")
+        actions.pack(fill=tk.X, pady=(8, 0))
+        ttk.Button(actions, text="Cancel", style="Modal.TButton", command=dialog.destroy).pack(
+            side=tk.RIGHT
+        )
+        ttk.Button(actions, text="Open", style="Modal.TButton", command=open_selected).pack(
+            side=tk.RIGHT, padx=(0, 8)
+        )
+        ttk.Button(
+            actions, text="Other file...", style="Modal.TButton", command=lambda: choose(None)
+        ).pack(side=tk.LEFT)
+        load()
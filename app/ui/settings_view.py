@@ -6,7 +6,7 @@ from tkinter import filedialog, messagebox, ttk
 from app.config.models import AppConfig
 from app.config.store import ConfigStore
 from app.core.camera_manager import CameraManager
-from app.utils.paths import set_files_dir
+from app.utils.paths import get_videos_dir, set_files_dir
 
 
 class SettingsView(ttk.Frame):
@@ -16,15 +16,19 @@ class SettingsView(ttk.Frame):
         app_config: AppConfig,
         config_store: ConfigStore,
         camera_manager: CameraManager,
+        recorder_manager=None,
     ) -> None:
         super().__init__(parent)
         self.app_config = app_config
         self.config_store = config_store
         self.camera_manager = camera_manager
+        self.recorder_manager = recorder_manager
+        self._usage_var = tk.StringVar()
 
         self._vars: dict[str, tk.Variable] = {}
         self._build_ui()
         self._load_current()
+        self.refresh_usage()
 
     def _build_ui(self) -> None:
         style = ttk.Style(self)
@@ -91,12 +95,53 @@ class SettingsView(ttk.Frame):
         self._add_bool_row(box, "Enable disk check", "enable_disk_check")
         self._add_bool_row(box, "Enable disk quota", "enable_disk_quota")
         self._add_bool_row(box, "Enable retention", "enable_retention")
+        self._add_float_row(box, "Total quota GB (0 = off)", "quota_global_gb")
+        self._add_float_row(box, "Camera quota GB (0 = off)", "quota_camera_gb")
+
+        usage_box = ttk.Labelframe(
+            parent, text="Recording usage", padding=10, style="Settings.TLabelframe"
+        )
+        usage_box.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(
+            usage_box, textvariable=self._usage_var, style="App.TLabel", justify=tk.LEFT
+        ).grid(row=0, column=0, sticky="w")
+        ttk.Button(
+            usage_box,
+            text="Refresh",
+            style="App.Toolbar.TButton",
+            command=self.refresh_usage,
+        ).grid(row=0, column=1, sticky="ne", padx=(10, 0))
+
+    def refresh_usage(self) -> None:
+        quota = getattr(self.recorder_manager, "storage_quota", None)
+        if quota is None:
+            self._usage_var.set("Not available")
+            return
+        free_bytes = 0
+        monitor = getattr(self.recorder_manager, "disk_monitor", None)
+        sample = monitor.sample(get_videos_dir()) if monitor is not None else None
+        if sample is not None:
+            free_bytes = sample.free_bytes
+        lines = []
+        for usage in quota.usage(free_bytes):
+            forecast = (
+                f"~{usage.forecast_days:.1f} days"
+                if usage.forecast_days is not None
+                else "no data"
+            )
+            lines.append(
+                f"{usage.camera}: {usage.used_gb:.1f} GB, "
+                f"{usage.bytes_per_day / (1024 ** 3):.1f} GB/day, {forecast}"
+            )
+        self._usage_var.set("\n".join(lines) or "No recordings yet")
 
     def _build_recording_section(self, parent: tk.Misc) -> None:
         box = ttk.Labelframe(parent, text="Recording", padding=10, style="Settings.TLabelframe")
         box.pack(fill=tk.X, pady=(0, 10))
         self._add_int_row(box, "Record FPS", "fps_record")
         self._add_int_row(box, "Detect FPS", "fps_detect")
+        self._add_int_row(box, "Segment minutes", "record_segment_minutes")
+        self._add_int_row(box, "Rotation stagger (s)", "record_rotation_stagger_s")
         self._add_bool_row(box, "Enable motion (offline)", "motion_offline")
 
     def _build_camera_section(self, parent: tk.Misc) -> None:
@@ -199,8 +244,14 @@ class SettingsView(ttk.Frame):
         self._vars["enable_disk_check"].set(bool(self.app_config.enable_disk_check))
         self._vars["enable_disk_quota"].set(bool(self.app_config.enable_disk_quota))
         self._vars["enable_retention"].set(bool(self.app_config.enable_retention))
+        self._vars["quota_global_gb"].set(str(self.app_config.quota_global_gb))
+        self._vars["quota_camera_gb"].set(str(self.app_config.quota_camera_gb))
         self._vars["fps_record"].set(str(self.app_config.fps_record))
         self._vars["fps_detect"].set(str(self.app_config.fps_detect))
+        self._vars["record_segment_minutes"].set(str(self.app_config.record_segment_minutes))
+        self._vars["record_rotation_stagger_s"].set(
+            str(self.app_config.record_rotation_stagger_s)
+        )
         self._vars["motion_offline"].set(bool(self.app_config.motion_offline))
         self._vars["cam_reconnect_min_s"].set(str(self.app_config.cam_reconnect_min_s))
         self._vars["cam_reconnect_max_s"].set(str(self.app_config.cam_reconnect_max_s))
@@ -222,8 +273,20 @@ class SettingsView(ttk.Frame):
             self.app_config.enable_disk_check = bool(self._vars["enable_disk_check"].get())
             self.app_config.enable_disk_quota = bool(self._vars["enable_disk_quota"].get())
             self.app_config.enable_retention = bool(self._vars["enable_retention"].get())
+            self.app_config.quota_global_gb = max(
+                0.0, float(self._vars["quota_global_gb"].get())
+            )
+            self.app_config.quota_camera_gb = max(
+                0.0, float(self._vars["quota_camera_gb"].get())
+            )
             self.app_config.fps_record = int(self._vars["fps_record"].get())
             self.app_config.fps_detect = int(self._vars["fps_detect"].get())
+            self.app_config.record_segment_minutes = max(
+                1, int(self._vars["record_segment_minutes"].get())
+            )
+            self.app_config.record_rotation_stagger_s = max(
+                0, int(self._vars["record_rotation_stagger_s"].get())
+            )
             self.app_config.motion_offline = bool(self._vars["motion_offline"].get())
             self.app_config.cam_reconnect_min_s = float(self._vars["cam_reconnect_min_s"].get())
             self.app_config.cam_reconnect_max_s = float(self._vars["cam_reconnect_max_s"].get())
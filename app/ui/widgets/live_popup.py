@@ -1,6 +1,7 @@
 import threading
 import time
 import tkinter as tk
+from datetime import datetime
 from tkinter import messagebox, ttk
 
 import cv2
@@ -8,8 +9,9 @@ from PIL import Image, ImageTk
 
 from app.config.models import CameraConfig
 from app.core.stream_manager import StreamManager
-from app.core.frame_store import FrameStore
+from app.core.frame_store import FrameLevel, FrameStore
 from app.core.motion_detector import apply_motion, ensure_motion, get_motion_config
+from app.storage.catalog import KIND_CAPTURE, catalog_add
 from app.utils.paths import get_pictures_dir
 
 MODEL_PATH = "3103252.pt"
@@ -50,6 +52,7 @@ def open_live_popup(
     prev_time = {"t": time.time()}
     fps_val = {"v": 0.0}
     resized_once = {"done": False}
+    shown = {"version": 0, "display": None}
 
     def capture_frame() -> None:
         with frame_lock:
@@ -60,7 +63,8 @@ def open_live_popup(
             frame = None if frame is None else frame.copy()
         if frame is None:
             return
-        now = time.localtime()
+        stamp = datetime.now()
+        now = stamp.timetuple()
         out_dir = (
             get_pictures_dir()
             / time.strftime("%Y", now)
@@ -69,9 +73,12 @@ def open_live_popup(
             / camera.name
         )
         out_dir.mkdir(parents=True, exist_ok=True)
-        ts = time.strftime("%d-%m-%Y %Hh%Mm%Ss")
+        ts = time.strftime("%d-%m-%Y %Hh%Mm%Ss", now)
         out_path = out_dir / f"{camera.name} {ts}.jpg"
-        cv2.imwrite(str(out_path), frame)
+        if not cv2.imwrite(str(out_path), frame):
+            messagebox.showerror("Capture", f"Cannot save: {out_path}")
+            return
+        catalog_add(out_path, KIND_CAPTURE, camera.name, stamp)
         messagebox.showinfo("Capture", f"Saved: {out_path}")
 
     def close_popup() -> None:
@@ -148,15 +155,20 @@ def open_live_popup(
                 display_frame["frame"] = frame
             time.sleep(0.01)
 
-    stream_manager.acquire(camera.name, "popup")
+    frame_store.register_level("popup", FrameLevel(width=1280, height=720))
+    stream_key = stream_manager.acquire(camera.name, "popup")
     threading.Thread(target=detect_loop, daemon=True).start()
 
     def update_frame() -> None:
         if stop_event.is_set():
             return
-        frame = frame_store.get_frame(camera.name)
-        if frame is not None:
-            frame = cv2.resize(frame, (1280, 720))
+        entry = None
+        version = frame_store.get_version(stream_key)
+        if version != shown["version"]:
+            entry = frame_store.get_level(stream_key, "popup")
+        if entry is not None:
+            shown["version"] = entry.version
+            frame = entry.frame
             with frame_lock:
                 raw_frame["frame"] = frame
         with frame_lock:
@@ -164,7 +176,11 @@ def open_live_popup(
                 frame = display_frame["frame"]
             else:
                 frame = raw_frame["frame"]
-            frame = None if frame is None else frame.copy()
+            if frame is shown["display"]:
+                frame = None
+            else:
+                shown["display"] = frame
+                frame = None if frame is None else frame.copy()
         if frame is not None:
             now = time.time()
             inst_fps = 1.0 / max(1e-6, (now - prev_time["t"]))
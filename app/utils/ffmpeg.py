@@ -1,5 +1,6 @@
 import logging
 import os
+import re
 import shutil
 import subprocess
 import sys
@@ -16,8 +17,15 @@ def find_ffmpeg() -> str | None:
     return shutil.which("ffmpeg")
 
 
-def _find_bundled_ffmpeg() -> str | None:
-    exe_name = "ffmpeg.exe" if os.name == "nt" else "ffmpeg"
+def find_ffprobe() -> str | None:
+    bundled = _find_bundled_ffmpeg("ffprobe")
+    if bundled:
+        return bundled
+    return shutil.which("ffprobe")
+
+
+def _find_bundled_ffmpeg(tool: str = "ffmpeg") -> str | None:
+    exe_name = f"{tool}.exe" if os.name == "nt" else tool
     candidates: list[Path] = []
     if getattr(sys, "frozen", False):
         base = Path(getattr(sys, "_MEIPASS", Path(sys.executable).parent))
@@ -33,6 +41,81 @@ def _find_bundled_ffmpeg() -> str | None:
     return None
 
 
+def probe_video_codec(path: Path) -> str | None:
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        return None
+    try:
+        result = subprocess.run(
+            [ffmpeg, "-hide_banner", "-i", str(path)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+            creationflags=_CREATE_NO_WINDOW,
+        )
+    except Exception:
+        logger.exception("ffmpeg probe error for %s", path.name)
+        return None
+    match = re.search(r"Video: (\w+)", result.stderr.decode("utf-8", "ignore"))
+    return match.group(1) if match else None
+
+
+def probe_seek_keyframe(path: Path, start_s: float) -> float | None:
+    """Media time (s) of the keyframe an input ``-ss start_s`` lands on.
+
+    Stream-copy cuts start at that keyframe, not at ``start_s``. ffprobe
+    repeats ffmpeg's seek (same target, relative to the file start time)
+    and reports the first video packet read after it.
+    """
+    ffprobe = find_ffprobe()
+    if not ffprobe:
+        return None
+    base = [ffprobe, "-v", "error", "-of", "default=noprint_wrappers=1:nokey=1"]
+    try:
+        result = subprocess.run(
+            base + ["-show_entries", "format=start_time", str(path)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+            creationflags=_CREATE_NO_WINDOW,
+        )
+        origin = _first_float(result.stdout)
+        if origin is None:
+            origin = 0.0
+        result = subprocess.run(
+            base
+            + [
+                "-select_streams",
+                "v:0",
+                "-read_intervals",
+                f"{origin + max(0.0, start_s):.6f}%+#1",
+                "-show_entries",
+                "packet=pts_time",
+                str(path),
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+            creationflags=_CREATE_NO_WINDOW,
+        )
+    except Exception:
+        logger.exception("ffprobe seek probe error for %s", path.name)
+        return None
+    pts = _first_float(result.stdout)
+    if result.returncode != 0 or pts is None:
+        return None
+    return max(0.0, pts - origin)
+
+
+def _first_float(output: bytes) -> float | None:
+    for line in output.decode("utf-8", "ignore").splitlines():
+        try:
+            return float(line.strip())
+        except ValueError:
+            continue
+    return None
+
+
 def remux_ts_to_mp4(
     ts_path: Path, delete_source: bool = True, transcode: bool = True
 ) -> Path | None:
@@ -43,6 +126,9 @@ def remux_ts_to_mp4(
     mp4_path = ts_path.with_suffix(".mp4")
     if mp4_path.exists():
         return mp4_path
+    # ffmpeg writes next to the target and the result is renamed into place,
+    # so an interrupted remux never leaves a truncated .mp4 beside the .ts.
+    part_path = mp4_path.with_name(mp4_path.name + ".part")
     if transcode:
         cmd = [
             ffmpeg,
@@ -61,22 +147,15 @@ def remux_ts_to_mp4(
             "aac",
             "-b:a",
             "128k",
-            str(mp4_path),
+            "-f",
+            "mp4",
+            str(part_path),
         ]
     else:
-        cmd = [
-            ffmpeg,
-            "-y",
-            "-i",
-            str(ts_path),
-            "-c",
-            "copy",
-            "-tag:v",
-            "hvc1",
-            "-bsf:a",
-            "aac_adtstoasc",
-            str(mp4_path),
-        ]
+        cmd = [ffmpeg, "-y", "-i", str(ts_path), "-c", "copy"]
+        if probe_video_codec(ts_path) == "hevc":
+            cmd += ["-tag:v", "hvc1"]
+        cmd += ["-bsf:a", "aac_adtstoasc", "-f", "mp4", str(part_path)]
     try:
         result = subprocess.run(
             cmd,
@@ -85,7 +164,8 @@ def remux_ts_to_mp4(
             check=False,
             creationflags=_CREATE_NO_WINDOW,
         )
-        if result.returncode == 0 and mp4_path.exists():
+        if result.returncode == 0 and part_path.exists():
+            os.replace(part_path, mp4_path)
             logger.info("Remuxed to %s", mp4_path.name)
             if delete_source:
                 try:
@@ -94,7 +174,76 @@ def remux_ts_to_mp4(
                     logger.warning("Failed to delete %s: %s", ts_path.name, exc)
             return mp4_path
         logger.warning("ffmpeg remux failed for %s", ts_path.name)
-        return None
     except Exception:
         logger.exception("ffmpeg remux error for %s", ts_path.name)
-        return None
+    try:
+        part_path.unlink(missing_ok=True)
+    except OSError:
+        pass
+    return None
+
+
+def extract_clip(
+    src_path: Path,
+    dst_path: Path,
+    start_s: float,
+    duration_s: float,
+    codec: str | None = None,
+) -> bool:
+    """Copy ``duration_s`` seconds of ``src_path`` from ``start_s`` without re-encoding.
+
+    Input seeking with stream copy starts at the keyframe at or before
+    ``start_s``; callers pass a keyframe-aligned start (from the segment
+    index or ``probe_seek_keyframe``) so they know where the clip begins.
+    """
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        return False
+    cmd = [
+        ffmpeg,
+        "-y",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-ss",
+        # Rounded up so a keyframe-aligned start never lands just before it.
+        f"{max(0.0, start_s) + 0.0005:.3f}",
+        "-t",
+        f"{max(0.1, duration_s):.3f}",
+        "-i",
+        str(src_path),
+        "-map",
+        "0:v",
+        "-map",
+        "0:a?",
+        "-c",
+        "copy",
+        "-avoid_negative_ts",
+        "make_zero",
+    ]
+    if dst_path.suffix == ".mp4" and codec == "hevc":
+        cmd += ["-tag:v", "hvc1"]
+    cmd.append(str(dst_path))
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+            creationflags=_CREATE_NO_WINDOW,
+        )
+    except Exception:
+        logger.exception("ffmpeg clip error for %s", src_path.name)
+        return False
+    if result.returncode == 0 and dst_path.exists():
+        return True
+    logger.warning(
+        "ffmpeg clip failed for %s: %s",
+        src_path.name,
+        result.stderr.decode("utf-8", "ignore").strip()[-200:],
+    )
+    try:
+        dst_path.unlink()
+    except OSError:
+        pass
+    return False
@@ -46,5 +46,9 @@ def get_tracking_dir() -> Path:
     return get_files_dir() / "Tracking"
 
 
+def get_exports_dir() -> Path:
+    return get_files_dir() / "Exports"
+
+
 def get_models_dir() -> Path:
     return get_base_dir() / "models"
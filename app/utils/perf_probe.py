@@ -37,7 +37,12 @@ class PerfProbe:
             "motion": 0,
             "queue_size": 0,
             "fps": 0.0,
+            "encode_dropped": 0,
+            "encode_queue": 0,
         }
+        self._latency_sum_ms = 0.0
+        self._latency_max_ms = 0.0
+        self._latency_count = 0
         self._init_csv()
 
     def _init_csv(self) -> None:
@@ -59,6 +64,10 @@ class PerfProbe:
                     "motion",
                     "queue_size",
                     "fps",
+                    "encode_dropped",
+                    "encode_queue",
+                    "encode_latency_avg_ms",
+                    "encode_latency_max_ms",
                 ]
             )
 
@@ -94,6 +103,20 @@ class PerfProbe:
             queue_size=queue_size,
         )
 
+    def record_encode(
+        self,
+        *,
+        dropped: int = 0,
+        queue_size: int = 0,
+        latency_ms: Optional[float] = None,
+    ) -> None:
+        if latency_ms is not None:
+            with self._lock:
+                self._latency_sum_ms += latency_ms
+                self._latency_max_ms = max(self._latency_max_ms, latency_ms)
+                self._latency_count += 1
+        self._record(encode_dropped=dropped, encode_queue=queue_size)
+
     def _record(self, **updates) -> None:
         now = time.time()
         with self._lock:
@@ -101,7 +124,7 @@ class PerfProbe:
                 if key not in self._counters:
                     continue
                 if isinstance(value, (int, float)):
-                    if key in ("queue_size", "fps"):
+                    if key in ("queue_size", "fps", "encode_queue"):
                         self._counters[key] = value
                     else:
                         self._counters[key] += int(value)
@@ -119,6 +142,9 @@ class PerfProbe:
             except Exception:
                 cpu_pct = ""
                 rss_mb = ""
+        latency_avg = (
+            self._latency_sum_ms / self._latency_count if self._latency_count else 0.0
+        )
         with self.path.open("a", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
             writer.writerow(
@@ -135,8 +161,23 @@ class PerfProbe:
                     self._counters["motion"],
                     self._counters["queue_size"],
                     f"{self._counters['fps']:.2f}",
+                    self._counters["encode_dropped"],
+                    self._counters["encode_queue"],
+                    f"{latency_avg:.1f}",
+                    f"{self._latency_max_ms:.1f}",
                 ]
             )
-        for key in ("grabbed", "decoded", "queued", "dropped", "written", "motion"):
+        for key in (
+            "grabbed",
+            "decoded",
+            "queued",
+            "dropped",
+            "written",
+            "motion",
+            "encode_dropped",
+        ):
             self._counters[key] = 0
+        self._latency_sum_ms = 0.0
+        self._latency_max_ms = 0.0
+        self._latency_count = 0
         self._last_flush = now
@@ -6,7 +6,22 @@ from app.config.models import CameraConfig
 def build_rtsp_url(config: CameraConfig) -> str:
     if config.rtsp_url:
         return config.rtsp_url
+    return _build_url(config, config.stream_path)
+
+
+def build_sub_rtsp_url(config: CameraConfig) -> str:
+    """Low-resolution stream for preview/motion, or "" when none is configured."""
+    if config.source != "rtsp":
+        return ""
+    if config.sub_rtsp_url:
+        return config.sub_rtsp_url
+    if not config.sub_stream_path or config.rtsp_url or not config.ip:
+        return ""
+    return _build_url(config, config.sub_stream_path)
+
+
+def _build_url(config: CameraConfig, stream_path: str) -> str:
     user = quote(config.user, safe="")
     password = quote(config.password, safe="")
     auth = f"{user}:{password}@" if user or password else ""
-    return f"rtsp://{auth}{config.ip}:{config.port}{config.stream_path}"
+    return f"rtsp://{auth}{config.ip}:{config.port}{stream_path}"
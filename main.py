@@ -3,15 +3,17 @@ from pathlib import Path
 import tkinter as tk
 from tkinter import messagebox
 import ctypes
+import multiprocessing
 import time
 import os
 
 from app.config.store import ConfigStore
 from app.core.camera_manager import CameraManager
-from app.core.frame_store import FrameStore
+from app.core.frame_store import create_frame_store
 from app.core.recorder_manager import RecorderManager
 from app.core.tracking_manager import TrackingManager
 from app.core.stream_manager import StreamManager
+from app.storage.catalog import close_catalog
 from app.ui.app_ui import AppUI
 from app.ui.stop_jobs_dialog import StopJobsDialog
 from app.utils.logging_setup import setup_logging
@@ -63,7 +65,7 @@ def main() -> int:
             root.iconbitmap(str(icon_ico))
     except Exception:
         pass
-    frame_store = FrameStore()
+    frame_store = create_frame_store(app_config)
     camera_manager = CameraManager(config_store, frame_store)
     camera_manager.load_from_config(cameras, start_workers=False)
     stream_manager = StreamManager(camera_manager, idle_timeout_s=10.0)
@@ -121,6 +123,8 @@ def main() -> int:
                 tracking_manager.shutdown()
             stream_manager.shutdown()
             camera_manager.shutdown()
+            frame_store.close()
+            close_catalog()
             root.destroy()
 
         StopJobsDialog(root, recorder_manager).open(
@@ -136,4 +140,5 @@ def main() -> int:
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     sys.exit(main())
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.storage import catalog  # noqa: E402
+from app.utils import paths  # noqa: E402
+
+# Manual hardware/network scripts, not pytest tests.
+collect_ignore = ["test_cuda.py", "test_rtsp.py", "resize_perf.py", "yolo_detect_demo.py"]
+
+
+@pytest.fixture
+def files_dir(tmp_path, monkeypatch):
+    """Point Files/ (media, catalog) at a temporary directory."""
+    root = tmp_path / "Files"
+    monkeypatch.setattr(paths, "_FILES_DIR_OVERRIDE", root)
+    monkeypatch.setattr(catalog, "_catalog", None)
+    yield root
+    if catalog._catalog is not None:
+        catalog._catalog.close()
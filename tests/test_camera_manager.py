@@ -0,0 +1,58 @@
+from app.config.models import AppConfig, CameraConfig
+from app.core.camera_manager import CameraManager
+from app.core.frame_store import FrameStore
+
+
+class MemoryConfigStore:
+    def load(self):
+        return AppConfig(), []
+
+    def save(self, app_config, cameras):
+        pass
+
+
+def make_manager(monkeypatch):
+    manager = CameraManager(MemoryConfigStore(), FrameStore())
+    started = {}
+
+    def start_idle(name, worker):
+        # Run the thread without connecting: it exits at once.
+        worker.stop_event.set()
+        worker.start()
+        started[name] = worker
+
+    monkeypatch.setattr(manager, "_start_worker", start_idle)
+    manager.add_camera(
+        CameraConfig("cam", "10.0.0.5", 554, "", "", "/main", sub_stream_path="/sub"),
+        persist=False,
+        start_worker=False,
+    )
+    return manager, started
+
+
+def test_sub_stream_has_its_own_runtime(monkeypatch):
+    manager, started = make_manager(monkeypatch)
+    manager.start_stream("cam")
+    sub_key = manager.stream_key("cam", main=False)
+    manager.start_stream(sub_key)
+
+    main_runtime = started["cam"].runtime
+    sub_runtime = started[sub_key].runtime
+    assert sub_runtime is not main_runtime
+    assert manager.get_runtime("cam") is main_runtime
+    assert manager.get_stream_runtime(sub_key) is sub_runtime
+
+    main_runtime.status = "Online"
+    sub_runtime.status = "Offline"
+    assert manager.get_stream_runtime("cam").status == "Online"
+
+
+def test_stopping_one_stream_leaves_the_other_status(monkeypatch):
+    manager, started = make_manager(monkeypatch)
+    manager.start_stream("cam")
+    manager.start_stream("cam#sub")
+    started["cam"].runtime.status = "Online"
+    manager.stop_stream("cam#sub")
+    assert manager.get_runtime("cam").status == "Online"
+    manager.stop_stream("cam")
+    assert manager.get_runtime("cam").status == "Offline"
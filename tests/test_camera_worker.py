@@ -0,0 +1,36 @@
+import random
+import threading
+
+from app.config.models import CameraConfig, CameraRuntimeState
+from app.core.camera_worker import CameraWorker
+from app.core.frame_store import FrameStore
+
+
+def decoded_fps(source_fps, target_fps, seconds=20.0, jitter=0.0):
+    worker = CameraWorker(
+        CameraConfig("cam", "", 0, "", "", ""),
+        CameraRuntimeState(),
+        FrameStore(),
+        threading.Event(),
+        target_fps=target_fps,
+    )
+    rng = random.Random(1)
+    next_due = 0.0
+    decoded = 0
+    for i in range(int(source_fps * seconds)):
+        now = 1000.0 + i / source_fps + rng.uniform(-jitter, jitter)
+        if worker._frame_due(now, next_due):
+            next_due = worker._next_due(now, next_due)
+            decoded += 1
+    return decoded / seconds
+
+
+def test_decimation_converges_to_target():
+    assert abs(decoded_fps(25, 15) - 15) < 0.2
+    assert abs(decoded_fps(30, 15, jitter=0.004) - 15) < 0.2
+    assert abs(decoded_fps(30, 10) - 10) < 0.2
+
+
+def test_target_above_source_decodes_every_frame():
+    assert abs(decoded_fps(12, 15) - 12) < 0.1
+    assert abs(decoded_fps(25, 0) - 25) < 0.1
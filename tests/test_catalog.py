@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from app.storage import catalog as catalog_module
+from app.storage.catalog import (
+    KIND_CAPTURE,
+    KIND_MOTION_CLIP,
+    KIND_RECORDING,
+    Catalog,
+    catalog_add,
+    close_catalog,
+    get_catalog,
+)
+
+T0 = datetime(2026, 5, 1, 10, 0, 0)
+
+
+def test_add_is_an_upsert_keyed_by_path(tmp_path):
+    catalog = Catalog(tmp_path / "catalog.sqlite3")
+    video = tmp_path / "a.ts"
+    video.write_bytes(b"x" * 10)
+    catalog.add(video, KIND_RECORDING, "cam1", T0, codec="h264")
+    catalog.set_motion_events(video, 3)
+    video.write_bytes(b"x" * 25)
+    catalog.add(video, KIND_RECORDING, "cam1", T0, end=T0 + timedelta(minutes=5))
+
+    record = catalog.get(video)
+    assert record.size_bytes == 25
+    assert record.codec == "h264"  # an empty codec does not clear it
+    assert record.motion_events == 3
+    assert record.end == T0 + timedelta(minutes=5)
+
+    mp4 = tmp_path / "a.mp4"
+    catalog.add(mp4.with_suffix(".clip.ts"), KIND_MOTION_CLIP, "cam1", T0, source_path=video)
+    catalog.rename(video, mp4)
+    assert catalog.get(video) is None
+    assert catalog.get(mp4).start == T0
+    assert catalog.get(mp4.with_suffix(".clip.ts")).source_path == mp4
+    catalog.close()
+
+
+def test_query_overlap_and_filters(tmp_path):
+    catalog = Catalog(tmp_path / "catalog.sqlite3")
+    for i, (camera, kind) in enumerate(
+        [("cam1", KIND_RECORDING), ("cam2", KIND_RECORDING), ("cam1", KIND_CAPTURE)]
+    ):
+        start = T0 + timedelta(hours=i)
+        catalog.add(tmp_path / f"{i}.bin", kind, camera, start, end=start + timedelta(minutes=30))
+
+    window = catalog.query(T0 + timedelta(minutes=20), T0 + timedelta(hours=1, minutes=10))
+    assert [record.path.name for record in window] == ["0.bin", "1.bin"]
+    cam1 = catalog.query(T0, T0 + timedelta(days=1), cameras=["cam1"], kinds=[KIND_RECORDING])
+    assert [record.path.name for record in cam1] == ["0.bin"]
+    assert catalog.query(T0, T0 + timedelta(days=1), cameras=[]) == []
+    assert catalog.remove_under(tmp_path) == 3
+    assert catalog.all_of_kind(KIND_RECORDING) == []
+    catalog.close()
+
+
+def test_close_catalog_releases_the_shared_instance(files_dir):
+    capture = files_dir / "shot.jpg"
+    files_dir.mkdir(parents=True)
+    capture.write_bytes(b"jpg")
+    catalog_add(capture, KIND_CAPTURE, "cam1", T0)
+    assert get_catalog().get(capture).kind == KIND_CAPTURE
+    close_catalog()
+    assert catalog_module._catalog is None
+    # Reopening reads back what was committed before the close.
+    assert get_catalog().get(capture) is not None
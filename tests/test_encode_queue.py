@@ -0,0 +1,65 @@
+import threading
+
+from app.core.encode_queue import EncodeQueue
+
+
+class ListWriter:
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame, **kwargs):
+        self.frames.append((frame, kwargs))
+
+
+def test_drop_oldest_drops_frame_with_its_kwargs_and_counts_per_writer():
+    queue = EncodeQueue("cam", maxsize=3, policy="drop_oldest")
+    writer, other = ListWriter(), ListWriter()
+    queue.put_frame(writer, "a", slot=0)
+    queue.put_frame(other, "x", slot=0)
+    queue.put_frame(writer, "b", slot=1)
+    assert queue.put_frame(writer, "c", slot=2)
+    queue.start()
+    queue.close()
+
+    # Each frame keeps the kwargs it was queued with; the lost slot is
+    # reported for the caller to re-fill.
+    assert writer.frames == [("b", {"slot": 1}), ("c", {"slot": 2})]
+    assert other.frames == [("x", {"slot": 0})]
+    assert queue.take_dropped(writer) == 1
+    assert queue.take_dropped(writer) == 0
+    assert queue.take_dropped(other) == 0
+
+
+def test_drop_newest_refuses_and_control_ops_run_in_order():
+    queue = EncodeQueue("cam", maxsize=2, policy="drop_newest")
+    writer = ListWriter()
+    order = []
+    assert queue.put_frame(writer, "a")
+    queue.call(lambda: order.append(len(writer.frames)))
+    assert queue.put_frame(writer, "b")
+    assert not queue.put_frame(writer, "c")
+    assert queue.dropped == 1
+    assert queue.take_dropped(writer) == 0
+    queue.start()
+    queue.close()
+    assert [frame for frame, _ in writer.frames] == ["a", "b"]
+    assert order == [1]
+
+
+def test_block_waits_for_room():
+    queue = EncodeQueue("cam", maxsize=1, policy="block")
+    writer = ListWriter()
+    queue.put_frame(writer, "a")
+    done = threading.Event()
+
+    def producer():
+        queue.put_frame(writer, "b")
+        done.set()
+
+    threading.Thread(target=producer, daemon=True).start()
+    assert not done.wait(0.1)
+    queue.start()
+    assert done.wait(2.0)
+    queue.close()
+    assert [frame for frame, _ in writer.frames] == ["a", "b"]
+    assert queue.dropped == 0
@@ -0,0 +1,112 @@
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from app.core import finalize_service
+from app.core.finalize_service import FinalizeJob, FinalizeService
+from app.storage.segment_index import SegmentIndex, SegmentIndexWriter
+from app.utils import ffmpeg
+
+
+def fake_ffmpeg(monkeypatch, returncode: int, interrupted: bool = False):
+    def run(cmd, **_kwargs):
+        Path(cmd[-1]).write_bytes(b"partial" if interrupted else b"mp4")
+        if interrupted:
+            raise KeyboardInterrupt
+        return subprocess.CompletedProcess(cmd, returncode, b"", b"")
+
+    monkeypatch.setattr(ffmpeg, "find_ffmpeg", lambda: "ffmpeg")
+    monkeypatch.setattr(ffmpeg.subprocess, "run", run)
+
+
+def test_remux_renames_into_place(tmp_path, monkeypatch):
+    fake_ffmpeg(monkeypatch, 0)
+    ts_path = tmp_path / "cam.ts"
+    ts_path.write_bytes(b"ts")
+
+    mp4_path = ffmpeg.remux_ts_to_mp4(ts_path)
+
+    assert mp4_path == tmp_path / "cam.mp4"
+    assert mp4_path.read_bytes() == b"mp4"
+    assert not ts_path.exists()
+    assert [p.name for p in tmp_path.iterdir()] == ["cam.mp4"]
+
+
+def test_failed_remux_keeps_ts_and_no_mp4(tmp_path, monkeypatch):
+    fake_ffmpeg(monkeypatch, 1)
+    ts_path = tmp_path / "cam.ts"
+    ts_path.write_bytes(b"ts")
+
+    assert ffmpeg.remux_ts_to_mp4(ts_path) is None
+    assert [p.name for p in tmp_path.iterdir()] == ["cam.ts"]
+
+
+def test_interrupted_remux_never_leaves_mp4(tmp_path, monkeypatch):
+    fake_ffmpeg(monkeypatch, 0, interrupted=True)
+    ts_path = tmp_path / "cam.ts"
+    ts_path.write_bytes(b"ts")
+
+    try:
+        ffmpeg.remux_ts_to_mp4(ts_path)
+    except KeyboardInterrupt:
+        pass
+
+    assert ts_path.read_bytes() == b"ts"
+    assert not (tmp_path / "cam.mp4").exists()
+
+
+def test_shutdown_does_not_block_on_full_queue(tmp_path, monkeypatch):
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_remux(path, delete_source=True, transcode=True):
+        started.set()
+        release.wait(5)
+        return None
+
+    monkeypatch.setattr(finalize_service, "remux_ts_to_mp4", slow_remux)
+    service = FinalizeService(workers=1, max_pending=2)
+    done = []
+    jobs = []
+    for idx in range(3):
+        path = tmp_path / f"seg{idx}.ts"
+        path.write_bytes(b"ts")
+        jobs.append(FinalizeJob(path, on_done=lambda p, remuxed: done.append((p.name, remuxed))))
+    assert service.submit(jobs[0])
+    assert started.wait(2)
+    assert service.submit(jobs[1]) and service.submit(jobs[2])
+
+    began = time.monotonic()
+    service.shutdown(join_timeout=0.2)
+    assert time.monotonic() - began < 2
+
+    assert sorted(done) == [("seg1.ts", False), ("seg2.ts", False)]
+    late = FinalizeJob(tmp_path / "late.ts", on_done=lambda p, remuxed: done.append((p.name, remuxed)))
+    assert not service.submit(late)
+    assert done[-1] == ("late.ts", False)
+    release.set()
+
+
+def test_finished_job_retargets_the_index(tmp_path, monkeypatch):
+    def remux(path, delete_source=True, transcode=True):
+        mp4_path = path.with_suffix(".mp4")
+        mp4_path.write_bytes(b"mp4")
+        path.unlink()
+        return mp4_path
+
+    monkeypatch.setattr(finalize_service, "remux_ts_to_mp4", remux)
+    ts_path = tmp_path / "seg.ts"
+    ts_path.write_bytes(b"ts")
+    writer = SegmentIndexWriter(ts_path, fps=10.0)
+    writer.add(0, 0.0, 100.0, keyframe=True, byte_offset=0)
+    writer.close()
+    done = threading.Event()
+    service = FinalizeService()
+    service.submit(FinalizeJob(ts_path, transcode=True, on_done=lambda p, r: done.set()))
+    assert done.wait(2)
+    service.shutdown()
+
+    index = SegmentIndex.load(tmp_path / "seg.mp4")
+    assert index is not None
+    assert not index.entries[0].is_keyframe and index.entries[0].byte_offset == -1
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.core.frame_store import FrameLevel, FrameStore
+
+
+def frame(value: int) -> np.ndarray:
+    return np.full((40, 80, 3), value, dtype=np.uint8)
+
+
+def test_versions_increase_per_frame():
+    store = FrameStore()
+    assert store.get_version("cam") == 0
+    store.set_frame("cam", frame(1), 1.0)
+    store.set_frame("other", frame(2), 1.0)
+    store.set_frame("cam", frame(3), 2.0)
+
+    assert store.get_version("cam") == 3
+    assert store.get_version("other") == 2
+    assert store.get_entry("cam").timestamp == 2.0
+
+
+def test_zero_copy_frames_are_shared_and_read_only():
+    store = FrameStore(zero_copy=True)
+    original = frame(7)
+    store.set_frame("cam", original, 1.0)
+
+    got = store.get_frame("cam")
+    assert got is original
+    with pytest.raises(ValueError):
+        got[0, 0, 0] = 1
+
+
+def test_copying_store_hands_out_private_frames():
+    store = FrameStore()
+    store.set_frame("cam", frame(7), 1.0)
+
+    got = store.get_frame("cam")
+    got[:] = 0
+    assert store.get_frame("cam")[0, 0, 0] == 7
+
+
+def test_wait_for_new_returns_at_once_when_already_newer():
+    store = FrameStore()
+    store.set_frame("cam", frame(1), 1.0)
+
+    entry = store.wait_for_new("cam", 0, timeout=0)
+    assert entry is not None and entry.version == 1
+    assert store.wait_for_new("cam", 1, timeout=0.01) is None
+
+
+def test_wait_for_new_wakes_on_publish():
+    store = FrameStore()
+    store.set_frame("cam", frame(1), 1.0)
+    result = {}
+
+    def waiter():
+        began = time.monotonic()
+        result["entry"] = store.wait_for_new("cam", 1, timeout=2.0)
+        result["waited"] = time.monotonic() - began
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.05)
+    store.set_frame("cam", frame(2), 2.0)
+    thread.join(2)
+
+    assert result["entry"].version == 2
+    assert result["waited"] < 1.0
+
+
+def test_scaled_level_is_resized_once_per_version():
+    store = FrameStore(zero_copy=True)
+    store.register_level("half", FrameLevel(max_dim=40))
+    store.set_frame("cam", frame(5), 1.0)
+
+    first = store.get_level("cam", "half")
+    second = store.get_level("cam", "half")
+    assert first.frame.shape[:2] == (20, 40)
+    assert first.frame is second.frame
+    assert first.version == store.get_version("cam")
+    with pytest.raises(KeyError):
+        store.get_level("cam", "missing")
+
+
+def test_scaled_level_of_a_superseded_version_is_not_served():
+    store = FrameStore(zero_copy=True)
+    level = FrameLevel(scale=0.5)
+    store.set_frame("cam", frame(1), 1.0)
+    version = store.get_version("cam")
+
+    assert store.get_scaled("cam", level, version=version).frame[0, 0, 0] == 1
+    store.set_frame("cam", frame(2), 2.0)
+    assert store.get_scaled("cam", level, version=version) is None
+    assert store.get_scaled("cam", level).frame[0, 0, 0] == 2
@@ -0,0 +1,31 @@
+import logging
+import multiprocessing as mp
+
+from app.config.models import CameraConfig
+from app.core.ingest_pool import _ingest_process_main
+
+
+def test_child_logs_come_back_over_the_event_queue():
+    ctx = mp.get_context("spawn")
+    commands, events = ctx.Queue(), ctx.Queue()
+    process = ctx.Process(
+        target=_ingest_process_main, args=(commands, events, 0.5, 1.0, logging.INFO)
+    )
+    process.start()
+    try:
+        config = CameraConfig("cam", "", 0, "", "", "")
+        commands.put(("start", "cam", config, "sgp_missing_ring"))
+        commands.put(None)
+        process.join(20)
+        records = []
+        while not events.empty():
+            event = events.get(timeout=1)
+            if isinstance(event, logging.LogRecord):
+                records.append(event)
+    finally:
+        if process.is_alive():
+            process.terminate()
+
+    [record] = [r for r in records if r.name == "IngestProcess"]
+    assert record.levelno == logging.ERROR
+    assert "Cannot attach frame ring for cam" in record.getMessage()
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from app.core import offline_motion_manager
+from app.core.offline_motion_manager import OfflineMotionManager, _MotionEvent, _SegmentScan
+from app.storage.motion_overlay import MotionOverlay, overlay_path
+
+
+def test_overlay_round_trip_and_hold(tmp_path):
+    overlay = MotionOverlay((640, 480), hold_s=0.5)
+    overlay.add(1.0, (10, 20, 30, 40))
+    overlay.add(2.0, (50, 60, 70, 80))
+    clip = tmp_path / "clip.mp4"
+    assert overlay.save(clip)
+
+    loaded = MotionOverlay.load(clip)
+    assert loaded.frame_size == (640, 480)
+    assert loaded.box_at(0.9) is None
+    assert loaded.box_at(1.2) == (10, 20, 30, 40)
+    assert loaded.box_at(1.6) is None
+    assert loaded.box_at(2.5) == (50, 60, 70, 80)
+
+
+def test_load_missing_or_broken_overlay(tmp_path):
+    clip = tmp_path / "clip.mp4"
+    assert MotionOverlay.load(clip) is None
+    overlay_path(clip).write_text("{not json", encoding="utf-8")
+    assert MotionOverlay.load(clip) is None
+
+
+def test_clip_overlay_starts_at_the_copied_keyframe(files_dir, tmp_path, monkeypatch):
+    cuts = []
+
+    def fake_extract(src, dst, start_s, duration_s, codec=None):
+        cuts.append((start_s, duration_s))
+        dst.write_bytes(b"clip")
+        return True
+
+    monkeypatch.setattr(offline_motion_manager, "extract_clip", fake_extract)
+    monkeypatch.setattr(offline_motion_manager, "probe_seek_keyframe", lambda path, start: 8.0)
+    manager = OfflineMotionManager(workers=1, follow_interval_s=0)
+    try:
+        source = tmp_path / "cam" / "seg.ts"
+        scan = _SegmentScan(source, datetime(2026, 1, 2, 3, 4, 0))
+        scan.frame_size = (640, 480)
+        event = _MotionEvent(12.0)
+        event.end_ts = 14.0
+        event.boxes = [(12.0, (1, 2, 3, 4)), (13.0, (5, 6, 7, 8))]
+        assert manager._extract_clip(scan, source, event, 2.0, None, "h264")
+    finally:
+        manager.shutdown()
+
+    assert cuts == [(8.0, 6.0)]
+    [clip] = (files_dir / "Tracking").rglob("*.ts")
+    assert "03h04m08s" in clip.name
+    overlay = MotionOverlay.load(clip)
+    assert [entry[0] for entry in overlay.boxes] == [4.0, 5.0]
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+import cv2
+import numpy as np
+import pytest
+
+from app.core import offline_motion_manager
+from app.core.offline_motion_manager import OfflineMotionManager, _SegmentScan
+from app.storage.segment_index import SegmentIndexWriter, seek_capture
+
+FPS = 15.0
+GOP = 15
+FRAMES = 150
+
+
+class SloppyCapture:
+    """Decoder stand-in whose seeks land one keyframe past the request, like a
+    timestamp-less TS; frame ``n`` is filled with the value ``n``."""
+
+    def __init__(self, _path) -> None:
+        self.pos = -1
+
+    def isOpened(self) -> bool:
+        return True
+
+    def set(self, prop, value) -> bool:
+        if prop == cv2.CAP_PROP_POS_FRAMES and value == 0:
+            self.pos = -1
+            return True
+        frame = int(round(value * FPS / 1000.0)) if prop == cv2.CAP_PROP_POS_MSEC else int(value)
+        landing = (frame // GOP + 1) * GOP
+        self.pos = min(landing, FRAMES) - 1
+        return True
+
+    def get(self, prop) -> float:
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return max(0, self.pos) * 1000.0 / FPS
+        if prop == cv2.CAP_PROP_FPS:
+            return FPS
+        return 0.0
+
+    def grab(self) -> bool:
+        if self.pos + 1 >= FRAMES:
+            return False
+        self.pos += 1
+        return True
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return True, np.full((8, 8, 3), self.pos, dtype=np.uint8)
+
+    def release(self) -> None:
+        pass
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    seen = []
+
+    def apply_motion(frame, state, config):
+        seen.append(int(frame[0, 0, 0]))
+        return [], None
+
+    config = {"motion_fps": FPS, "motion_offline_fps_idle": FPS, "motion_scale": 1.0}
+    monkeypatch.setattr(offline_motion_manager.cv2, "VideoCapture", SloppyCapture)
+    monkeypatch.setattr(offline_motion_manager, "apply_motion", apply_motion)
+    monkeypatch.setattr(offline_motion_manager, "ensure_motion", lambda state, config: None)
+    monkeypatch.setattr(offline_motion_manager, "get_motion_config", lambda: config)
+    manager = OfflineMotionManager(follow_interval_s=0)
+    manager.seen = seen
+    yield manager
+    manager.shutdown()
+
+
+def write_index(path, frames: int) -> None:
+    writer = SegmentIndexWriter(path, fps=FPS)
+    for frame_no in range(frames):
+        keyframe = frame_no % GOP == 0
+        if keyframe or frame_no == frames - 1:
+            writer.add(frame_no, frame_no / FPS, 1000.0 + frame_no / FPS, keyframe=keyframe)
+    writer.close()
+
+
+def test_follow_scan_resumes_at_next_frame(tmp_path, manager):
+    path = tmp_path / "cam" / "01-01-2026 10h00m00s.ts"
+    path.parent.mkdir()
+    scan = _SegmentScan(path, datetime(2026, 1, 1, 10))
+
+    write_index(path, 67)
+    manager._follow_scan(scan)
+    assert scan.next_frame == 52
+    write_index(path, FRAMES)
+    manager._follow_scan(scan)
+
+    assert manager.seen == list(range(FRAMES - int(FPS)))
+    assert scan.frame_ts == pytest.approx((FRAMES - int(FPS) - 1) / FPS)
+
+
+def test_seek_without_index_verifies_landing():
+    for target in (10, 40, 46):
+        cap = SloppyCapture(None)
+        seek_capture(cap, target, FPS, None)
+        assert cap.read()[1][0, 0, 0] == target
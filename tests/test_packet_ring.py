@@ -0,0 +1,65 @@
+import threading
+from types import SimpleNamespace
+
+from app.core.motion_clip_writer import MotionClipWriter, PacketRing
+
+
+def packet(name, key=False, kind="video"):
+    return SimpleNamespace(name=name, is_keyframe=key, stream=SimpleNamespace(type=kind))
+
+
+def names(packets):
+    return [p.name for p in packets]
+
+
+def test_ring_starts_at_keyframe_and_drops_whole_gops():
+    ring = PacketRing(2.5)
+    ring.push(packet("p0"), 0.0)
+    assert len(ring) == 0
+    for i in range(9):
+        ring.push(packet(f"v{i}", key=i % 3 == 0), 1.0 + i)
+        ring.push(packet(f"a{i}", kind="audio"), 1.0 + i)
+    # Keyframes at 1, 4, 7: the GOP from 7 alone does not cover 2.5 s at t=9.
+    assert ring.oldest_ts == 4.0
+    assert names(ring.drain())[:2] == ["v3", "a3"]
+    assert len(ring) == 0 and ring.oldest_ts is None
+
+
+class FakeHub:
+    session = 1
+
+
+def make_writer(max_packets=3):
+    return MotionClipWriter("cam", threading.Event(), FakeHub(), pre_roll_s=5.0, max_packets=max_packets)
+
+
+def test_full_queue_drops_to_next_keyframe_but_keeps_commands():
+    writer = make_writer()
+    for item in (packet("k0", key=True), packet("v1"), packet("v2"), packet("v3")):
+        writer.push_packet(item)
+    writer.start_clip("start")
+    writer.push_packet(packet("v4"))
+    writer.push_packet(packet("a4", kind="audio"))
+    writer._items.popleft()  # the encoder thread frees one packet slot
+    writer._packets -= 1
+    writer.push_packet(packet("v5"))  # still before the next keyframe
+    writer.push_packet(packet("k6", key=True))
+    writer.stop_clip("stop")
+
+    queued = [item[1][0].name if item[0] == "packet" else item[0] for item in writer._items]
+    assert queued == ["v1", "v2", "start", "k6", "stop"]
+    assert writer.dropped == 4
+
+
+def test_session_change_mid_clip_resets_the_ring_session():
+    writer = make_writer()
+    closed = []
+    writer._muxer = SimpleNamespace(session=1, close=lambda: closed.append(True))
+    writer._ring.push(packet("old", key=True), 0.0)
+    writer.packet_hub.session = 2
+    writer._on_packet(packet("k", key=True), 1.0)
+    assert closed and writer._muxer is None
+    assert writer._ring_session == 2
+    # Later packets of the same session keep the ring instead of clearing it.
+    writer._on_packet(packet("v"), 1.1)
+    assert names(writer._ring.drain()) == ["k", "v"]
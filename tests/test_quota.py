@@ -0,0 +1,88 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+from app.storage.catalog import KIND_RECORDING, get_catalog
+from app.storage.quota import StorageQuota
+from app.storage.recovery import iter_finished_segments
+from app.utils.paths import get_videos_dir
+
+_GB = 1024 * 1024 * 1024
+_STAMP = "%d-%m-%Y %Hh%Mm%Ss"
+
+
+def make_segment(camera, start, size, minutes=10):
+    end = start + timedelta(minutes=minutes)
+    day_dir = get_videos_dir() / f"{start:%Y}" / f"{start:%m}" / f"{start:%d}" / camera
+    day_dir.mkdir(parents=True, exist_ok=True)
+    path = day_dir / f"{camera} continuous {start:{_STAMP}} - {end:{_STAMP}}.mp4"
+    path.write_bytes(b"\0" * size)
+    os.utime(path, (end.timestamp(), end.timestamp()))
+    return path, end
+
+
+def test_camera_budget_evicts_oldest_of_that_camera(files_dir):
+    quota = StorageQuota(lambda camera: 2500 / _GB if camera == "a" else 0, lambda: 0)
+    t0 = datetime(2026, 3, 1, 8, 0, 0)
+    paths = []
+    for i in range(3):
+        path, end = make_segment("a", t0 + timedelta(minutes=10 * i), 1000)
+        quota.add("a", path, end)
+        paths.append(path)
+    other, end = make_segment("b", t0 - timedelta(days=1), 5000)
+    quota.add("b", other, end)
+
+    assert not paths[0].exists()
+    assert paths[1].exists() and paths[2].exists() and other.exists()
+    assert quota.used_bytes("a") == 2000
+    assert get_catalog().get(paths[0]) is None
+
+
+def test_global_budget_evicts_oldest_across_cameras(files_dir):
+    quota = StorageQuota(lambda camera: 0, lambda: 2500 / _GB)
+    t0 = datetime(2026, 3, 1, 8, 0, 0)
+    old, end = make_segment("b", t0, 1000)
+    quota.add("b", old, end)
+    for i in range(2):
+        path, end = make_segment("a", t0 + timedelta(hours=i + 1), 1000)
+        quota.add("a", path, end)
+    assert not old.exists()
+    assert quota.used_bytes() == 2000
+
+
+def test_backfill_counts_uncatalogued_segments_once(files_dir):
+    t0 = datetime(2026, 3, 1, 8, 0, 0)
+    first, _ = make_segment("a", t0, 700)
+    second, _ = make_segment("a", t0 + timedelta(minutes=10), 300)
+    (first.parent / "a continuous 01-03-2026 09h00m00s.ts").write_bytes(b"open")
+    quota = StorageQuota(lambda camera: 0, lambda: 0)
+    assert quota.used_bytes() == 0
+
+    started = time.time()
+    assert quota.backfill(iter_finished_segments(started)) == 2
+    assert quota.backfill(iter_finished_segments(started)) == 0
+    assert quota.used_bytes("a") == 1000
+    records = get_catalog().all_of_kind(KIND_RECORDING)
+    assert [record.path for record in records] == [first, second]
+    assert records[0].end == t0 + timedelta(minutes=10)
+
+    # A later start seeds from the catalog the backfill filled.
+    assert StorageQuota(lambda camera: 0, lambda: 0).used_bytes("a") == 1000
+
+
+def test_free_space_reports_when_eviction_cannot_keep_up(files_dir):
+    quota = StorageQuota(lambda camera: 0, lambda: 0)
+    path, end = make_segment("a", datetime(2026, 3, 1, 8, 0, 0), 1000)
+    quota.add("a", path, end)
+    assert quota.freeing_space()
+
+    assert quota.free_space(free_bytes=0, min_free_bytes=500) == 1000
+    assert quota.freeing_space() is False  # nothing left to evict
+
+    stuck = path.parent / "a continuous 01-03-2026 09h00m00s - 01-03-2026 09h10m00s.mp4"
+    stuck.mkdir()  # unlink fails on a directory
+    quota.add("a", stuck, end)
+    other, end = make_segment("a", datetime(2026, 3, 1, 10, 0, 0), 1000)
+    quota.add("a", other, end)
+    assert quota.free_space(free_bytes=0, min_free_bytes=5000) == 1000
+    assert not quota.freeing_space()
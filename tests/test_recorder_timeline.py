@@ -0,0 +1,161 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.config.models import AppConfig, CameraConfig
+from app.core.encode_queue import EncodeQueue
+from app.core.recorder_worker import RecorderWorker
+from app.storage.segment_index import IndexedVideoWriter, SegmentIndex
+
+
+class FakeWriter:
+    def __init__(self):
+        self.frames = 0
+
+    def isOpened(self):
+        return True
+
+    def write(self, frame):
+        self.frames += 1
+
+    def release(self):
+        pass
+
+
+def make_worker(**config):
+    app_config = AppConfig()
+    for key, value in config.items():
+        setattr(app_config, key, value)
+    return RecorderWorker(CameraConfig("cam", "", 0, "", "", ""), app_config, threading.Event())
+
+
+def test_idle_samples_are_held_on_the_timeline(tmp_path):
+    worker = make_worker()
+    raw = FakeWriter()
+    writer = IndexedVideoWriter(raw, tmp_path / "seg.ts", 10.0)
+    frame = np.zeros((4, 4, 3), np.uint8)
+    t0 = 1_000_000.0
+    # Ten idle samples three seconds apart (past record_cfr_max_gap_s), then
+    # two seconds of motion at 10 fps.
+    for i in range(10):
+        worker._write_record_frame(frame, writer, t0 + 3 * i, 10.0, min_gap_s=4.5)
+    for i in range(1, 21):
+        worker._write_record_frame(frame, writer, t0 + 27 + i / 10.0, 10.0)
+    writer.release()
+
+    # Media time is wall time: 29 s at 10 fps plus the first frame.
+    assert raw.frames == 291
+    index = SegmentIndex.load(tmp_path / "seg.ts")
+    assert index.frame_count == 291
+    assert abs(index.duration_s - 29.1) < 1e-6
+    assert abs(index.wall_for_time(15.0) - (t0 + 15)) < 1e-6
+    assert abs(index.end_wall_ts - (t0 + 29.1)) < 1e-6
+
+
+class WallWriter:
+    def __init__(self):
+        self.walls = []
+
+    def write(self, frame, wall_ts=None):
+        self.walls.append(wall_ts)
+
+
+def test_slow_camera_frames_are_duplicated_onto_the_timeline():
+    worker = make_worker()
+    writer = WallWriter()
+    frame = np.zeros((4, 4, 3), np.uint8)
+    t0 = 1_000_000.0
+    # 5 fps capture recorded at 15 fps: every frame fills three slots.
+    for i in range(10):
+        worker._write_record_frame(frame, writer, t0 + i / 5.0, 15.0)
+
+    assert len(writer.walls) == 1 + 9 * 3
+    assert writer.walls == pytest.approx([t0 + i / 15.0 for i in range(28)], abs=1e-6)
+
+
+def test_fast_camera_frames_are_decimated_onto_the_timeline():
+    worker = make_worker()
+    writer = WallWriter()
+    frame = np.zeros((4, 4, 3), np.uint8)
+    t0 = 1_000_000.0
+    written = [
+        worker._write_record_frame(frame, writer, t0 + i / 30.0, 15.0) for i in range(60)
+    ]
+
+    assert sum(written) == 30
+    assert writer.walls == pytest.approx([t0 + i / 15.0 for i in range(30)], abs=1e-6)
+
+
+def test_long_gap_reanchors_instead_of_padding():
+    worker = make_worker(record_cfr_max_gap_s=2.0)
+    writer = WallWriter()
+    frame = np.zeros((4, 4, 3), np.uint8)
+    t0 = 1_000_000.0
+    worker._write_record_frame(frame, writer, t0, 10.0)
+    # A 60 s reconnect is capped at two seconds of slots, ending at capture time.
+    assert worker._write_record_frame(frame, writer, t0 + 60.0, 10.0) == 20
+    assert writer.walls[-1] == pytest.approx(t0 + 60.0, abs=1e-6)
+    assert worker._write_record_frame(frame, writer, t0 + 60.1, 10.0) == 1
+    assert writer.walls[-1] == pytest.approx(t0 + 60.1, abs=1e-6)
+
+
+def test_new_writer_starts_its_own_timeline():
+    worker = make_worker()
+    first, second = WallWriter(), WallWriter()
+    frame = np.zeros((4, 4, 3), np.uint8)
+    t0 = 1_000_000.0
+    for i in range(5):
+        worker._write_record_frame(frame, first, t0 + i / 10.0, 10.0)
+    worker._write_record_frame(frame, second, t0 + 0.5, 10.0)
+
+    assert len(first.walls) == 5
+    assert second.walls == pytest.approx([t0 + 0.5], abs=1e-6)
+
+
+class GatedWriter:
+    """Records the wall clock of each write; blocks while ``gate`` is clear."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.walls = []
+
+    def write(self, frame, wall_ts=None):
+        self.gate.wait()
+        self.walls.append(wall_ts)
+
+
+def wait_drained(queue):
+    for _ in range(500):
+        if queue.qsize() == 0:
+            return
+        time.sleep(0.01)
+    raise AssertionError("encode queue did not drain")
+
+
+def test_duration_holds_when_encode_queue_drops():
+    worker = make_worker()
+    worker._encoder = EncodeQueue("cam", maxsize=8, policy="drop_oldest")
+    worker._encoder.start()
+    writer = GatedWriter()
+    frame = np.zeros((4, 4, 3), np.uint8)
+    t0 = 1_000_000.0
+    # The encoder stalls for the first second of 15 fps capture.
+    for i in range(15):
+        worker._write_record_frame(frame, writer, t0 + i / 15.0, 15.0)
+    assert worker._encoder.dropped > 0
+    writer.gate.set()
+    wait_drained(worker._encoder)
+    for i in range(15, 45):
+        worker._write_record_frame(frame, writer, t0 + i / 15.0, 15.0)
+        time.sleep(0.002)
+    worker._encoder.close()
+
+    # Dropped slots were re-filled, so the file still spans 3 s of wall time.
+    assert len(writer.walls) == 45
+    slots = [(wall - t0) * 15.0 for wall in writer.walls]
+    assert slots == pytest.approx([round(slot) for slot in slots], abs=1e-6)
+    # Each written frame kept the wall time it was queued with.
+    assert slots == sorted(slots)
+    assert slots[-1] == pytest.approx(44, abs=1e-6)
@@ -0,0 +1,94 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.storage import recovery
+from app.storage.recovery import recover_in_progress_segments
+from app.storage.segment_index import SegmentIndexWriter, sidecar_path
+
+_STAMP = "%d-%m-%Y %Hh%Mm%Ss"
+
+
+@pytest.fixture
+def videos_dir(tmp_path, monkeypatch):
+    root = tmp_path / "Videos"
+    monkeypatch.setattr(recovery, "get_videos_dir", lambda: root)
+    return root
+
+
+def open_segment(camera, start, data=b"ts", mtime=None, suffix=".ts"):
+    day_dir = recovery.get_videos_dir() / f"{start:%Y}" / f"{start:%m}" / f"{start:%d}" / camera
+    day_dir.mkdir(parents=True, exist_ok=True)
+    path = day_dir / f"{camera} continuous {start:{_STAMP}}{suffix}"
+    path.write_bytes(data)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def final_name(camera, start, end, suffix=".ts"):
+    return f"{camera} continuous {start:{_STAMP}} - {end:{_STAMP}}{suffix}"
+
+
+def recent_start():
+    return (datetime.now() - timedelta(hours=2)).replace(microsecond=0)
+
+
+def test_orphan_is_named_from_its_index(videos_dir):
+    start = recent_start()
+    path = open_segment("cam", start, mtime=time.time() - 60)
+    writer = SegmentIndexWriter(path, fps=10.0)
+    for frame_no in range(0, 3000, 10):
+        writer.add(frame_no, frame_no / 10.0, start.timestamp() + frame_no / 10.0, keyframe=True)
+    writer.add(2999, 299.9, start.timestamp() + 299.9)
+    writer.close()
+
+    [segment] = recover_in_progress_segments(2, time.time())
+
+    end = start + timedelta(seconds=300)
+    assert segment.path == path.with_name(final_name("cam", start, end))
+    assert (segment.camera, segment.start, segment.end.replace(microsecond=0)) == (
+        "cam",
+        start,
+        end,
+    )
+    assert segment.path.read_bytes() == b"ts"
+    assert sidecar_path(segment.path).exists()
+    assert not path.exists() and not sidecar_path(path).exists()
+
+
+def test_orphan_without_index_ends_at_last_write(videos_dir):
+    start = recent_start()
+    end = start + timedelta(minutes=7)
+    open_segment("cam", start, mtime=end.timestamp())
+
+    [segment] = recover_in_progress_segments(2, time.time())
+
+    assert segment.path.name == final_name("cam", start, end)
+    assert segment.end == end
+
+
+def test_name_clash_gets_a_counter(videos_dir):
+    start = recent_start()
+    end = start + timedelta(minutes=7)
+    path = open_segment("cam", start, mtime=end.timestamp())
+    path.with_name(final_name("cam", start, end)).write_bytes(b"other")
+
+    [segment] = recover_in_progress_segments(2, time.time())
+
+    assert segment.path.name == f"cam continuous {start:{_STAMP}} - {end:{_STAMP}} (1).ts"
+
+
+def test_empty_stubs_are_deleted_and_live_files_left_alone(videos_dir):
+    start = recent_start()
+    started = time.time()
+    stub = open_segment("a", start, data=b"", mtime=started - 60)
+    live = open_segment("b", start, mtime=started + 5)
+    old_day = open_segment("c", start - timedelta(days=5), mtime=started - 60)
+
+    assert recover_in_progress_segments(2, started) == []
+    assert not stub.exists()
+    assert live.exists()
+    assert old_day.exists()
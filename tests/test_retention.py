@@ -0,0 +1,52 @@
+import os
+import time
+from datetime import date, datetime, timedelta
+
+from app.storage.catalog import KIND_CAPTURE, KIND_RECORDING, catalog_add, get_catalog
+from app.storage.retention import RetentionEngine, iter_day_dirs, prune_expired_days
+from app.utils.paths import get_exports_dir, get_pictures_dir, get_videos_dir
+
+
+def make_day(root, day, name="cam/file.bin"):
+    path = root / f"{day:%Y}" / f"{day:%m}" / f"{day:%d}" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x")
+    return path
+
+
+def test_day_dirs_are_listed_oldest_first_skipping_other_names(tmp_path):
+    for day in (date(2026, 2, 1), date(2025, 12, 31), date(2026, 1, 15)):
+        make_day(tmp_path, day)
+    (tmp_path / ".recording" / "cam").mkdir(parents=True)
+    (tmp_path / "2026" / "13" / "01").mkdir(parents=True)
+    days = [day for day, _dir in iter_day_dirs(tmp_path)]
+    assert days == [date(2025, 12, 31), date(2026, 1, 15), date(2026, 2, 1)]
+
+
+def test_prune_stops_at_first_day_inside_the_window(files_dir):
+    root = get_videos_dir()
+    old = make_day(root, date(2026, 1, 1))
+    kept = make_day(root, date(2026, 1, 9))
+    catalog_add(old, KIND_RECORDING, "cam", datetime(2026, 1, 1))
+    deleted_dirs = []
+    assert prune_expired_days(7, [root], today=date(2026, 1, 10), on_deleted=deleted_dirs.append) == 1
+    assert not old.exists() and kept.exists()
+    assert not (root / "2026" / "01" / "01").exists()
+    assert deleted_dirs == [root / "2026" / "01" / "01"]
+    assert get_catalog().get(old) is None
+
+
+def test_engine_covers_every_media_root(files_dir):
+    old_day = date.today() - timedelta(days=365)
+    video = make_day(get_videos_dir(), old_day)
+    capture = make_day(get_pictures_dir(), old_day, "cam/cam shot.jpg")
+    catalog_add(capture, KIND_CAPTURE, "cam", datetime.combine(old_day, datetime.min.time()))
+    export_dir = get_exports_dir() / "old export"
+    export_dir.mkdir(parents=True)
+    stale = time.time() - 30 * 86400
+    os.utime(export_dir, (stale, stale))
+
+    engine = RetentionEngine(days_keep=lambda: 7, enabled=lambda: True)
+    assert engine.run_once() == 3
+    assert not video.exists() and not capture.exists() and not export_dir.exists()
+    assert get_catalog().get(capture) is None
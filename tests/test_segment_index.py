@@ -0,0 +1,139 @@
+import struct
+
+import cv2
+import numpy as np
+import pytest
+
+from app.storage.segment_index import (
+    IndexedVideoWriter,
+    SegmentIndex,
+    SegmentIndexWriter,
+    TsKeyframeTail,
+    mp4_fragment_offsets,
+    retarget_sidecar,
+    sidecar_path,
+)
+
+
+def ts_packet(keyframe_pts=None, video=True):
+    """One 188-byte TS packet; a PES start with RAI when ``keyframe_pts`` is set."""
+    if keyframe_pts is None:
+        return bytes([0x47, 0x01, 0x00, 0x10]) + bytes(184)
+    ticks = int(keyframe_pts * 90000)
+    pts = bytes(
+        [
+            0x21 | ((ticks >> 29) & 0x0E),
+            (ticks >> 22) & 0xFF,
+            ((ticks >> 14) & 0xFE) | 1,
+            (ticks >> 7) & 0xFF,
+            ((ticks << 1) & 0xFE) | 1,
+        ]
+    )
+    stream_id = 0xE0 if video else 0xC0
+    pes = b"\x00\x00\x01" + bytes([stream_id, 0, 0, 0x80, 0x80, 5]) + pts
+    adaptation = bytes([1, 0x40])  # length 1, random_access_indicator
+    packet = bytes([0x47, 0x41, 0x00, 0x30]) + adaptation + pes
+    return packet + b"\xff" * (188 - len(packet))
+
+
+def test_index_round_trip_and_lookups(tmp_path):
+    video = tmp_path / "seg.ts"
+    writer = SegmentIndexWriter(video, fps=10.0)
+    for frame in range(0, 100, 10):
+        writer.add(frame, frame / 10.0, 1000.0 + frame / 10.0, keyframe=frame % 20 == 0)
+    record = writer.add(95, 9.5, 1009.5)
+    writer.set_byte_offset(record, 4242)
+    writer.close()
+
+    index = SegmentIndex.load(video)
+    assert index.container == ".ts"
+    assert index.frame_count == 96
+    assert index.entries[-1].byte_offset == 4242
+    assert index.entry_before_frame(35).frame_no == 20
+    assert index.entry_before_frame(35, keyframe=False).frame_no == 30
+    assert index.entry_before_time(6.5).frame_no == 60
+    assert abs(index.time_for_wall(1004.25) - 4.25) < 1e-6
+
+
+def test_load_tolerates_torn_tail_and_sorts(tmp_path):
+    video = tmp_path / "seg.ts"
+    writer = SegmentIndexWriter(video, fps=10.0)
+    writer.add(20, 2.0, 2.0)
+    writer.add(10, 1.0, 1.0, keyframe=True)
+    writer.close()
+    with sidecar_path(video).open("ab") as handle:
+        handle.write(b"\x01\x02\x03")
+    index = SegmentIndex.load(video)
+    assert [entry.frame_no for entry in index.entries] == [10, 20]
+
+
+def test_retarget_after_remux_drops_stale_fields(tmp_path):
+    ts_path = tmp_path / "seg.ts"
+    writer = SegmentIndexWriter(ts_path, fps=10.0)
+    writer.add(0, 0.0, 100.0, keyframe=True, byte_offset=0)
+    writer.add(10, 1.0, 101.0, keyframe=True, byte_offset=18800)
+    writer.close()
+    mp4_path = tmp_path / "seg.mp4"
+
+    # An index left behind by a remux describes the .ts and is not used.
+    assert SegmentIndex.load(mp4_path) is None
+
+    assert retarget_sidecar(mp4_path, keyframes=True)
+    index = SegmentIndex.load(mp4_path)
+    assert index.container == ".mp4"
+    assert [(e.frame_no, e.pts_ms, e.wall_ts) for e in index.entries] == [
+        (0, 0, 100.0),
+        (10, 1000, 101.0),
+    ]
+    assert all(e.is_keyframe and e.byte_offset == -1 for e in index.entries)
+    assert SegmentIndex.load(ts_path) is None
+
+    # A transcode keeps the timeline but not the GOP structure.
+    assert retarget_sidecar(mp4_path, keyframes=False)
+    index = SegmentIndex.load(mp4_path)
+    assert index.entry_before_frame(15) is None
+    assert index.wall_for_time(1.0) == 101.0
+
+
+def test_ts_tail_reports_video_keyframes_incrementally(tmp_path):
+    path = tmp_path / "seg.ts"
+    packets = [ts_packet(0.5), ts_packet(), ts_packet(0.6, video=False), ts_packet(2.5)]
+    path.write_bytes(b"".join(packets[:2]) + packets[2][:100])
+    tail = TsKeyframeTail(path)
+    assert tail.poll() == [(0, 0.5)]
+    with path.open("ab") as handle:
+        handle.write(packets[2][100:] + packets[3])
+    assert tail.poll() == [(3 * 188, 2.5)]
+    tail.close()
+
+
+def test_mp4_fragment_offsets(tmp_path):
+    def box(kind, payload=b""):
+        return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+    data = box(b"ftyp", b"isom") + box(b"moov", bytes(20))
+    first = len(data)
+    data += box(b"moof", bytes(16)) + box(b"mdat", bytes(100))
+    second = len(data)
+    data += box(b"moof", bytes(16)) + box(b"mdat", bytes(50))
+    path = tmp_path / "seg.mp4"
+    path.write_bytes(data)
+    assert mp4_fragment_offsets(path) == [first, second]
+
+
+def test_opencv_ts_segments_get_keyframes(tmp_path):
+    path = tmp_path / "seg.ts"
+    raw = cv2.VideoWriter(str(path), cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*"mp2v"), 15, (320, 240))
+    if not raw.isOpened():
+        pytest.skip("OpenCV build cannot write MPEG-2 TS")
+    writer = IndexedVideoWriter(raw, path, 15.0)
+    for i in range(90):
+        writer.write(np.full((240, 320, 3), i % 255, np.uint8), wall_ts=500.0 + i / 15.0)
+    writer.release()
+
+    index = SegmentIndex.load(path)
+    keyframes = [entry for entry in index.entries if entry.is_keyframe]
+    assert keyframes and keyframes[0].frame_no == 0
+    assert all(entry.byte_offset >= 0 and entry.byte_offset % 188 == 0 for entry in keyframes)
+    assert index.entry_before_frame(80) is not None
+    assert index.frame_count == 90
@@ -0,0 +1,93 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from app.core.shm_frame_store import _CTRL_LATEST, _META_SEQ, SharedFrameStore
+
+
+@pytest.fixture
+def store():
+    store = SharedFrameStore(slots=3, slot_bytes=64 * 64 * 3)
+    yield store
+    store.close()
+
+
+def frame(value: int, height: int = 64, width: int = 64) -> np.ndarray:
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_owner_grows_ring_for_oversize_frame(store):
+    store.set_frame("cam", frame(1), 1.0)
+    first_name = store.ring_names()["cam"]
+    first_version = store.get_version("cam")
+
+    big = frame(2, 128, 128)
+    store.set_frame("cam", big, 2.0)
+
+    assert store.ring_names()["cam"] != first_name
+    got, ts = store.get_frame_with_ts("cam")
+    assert got.shape == big.shape
+    assert np.array_equal(got, big)
+    assert ts == 2.0
+    assert store.get_version("cam") > first_version
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=first_name)
+
+
+def test_remove_frame_unlinks_ring(store):
+    store.set_frame("cam", frame(1), 1.0)
+    name = store.ring_names()["cam"]
+
+    store.remove_frame("cam")
+
+    assert store.get_frame("cam") is None
+    assert "cam" not in store.ring_names()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_producer_gets_bigger_ring_from_owner(store):
+    producer = SharedFrameStore.attach({"cam": store.ensure_ring("cam")})
+    try:
+        big = frame(3, 128, 128)
+        producer.set_frame("cam", big, 1.0)
+        shrunk = store.get_frame("cam")
+        assert shrunk is not None and shrunk.nbytes <= 64 * 64 * 3
+
+        new_name = store.grow_ring("cam")
+        assert new_name is not None
+        assert store.grow_ring("cam") is None
+        producer.attach_ring("cam", new_name)
+        producer.set_frame("cam", big, 2.0)
+
+        got = store.get_frame("cam")
+        assert np.array_equal(got, big)
+        assert store.get_version("cam") > 1
+    finally:
+        producer.close()
+
+
+def test_torn_slot_is_not_read(store):
+    store.set_frame("cam", frame(5), 1.0)
+    ring = store._rings["cam"]
+    slot = int(ring._ctrl[_CTRL_LATEST])
+    ring._meta[slot, _META_SEQ] += 1
+
+    assert ring.read() is None
+
+    ring._meta[slot, _META_SEQ] += 1
+    got, ts, version = ring.read()
+    assert np.array_equal(got, frame(5))
+    assert (ts, version) == (1.0, 1)
+
+
+def test_wait_for_new_sees_next_version(store):
+    store.set_frame("cam", frame(1), 1.0)
+    version = store.get_version("cam")
+
+    assert store.wait_for_new("cam", version, timeout=0.02) is None
+    store.set_frame("cam", frame(2), 2.0)
+    entry = store.wait_for_new("cam", version, timeout=0.5)
+    assert entry is not None and entry.version == version + 1
+    assert np.array_equal(entry.frame, frame(2))